@@ -1,21 +1,127 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
 from pathlib import Path
-from typing import Any, Optional
-from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+from datetime import datetime, timedelta, timezone
+import bisect
+import cProfile
+import csv
+import ctypes
+import ctypes.util
+import hashlib
+import heapq
+import io
 import json
+import math
+import mmap
 import os
+import pstats
 import re
+import select
+import sqlite3
+import struct
 import subprocess
-from urllib import parse, request
-
+import sys
+import threading
+import time
+import unicodedata
+import uuid
+from importlib.util import find_spec
+from itertools import islice
+from urllib import parse
+
+import httpx
+import numpy as np
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from openai import OpenAI
 
-app = FastAPI()
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    _ensure_cms_index()
+    _open_http_clients()
+    _start_cms_watcher()
+    try:
+        yield
+    finally:
+        _stop_cms_watcher()
+        _close_http_clients()
+        _close_cms_search()
+
+
+app = FastAPI(lifespan=_lifespan)
 BASE_DIR = Path(__file__).resolve().parent
-CMS_DIR = BASE_DIR.parent / "cms"
+CMS_DIR = Path(os.getenv("CMS_DIR") or BASE_DIR.parent / "cms")
 CMS_WINES_DIR = CMS_DIR / "wines"
 XWINES_CLONE_DIR = CMS_DIR / "sources" / "x-wines"
+XWINES_REPO_URL = "https://github.com/rogerioxavier/X-Wines.git"
+XWINES_STATE_FILE = CMS_DIR / "sources" / "x-wines.state.json"
+XWINES_RATING_STEPS = ("1.0", "1.5", "2.0", "2.5", "3.0", "3.5", "4.0", "4.5", "5.0")
+OPEN_METEO_ARCHIVE_URL = os.getenv("OPEN_METEO_ARCHIVE_URL") or "https://archive-api.open-meteo.com/v1/archive"
+OPEN_METEO_CACHE_DIR = Path(os.getenv("OPEN_METEO_CACHE_DIR") or BASE_DIR.parent / ".cache" / "open-meteo")
+OPEN_METEO_DAILY_FIELDS = ("temperature_2m_max", "temperature_2m_min", "precipitation_sum")
+
+_CMS_INDEX_LOCK = threading.Lock()
+_CMS_INDEX_READY = False
+_CMS_NAME_INDEX: dict[str, dict[Optional[int], set[str]]] = {}
+_CMS_SLUG_KEYS: dict[str, tuple[str, Optional[int]]] = {}
+_CMS_SLUG_FACETS: dict[str, dict[str, Any]] = {}
+_CMS_FACET_INDEX: dict[tuple[str, Any], set[str]] = {}
+_CMS_VINTAGE_INDEX: dict[int, set[str]] = {}
+_CMS_SORTED_VIEWS: dict[Any, list[str]] = {}
+_CMS_FACET_FIELDS = ("region", "wine_type", "producer")
+_CMS_TRIGRAM_INDEX: dict[str, set[str]] = {}
+_CMS_FOLDED_NAMES: dict[str, set[str]] = {}
+_CMS_FOLDED_TRIGRAMS: dict[str, frozenset[str]] = {}
+_CMS_FUZZY_MAX_CANDIDATES = 5000
+_CMS_WATCHER_LOCK = threading.Lock()
+_CMS_WATCHER: dict[str, Any] = {}
+_CMS_FILE_STATS: dict[str, tuple[int, int]] = {}
+_IN_CLOSE_WRITE, _IN_MOVED_FROM, _IN_MOVED_TO, _IN_DELETE = 0x8, 0x40, 0x80, 0x200
+_IN_DELETE_SELF, _IN_MOVE_SELF, _IN_Q_OVERFLOW, _IN_IGNORED = 0x400, 0x800, 0x4000, 0x8000
+_IN_NONBLOCK, _IN_CLOEXEC = 0x800, 0x80000
+_CMS_PACK_LOCK = threading.Lock()
+_CMS_PACK: dict[str, Any] = {}
+_CMS_PACK_REBUILD_LOCK = threading.Lock()
+_CMS_PACK_WRITE_LOCK = threading.Lock()
+_CMS_PACK_PENDING_DROPS: list[set[str]] = []
+_CMS_SEARCH_LOCK = threading.Lock()
+_CMS_SEARCH: dict[str, Any] = {}
+_CMS_SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 3.0, 1.0)
+_UPSTREAM_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="upstream")
+_HTTP_CLIENTS_LOCK = threading.Lock()
+_HTTP_CLIENTS: dict[str, httpx.Client] = {}
+_UPSTREAM_HEALTH_LOCK = threading.Lock()
+_UPSTREAM_HEALTH: dict[str, dict[str, Any]] = {}
+_UPSTREAM_HEALTH_WINDOW = 200
+_UPSTREAM_MIN_LATENCY_SAMPLES = 20
+_INFLIGHT_LOCK = threading.Lock()
+_INFLIGHT_CALLS: dict[tuple[Any, ...], Future] = {}
+_EXPLAIN_CACHE_LOCK = threading.Lock()
+_EXPLAIN_CACHE: dict[tuple[str, Optional[int]], dict[str, Any]] = {}
+_EXPLAIN_CACHE_TAGS: dict[tuple[str, str], set[tuple[str, Optional[int]]]] = {}
+_EXPLAIN_CACHE_STATE = {"sequence": 0, "cleared": 0, "computing": 0}
+_EXPLAIN_CACHE_GENERATIONS: dict[tuple[str, str], int] = {}
+# Tag -> (sequence of the write, generation it replaced) for CMS writes made by the running computation itself.
+_EXPLAIN_OWN_WRITES: ContextVar[Optional[dict[tuple[str, str], tuple[int, int]]]] = ContextVar(
+    "explain_own_writes", default=None
+)
+_IMPORT_JOBS_LOCK = threading.Lock()
+_IMPORT_RUN_LOCK = threading.Lock()
+_IMPORT_JOBS: dict[str, dict[str, Any]] = {}
+_METRICS_LOCK = threading.Lock()
+_METRIC_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_METRIC_HISTOGRAMS: dict[tuple[str, str], dict[str, Any]] = {}
+_METRIC_COUNTERS: dict[tuple[str, str], int] = {}
+_REQUEST_TIMINGS: ContextVar[Optional[list[tuple[str, float]]]] = ContextVar("request_timings", default=None)
+_SERVER_TIMING_PATHS = {"/explain-wine"}
+_RESPONSE_VALIDATORS: ContextVar[Optional[dict[str, str]]] = ContextVar("response_validators", default=None)
+_CONDITIONAL_GET_PATHS = {"/explain-wine", "/explain-wine/stream"}
+_PROFILE_LOCK = threading.Lock()
 
 
 @app.get("/")
@@ -34,8 +140,11 @@ def health():
 
 @app.get("/sources/health")
 def sources_health():
-    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
-    wine_count = len(list(CMS_WINES_DIR.glob("*.json")))
+    _ensure_cms_index()
+    with _CMS_INDEX_LOCK:
+        wine_count = len(_CMS_SLUG_KEYS)
+    with _CMS_PACK_LOCK:
+        packed_count = len(_CMS_PACK.get("offsets", ()))
     winevybe_url = os.getenv("WINEVYBE_API_URL")
     vinou_url = os.getenv("VINOU_API_URL")
     openai_key = os.getenv("OPENAI_API_KEY")
@@ -45,14 +154,18 @@ def sources_health():
             "git_cms": {
                 "configured": True,
                 "wine_count": wine_count,
+                "packed_count": packed_count,
+                "watcher": _cms_watcher_snapshot(),
             },
             "winevybe": {
                 "configured": bool(winevybe_url),
                 "url": winevybe_url,
+                **_upstream_health_snapshot("winevybe"),
             },
             "vinou": {
                 "configured": bool(vinou_url),
                 "url": vinou_url,
+                **_upstream_health_snapshot("vinou"),
             },
             "openai": {
                 "configured": bool(openai_key),
@@ -61,6 +174,265 @@ def sources_health():
     }
 
 
+@app.get("/metrics")
+def metrics():
+    _ensure_cms_index()
+    with _CMS_INDEX_LOCK:
+        corpus_size = len(_CMS_SLUG_KEYS)
+    return PlainTextResponse(_render_metrics(corpus_size), media_type="text/plain; version=0.0.4")
+
+
+class _RequestMetricsMiddleware:
+    """Counts requests and their latency per route template (not raw path, to bound label cardinality)."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            _observe_metric("wine_api_request_duration_seconds", f'route="{route}"', time.perf_counter() - started)
+            _count_metric(
+                "wine_api_requests_total",
+                f'route="{route}",method="{scope["method"]}",status="{status["code"]}"',
+            )
+
+
+app.add_middleware(_RequestMetricsMiddleware)
+
+
+class _ServerTimingMiddleware:
+    """Adds a Server-Timing header built from the stages observed while serving the request."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in _SERVER_TIMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        timings: list[tuple[str, float]] = []
+        token = _REQUEST_TIMINGS.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = _server_timing_header(timings, time.perf_counter() - started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _REQUEST_TIMINGS.reset(token)
+
+
+app.add_middleware(_ServerTimingMiddleware)
+
+
+class _ConditionalGetMiddleware:
+    """Adds ETag/X-Cache headers reported by the endpoint and turns a matching If-None-Match into a 304."""
+
+    def __init__(self, asgi_app):
+        self.app = asgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in _CONDITIONAL_GET_PATHS:
+            await self.app(scope, receive, send)
+            return
+        validators: dict[str, str] = {}
+        token = _RESPONSE_VALIDATORS.set(validators)
+        if_none_match = next((value.decode("latin-1") for key, value in scope["headers"] if key == b"if-none-match"), None)
+        not_modified = False
+
+        async def send_with_validators(message):
+            nonlocal not_modified
+            if message["type"] == "http.response.start" and message["status"] == 200 and validators:
+                headers = list(message.get("headers", []))
+                # A streamed miss only learns its ETag after the headers are sent, so it reports X-Cache alone.
+                if "etag" in validators:
+                    not_modified = _etag_matches(if_none_match, validators["etag"])
+                    if not_modified:
+                        headers = [(key, value) for key, value in headers if key not in (b"content-length", b"content-type")]
+                    headers += [(b"etag", validators["etag"].encode("latin-1")), (b"cache-control", b"no-cache")]
+                headers.append((b"x-cache", validators["cache"].encode("latin-1")))
+                message = {**message, "status": 304 if not_modified else 200, "headers": headers}
+            elif message["type"] == "http.response.body" and not_modified:
+                if message.get("more_body"):
+                    return
+                message = {"type": "http.response.body", "body": b"", "more_body": False}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_validators)
+        finally:
+            _RESPONSE_VALIDATORS.reset(token)
+
+
+app.add_middleware(_ConditionalGetMiddleware)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x".
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in {candidate.removeprefix("W/") for candidate in candidates}
+
+
+def _server_timing_header(timings: list[tuple[str, float]], total: float) -> str:
+    durations: dict[str, float] = {}
+    for stage, seconds in list(timings):
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _submit_in_context(executor: ThreadPoolExecutor, func: Callable[..., Any], *args, **kwargs) -> Future:
+    # Executor threads do not inherit context variables; carry the request's timing sink across.
+    return executor.submit(copy_context().run, func, *args, **kwargs)
+
+
+class _TimedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            _observe_stage("serialization", time.perf_counter() - started)
+
+
+def _observe_metric(name: str, labels: str, seconds: float) -> None:
+    bucket = bisect.bisect_left(_METRIC_BUCKETS, seconds)
+    with _METRICS_LOCK:
+        histogram = _METRIC_HISTOGRAMS.get((name, labels))
+        if histogram is None:
+            histogram = _METRIC_HISTOGRAMS[(name, labels)] = {
+                "buckets": [0] * (len(_METRIC_BUCKETS) + 1),
+                "sum": 0.0,
+                "count": 0,
+            }
+        histogram["buckets"][bucket] += 1
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+
+def _count_metric(name: str, labels: str, amount: int = 1) -> None:
+    with _METRICS_LOCK:
+        _METRIC_COUNTERS[(name, labels)] = _METRIC_COUNTERS.get((name, labels), 0) + amount
+
+
+def _observe_stage(stage: str, seconds: float) -> None:
+    _observe_metric("wine_api_stage_duration_seconds", f'stage="{stage}"', seconds)
+    timings = _REQUEST_TIMINGS.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def _count_cache(cache: str, hit: bool, amount: int = 1) -> None:
+    if amount:
+        _count_metric("wine_api_cache_requests_total", f'cache="{cache}",result="{"hit" if hit else "miss"}"', amount)
+
+
+def _timed_stage(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _observe_stage(stage, time.perf_counter() - started)
+
+        return timed
+
+    return decorate
+
+
+def _render_metrics(corpus_size: int) -> str:
+    with _METRICS_LOCK:
+        histograms = {key: {**value, "buckets": list(value["buckets"])} for key, value in _METRIC_HISTOGRAMS.items()}
+        counters = dict(_METRIC_COUNTERS)
+
+    lines = []
+    metric_help = {
+        "wine_api_requests_total": ("counter", "HTTP requests by route template, method and status."),
+        "wine_api_request_duration_seconds": ("histogram", "HTTP request latency by route template."),
+        "wine_api_stage_duration_seconds": ("histogram", "Latency of each /explain-wine pipeline stage."),
+        "wine_api_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+    }
+    for name, (kind, text) in metric_help.items():
+        lines += [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+        if kind == "counter":
+            lines += [f"{name}{{{labels}}} {value}" for (metric, labels), value in sorted(counters.items()) if metric == name]
+            continue
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*_METRIC_BUCKETS, "+Inf"), histogram["buckets"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram['count']}")
+
+    lines += ["# HELP wine_api_cache_hit_ratio Share of cache lookups served from the cache.", "# TYPE wine_api_cache_hit_ratio gauge"]
+    caches = sorted({labels.split(",")[0] for (metric, labels) in counters if metric == "wine_api_cache_requests_total"})
+    for cache in caches:
+        hits = counters.get(("wine_api_cache_requests_total", f'{cache},result="hit"'), 0)
+        misses = counters.get(("wine_api_cache_requests_total", f'{cache},result="miss"'), 0)
+        lines.append(f"wine_api_cache_hit_ratio{{{cache}}} {hits / (hits + misses):.6f}")
+
+    lines += [
+        "# HELP wine_api_cms_documents Wine documents in the Git CMS corpus.",
+        "# TYPE wine_api_cms_documents gauge",
+        f"wine_api_cms_documents {corpus_size}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _single_flight(key: tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+    with _INFLIGHT_LOCK:
+        inflight = _INFLIGHT_CALLS.get(key)
+        leader = inflight is None
+        if leader:
+            inflight = Future()
+            _INFLIGHT_CALLS[key] = inflight
+    _count_cache("single_flight", hit=not leader)
+    if not leader:
+        started = time.perf_counter()
+        try:
+            return inflight.result()
+        finally:
+            _observe_stage("single_flight_wait", time.perf_counter() - started)
+
+    try:
+        result = compute()
+    except BaseException as exc:
+        inflight.set_exception(exc)
+        raise
+    else:
+        inflight.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT_CALLS.pop(key, None)
+
+
 def _extract_json_payload(text: str) -> dict[str, Any]:
     cleaned = text.strip()
     if cleaned.startswith("```"):
@@ -88,12 +460,465 @@ def _extract_json_payload(text: str) -> dict[str, Any]:
     return parsed
 
 
-@app.get("/explain-wine")
-def explain_wine(name: str, vintage: Optional[int] = None):
+@app.get("/explain-wine", response_class=_TimedJSONResponse)
+def explain_wine(name: str, vintage: Optional[int] = None, profile: bool = False):
+    parsed_name, parsed_vintage = _normalize_wine_query(name=name, vintage=vintage)
+    if profile:
+        return _profile_explain_wine(parsed_name, parsed_vintage)
+    return _cached_explain_wine(parsed_name, parsed_vintage)
+
+
+def _cached_explain_wine(parsed_name: str, parsed_vintage: Optional[int]) -> dict[str, Any]:
+    """Serve from the response cache: fresh entries as-is, stale ones while a background refresh runs."""
+    key = (parsed_name, parsed_vintage)
+    ttl = _env_float("EXPLAIN_WINE_CACHE_TTL_SECONDS", 300.0)
+    entry, status = _lookup_explain_cache(key, ttl)
+    if entry is None:
+        entry = _single_flight(("explain-wine", *key), lambda: _compute_explain_cache_entry(key, store=ttl > 0))
+    _report_response_validators(etag=entry["etag"], cache=status)
+    return entry["response"]
+
+
+def _lookup_explain_cache(key: tuple[str, Optional[int]], ttl: float) -> tuple[Optional[dict[str, Any]], str]:
+    # Returns the usable entry (starting a background refresh if it is stale) and its X-Cache status.
+    stale_window = max(_env_float("EXPLAIN_WINE_CACHE_STALE_SECONDS", 3600.0), 0.0)
+    entry = None
+    stale = refresh = False
+    if ttl > 0:
+        now = time.monotonic()
+        with _EXPLAIN_CACHE_LOCK:
+            entry = _EXPLAIN_CACHE.get(key)
+            if entry is not None and now - entry["stored_at"] >= ttl + stale_window:
+                _drop_explain_cache_entry(key)
+                entry = None
+            if entry is not None:
+                _EXPLAIN_CACHE[key] = _EXPLAIN_CACHE.pop(key)
+                stale = now - entry["stored_at"] >= ttl
+                refresh = stale and not entry["refreshing"]
+                entry["refreshing"] = entry["refreshing"] or refresh
+        _count_cache("explain_wine", hit=entry is not None)
+    if refresh:
+        threading.Thread(target=_refresh_explain_cache_entry, args=(key,), name="explain-refresh", daemon=True).start()
+    if entry is None:
+        return None, "miss"
+    return entry, "stale" if stale else "hit"
+
+
+def _report_response_validators(**values: str) -> None:
+    validators = _RESPONSE_VALIDATORS.get()
+    if validators is not None:
+        validators.update(values)
+
+
+def _compute_explain_cache_entry(key: tuple[str, Optional[int]], store: bool) -> dict[str, Any]:
+    started = _begin_explain_computation()
+    own_writes: dict[tuple[str, str], tuple[int, int]] = {}
+    try:
+        response, cms_payload = _recording_own_cms_writes(own_writes, _explain_wine_with_source, *key)
+        return _store_explain_cache_entry(key, response, cms_payload, started, store, own_writes)
+    finally:
+        _finish_explain_computation()
+
+
+def _recording_own_cms_writes(own_writes: dict[tuple[str, str], tuple[int, int]], compute: Callable[..., Any], *args: Any) -> Any:
+    # The OpenAI write-back stores the very payload this response is built from, so it must not make the entry stale.
+    token = _EXPLAIN_OWN_WRITES.set(own_writes)
+    try:
+        return compute(*args)
+    finally:
+        _EXPLAIN_OWN_WRITES.reset(token)
+
+
+def _begin_explain_computation() -> int:
+    with _EXPLAIN_CACHE_LOCK:
+        _EXPLAIN_CACHE_STATE["computing"] += 1
+        return _EXPLAIN_CACHE_STATE["sequence"]
+
+
+def _finish_explain_computation() -> None:
+    with _EXPLAIN_CACHE_LOCK:
+        _EXPLAIN_CACHE_STATE["computing"] -= 1
+        if not _EXPLAIN_CACHE_STATE["computing"]:
+            # Generations only matter to computations that were running when the write landed.
+            _EXPLAIN_CACHE_GENERATIONS.clear()
+
+
+def _store_explain_cache_entry(
+    key: tuple[str, Optional[int]],
+    response: dict[str, Any],
+    cms_payload: Optional[dict[str, Any]],
+    started: int,
+    store: bool,
+    own_writes: Optional[dict[tuple[str, str], tuple[int, int]]] = None,
+) -> dict[str, Any]:
+    body = json.dumps(response, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    tags = {("slug", _slugify(key[0])), ("name", _fold_cms_name(key[0]))}
+    if cms_payload:
+        if cms_payload.get("slug"):
+            tags.add(("slug", str(cms_payload["slug"])))
+        tags.add(("name", _fold_cms_name(cms_payload.get("name") or cms_payload.get("wine_name"))))
+    entry = {
+        "response": response,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "tags": tags,
+        "stored_at": time.monotonic(),
+        "refreshing": False,
+    }
+    with _EXPLAIN_CACHE_LOCK:
+        # A CMS write to one of this entry's tags that landed mid-computation may not be reflected in it; don't cache it.
+        current = started >= _EXPLAIN_CACHE_STATE["cleared"] and all(
+            _foreign_explain_generation(tag, own_writes or {}) <= started for tag in tags
+        )
+        if store and current:
+            _drop_explain_cache_entry(key)
+            _EXPLAIN_CACHE[key] = entry
+            for tag in tags:
+                _EXPLAIN_CACHE_TAGS.setdefault(tag, set()).add(key)
+            limit = max(_safe_int(os.getenv("EXPLAIN_WINE_CACHE_MAX_ENTRIES"), 10000), 1)
+            while len(_EXPLAIN_CACHE) > limit:
+                _drop_explain_cache_entry(next(iter(_EXPLAIN_CACHE)))
+        elif key in _EXPLAIN_CACHE:
+            _EXPLAIN_CACHE[key]["refreshing"] = False
+    return entry
+
+
+def _refresh_explain_cache_entry(key: tuple[str, Optional[int]]) -> None:
+    try:
+        _single_flight(("explain-wine", *key), lambda: _compute_explain_cache_entry(key, store=True))
+    except Exception:
+        # Keep serving the stale entry; the next request inside the stale window retries.
+        with _EXPLAIN_CACHE_LOCK:
+            if key in _EXPLAIN_CACHE:
+                _EXPLAIN_CACHE[key]["refreshing"] = False
+
+
+def _drop_explain_cache_entry(key: tuple[str, Optional[int]]) -> None:
+    # Caller holds _EXPLAIN_CACHE_LOCK.
+    entry = _EXPLAIN_CACHE.pop(key, None)
+    if entry is None:
+        return
+    for tag in entry["tags"]:
+        keys = _EXPLAIN_CACHE_TAGS.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _EXPLAIN_CACHE_TAGS[tag]
+
+
+def _foreign_explain_generation(tag: tuple[str, str], own_writes: dict[tuple[str, str], tuple[int, int]]) -> int:
+    # Caller holds _EXPLAIN_CACHE_LOCK. The tag's generation, ignoring the computation's own latest write to it.
+    generation = _EXPLAIN_CACHE_GENERATIONS.get(tag, 0)
+    own = own_writes.get(tag)
+    return own[1] if own and own[0] == generation else generation
+
+
+def _invalidate_explain_cache(slug: str, names: tuple[Any, ...]) -> None:
+    """Drop cached responses that were (or could now be) served from the CMS document at this slug."""
+    tags = {("slug", slug), *(("name", _fold_cms_name(name)) for name in names if name)}
+    own_writes = _EXPLAIN_OWN_WRITES.get()
+    with _EXPLAIN_CACHE_LOCK:
+        _EXPLAIN_CACHE_STATE["sequence"] += 1
+        for tag in tags:
+            if _EXPLAIN_CACHE_STATE["computing"]:
+                if own_writes is not None:
+                    own_writes[tag] = (_EXPLAIN_CACHE_STATE["sequence"], _foreign_explain_generation(tag, own_writes))
+                _EXPLAIN_CACHE_GENERATIONS[tag] = _EXPLAIN_CACHE_STATE["sequence"]
+            for key in list(_EXPLAIN_CACHE_TAGS.get(tag, ())):
+                _drop_explain_cache_entry(key)
+
+
+def _clear_explain_cache() -> None:
+    with _EXPLAIN_CACHE_LOCK:
+        _EXPLAIN_CACHE_STATE["sequence"] += 1
+        _EXPLAIN_CACHE_STATE["cleared"] = _EXPLAIN_CACHE_STATE["sequence"]
+        _EXPLAIN_CACHE.clear()
+        _EXPLAIN_CACHE_TAGS.clear()
+        _EXPLAIN_CACHE_GENERATIONS.clear()
+
+
+def _profile_explain_wine(parsed_name: str, parsed_vintage: Optional[int]) -> PlainTextResponse:
+    if (os.getenv("EXPLAIN_WINE_PROFILING") or "").strip().lower() not in {"1", "true", "yes"}:
+        raise HTTPException(status_code=403, detail="Profiling is disabled; set EXPLAIN_WINE_PROFILING=1 to enable it.")
+    if not _PROFILE_LOCK.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="Another profiled request is already running.")
+    try:
+        profiler = cProfile.Profile()
+        # Bypass single-flight so this request does the work it is profiling.
+        profiler.runcall(_explain_wine, parsed_name, parsed_vintage)
+    finally:
+        _PROFILE_LOCK.release()
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(40)
+    return PlainTextResponse(
+        f"Profile of /explain-wine for {parsed_name!r} ({parsed_vintage or 'no vintage'}).\n"
+        "Upstream and weather calls run on worker threads; see the Server-Timing header for their durations.\n"
+        + report.getvalue()
+    )
+
+
+@app.get("/explain-wine/stream")
+def explain_wine_stream(name: str, vintage: Optional[int] = None):
     parsed_name, parsed_vintage = _normalize_wine_query(name=name, vintage=vintage)
-    cms_payload = _fetch_git_cms_wine_data(parsed_name, parsed_vintage)
-    winevybe_payload = _fetch_winevybe_wine_data(parsed_name, parsed_vintage)
-    vinou_payload = _fetch_vinou_wine_data(parsed_name, parsed_vintage)
+    ttl = _env_float("EXPLAIN_WINE_CACHE_TTL_SECONDS", 300.0)
+    entry, status = _lookup_explain_cache((parsed_name, parsed_vintage), ttl)
+    if entry is not None:
+        _report_response_validators(etag=entry["etag"], cache=status)
+        events = _replay_explain_events(entry["response"])
+    else:
+        _report_response_validators(cache="miss")
+        events = _stream_explain_wine(parsed_name, parsed_vintage, store=ttl > 0)
+    return StreamingResponse(events, media_type="application/x-ndjson")
+
+
+def _stream_explain_wine(parsed_name: str, parsed_vintage: Optional[int], store: bool = False) -> Iterator[str]:
+    started = _begin_explain_computation()
+    own_writes: dict[tuple[str, str], tuple[int, int]] = {}
+    try:
+        resolution, weather_prefetch = _recording_own_cms_writes(
+            own_writes, _shared_wine_resolution, parsed_name, parsed_vintage
+        )
+        response = _build_explain_response(parsed_name, parsed_vintage, resolution, growing_season_weather={})
+        yield _ndjson_event("wine", _explain_core_fields(response))
+
+        growing_season_weather = _collect_growing_season_weather(
+            weather_prefetch,
+            resolution["structured"].get("climate_context", {}),
+            parsed_vintage,
+        )
+        response["growing_season_weather"] = growing_season_weather
+        yield _ndjson_event("growing_season_weather", growing_season_weather)
+        yield _ndjson_event("source_highlights", response["source_highlights"])
+        _store_explain_cache_entry(
+            (parsed_name, parsed_vintage), response, resolution["cms_payload"], started, store, own_writes
+        )
+        yield _ndjson_event("done", {})
+    except Exception as exc:
+        error = _as_http_exception(exc)
+        yield _ndjson_event("error", {"status_code": error.status_code, "detail": error.detail})
+    finally:
+        _finish_explain_computation()
+
+
+def _replay_explain_events(response: dict[str, Any]) -> Iterator[str]:
+    # A cached /explain-wine response carries everything the stream sends, in the same event order.
+    yield _ndjson_event("wine", _explain_core_fields(response))
+    yield _ndjson_event("growing_season_weather", response["growing_season_weather"])
+    yield _ndjson_event("source_highlights", response["source_highlights"])
+    yield _ndjson_event("done", {})
+
+
+def _explain_core_fields(response: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in response.items() if key not in ("source_highlights", "growing_season_weather")}
+
+
+@_timed_stage("serialization")
+def _ndjson_event(event: str, data: Any) -> str:
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+@app.post("/explain-wine/batch")
+def explain_wine_batch(payload: dict[str, Any]):
+    items = payload.get("wines")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=422, detail="Request body must include a non-empty 'wines' list.")
+    max_items = int(_env_float("BATCH_MAX_ITEMS", 200))
+    if len(items) > max_items:
+        raise HTTPException(status_code=422, detail=f"Batch requests are limited to {max_items} wines.")
+
+    keys: list[Optional[tuple[str, Optional[int]]]] = []
+    item_errors: dict[int, HTTPException] = {}
+    for index, item in enumerate(items):
+        try:
+            keys.append(_parse_batch_item(item))
+        except HTTPException as exc:
+            keys.append(None)
+            item_errors[index] = exc
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+
+    # Resolve every CMS hit up front so only genuine misses reach the upstream pool.
+    cms_hits = {key: _fetch_git_cms_wine_data(*key) for key in unique_keys}
+
+    concurrency = max(1, int(_env_float("BATCH_CONCURRENCY", 8)))
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+        futures = {
+            key: pool.submit(_resolve_wine_source, key[0], key[1], cms_payload=cms_hits[key])
+            for key in unique_keys
+        }
+        resolutions: dict[tuple[str, Optional[int]], dict[str, Any]] = {}
+        outcomes: dict[tuple[str, Optional[int]], Any] = {}
+        for key, future in futures.items():
+            try:
+                resolutions[key] = future.result()
+            except Exception as exc:
+                outcomes[key] = _as_http_exception(exc)
+        weather = _build_batch_growing_season_weather(pool, resolutions)
+
+    for key, resolution in resolutions.items():
+        if isinstance(weather[key], HTTPException):
+            outcomes[key] = weather[key]
+        else:
+            outcomes[key] = _build_explain_response(key[0], key[1], resolution, weather[key])
+
+    results = []
+    for index, key in enumerate(keys):
+        outcome = item_errors[index] if key is None else outcomes[key]
+        if isinstance(outcome, HTTPException):
+            results.append(
+                {
+                    "index": index,
+                    "status": "error",
+                    "error": {"status_code": outcome.status_code, "detail": outcome.detail},
+                }
+            )
+        else:
+            results.append({"index": index, "status": "ok", "result": outcome})
+    return {"count": len(results), "results": results}
+
+
+def _parse_batch_item(item: Any) -> tuple[str, Optional[int]]:
+    if isinstance(item, str):
+        name, vintage = item, None
+    elif isinstance(item, dict):
+        name, vintage = item.get("name"), item.get("vintage")
+    else:
+        raise HTTPException(status_code=422, detail="Each batch entry must be a wine name or a {name, vintage} object.")
+
+    if not isinstance(name, str):
+        raise HTTPException(status_code=422, detail="Wine name cannot be empty.")
+    if vintage in (None, ""):
+        vintage = None
+    else:
+        try:
+            vintage = int(vintage)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=422, detail="Vintage must be a year.")
+    return _normalize_wine_query(name=name, vintage=vintage)
+
+
+def _as_http_exception(exc: Exception) -> HTTPException:
+    if isinstance(exc, HTTPException):
+        return exc
+    return HTTPException(status_code=500, detail=f"Lookup failed: {repr(exc)}")
+
+
+def _build_batch_growing_season_weather(
+    pool: ThreadPoolExecutor,
+    resolutions: dict[tuple[str, Optional[int]], dict[str, Any]],
+) -> dict[tuple[str, Optional[int]], Any]:
+    weather: dict[tuple[str, Optional[int]], Any] = {}
+    plans: dict[tuple[str, Optional[int]], dict[str, Any]] = {}
+    groups: dict[tuple[str, str], list[tuple[str, Optional[int]]]] = {}
+    for key, resolution in resolutions.items():
+        plan = _plan_growing_season_weather(resolution["structured"].get("climate_context", {}), key[1])
+        if "error" in plan:
+            weather[key] = plan
+            continue
+        plans[key] = plan
+        groups.setdefault((f"{plan['latitude']:.2f}", f"{plan['longitude']:.2f}"), []).append(key)
+
+    # One Open-Meteo history per shared location, wide enough for every vintage in the group.
+    histories = {
+        coordinates: pool.submit(
+            _fetch_open_meteo_history,
+            latitude=plans[members[0]]["latitude"],
+            longitude=plans[members[0]]["longitude"],
+            start_date=f"{min(plans[key]['start_year'] for key in members):04d}-01-01",
+            end_date=f"{max(plans[key]['end_year'] for key in members):04d}-12-31",
+        )
+        for coordinates, members in groups.items()
+    }
+    for coordinates, members in groups.items():
+        try:
+            daily = histories[coordinates].result()
+        except Exception as exc:
+            for key in members:
+                weather[key] = _as_http_exception(exc)
+            continue
+        for key in members:
+            weather[key] = _build_growing_season_weather(
+                resolutions[key]["structured"].get("climate_context", {}),
+                key[1],
+                daily=daily,
+            )
+    return weather
+
+
+def _explain_wine(parsed_name: str, parsed_vintage: Optional[int]) -> dict[str, Any]:
+    return _explain_wine_with_source(parsed_name, parsed_vintage, shared=False)[0]
+
+
+def _explain_wine_with_source(
+    parsed_name: str, parsed_vintage: Optional[int], shared: bool = True
+) -> tuple[dict[str, Any], Optional[dict[str, Any]]]:
+    if shared:
+        resolution, weather_prefetch = _shared_wine_resolution(parsed_name, parsed_vintage)
+    else:
+        resolution, weather_prefetch = _resolve_wine_with_weather(parsed_name, parsed_vintage)
+    growing_season_weather = _collect_growing_season_weather(
+        weather_prefetch,
+        resolution["structured"].get("climate_context", {}),
+        parsed_vintage,
+    )
+    response = _build_explain_response(parsed_name, parsed_vintage, resolution, growing_season_weather)
+    return response, resolution["cms_payload"]
+
+
+def _shared_wine_resolution(parsed_name: str, parsed_vintage: Optional[int]) -> tuple[dict[str, Any], dict[str, Future]]:
+    # /explain-wine and /explain-wine/stream join one lookup per wine; followers wait on the same weather futures.
+    return _single_flight(
+        ("wine-source", parsed_name, parsed_vintage),
+        lambda: _resolve_wine_with_weather(parsed_name, parsed_vintage),
+    )
+
+
+def _resolve_wine_with_weather(parsed_name: str, parsed_vintage: Optional[int]) -> tuple[dict[str, Any], dict[str, Future]]:
+    weather_prefetch: dict[str, Future] = {}
+    resolution = _resolve_wine_source(
+        parsed_name,
+        parsed_vintage,
+        cms_payload=_fetch_git_cms_wine_data(parsed_name, parsed_vintage),
+        weather_prefetch=weather_prefetch,
+    )
+    return resolution, weather_prefetch
+
+
+def _resolve_wine_source(
+    parsed_name: str,
+    parsed_vintage: Optional[int],
+    cms_payload: Optional[dict[str, Any]],
+    weather_prefetch: Optional[dict[str, Future]] = None,
+) -> dict[str, Any]:
+    eager = _source_cascade_mode() == "eager"
+    queried_sources = {"git_cms"}
+    pending_sources: set[str] = set()
+    circuit_open_sources: set[str] = set()
+    winevybe_payload = None
+    vinou_payload = None
+    if cms_payload and eager and weather_prefetch is not None:
+        _prefetch_growing_season_weather(
+            weather_prefetch,
+            _normalize_git_cms_payload(cms_payload).get("climate_context", {}),
+            parsed_vintage,
+        )
+    if eager or not cms_payload:
+        upstream_payloads = _fetch_upstream_payloads(
+            parsed_name,
+            parsed_vintage,
+            deadline=_env_float("UPSTREAM_DEADLINE_SECONDS", 12.0),
+            wait_for_all=eager,
+            on_payload=None if cms_payload or weather_prefetch is None else lambda source, payload: _prefetch_growing_season_weather(
+                weather_prefetch,
+                _upstream_normalizer(source)(payload).get("climate_context", {}),
+                parsed_vintage,
+            ),
+            circuit_open=circuit_open_sources,
+        )
+        queried_sources.update(source for source in upstream_payloads if source not in circuit_open_sources)
+        pending_sources.update(source for source in _UPSTREAM_SOURCES if source not in upstream_payloads)
+        winevybe_payload = upstream_payloads.get("winevybe")
+        vinou_payload = upstream_payloads.get("vinou")
 
     if cms_payload:
         source = "git_cms"
@@ -107,12 +932,29 @@ def explain_wine(name: str, vintage: Optional[int] = None):
     else:
         source = "openai"
         structured = _fetch_openai_payload(parsed_name, parsed_vintage)
+        _store_openai_payload_in_cms(parsed_name, parsed_vintage, structured)
 
-    growing_season_weather = _build_growing_season_weather(
-        climate_context=structured.get("climate_context", {}),
-        selected_vintage=parsed_vintage,
-    )
+    return {
+        "source": source,
+        "structured": structured,
+        "cms_payload": cms_payload,
+        "winevybe_payload": winevybe_payload,
+        "vinou_payload": vinou_payload,
+        "queried_sources": queried_sources,
+        "pending_sources": pending_sources,
+        "circuit_open_sources": circuit_open_sources,
+    }
 
+
+def _build_explain_response(
+    parsed_name: str,
+    parsed_vintage: Optional[int],
+    resolution: dict[str, Any],
+    growing_season_weather: dict[str, Any],
+) -> dict[str, Any]:
+    source = resolution["source"]
+    structured = resolution["structured"]
+    cms_payload = resolution["cms_payload"]
     return {
         "wine": parsed_name,
         "vintage": parsed_vintage,
@@ -121,8 +963,12 @@ def explain_wine(name: str, vintage: Optional[int] = None):
         "vintage_intelligence": structured.get("vintage_intelligence", {}),
         "growing_season_weather": growing_season_weather,
         "uncertainty_notes": structured.get("uncertainty_notes", []),
+        "ratings": _select_rating_stats(structured.get("ratings"), parsed_vintage),
         "data_source": source,
         "data_source_note": (
+            "Core wine details were served from the Git-based CMS copy of an earlier OpenAI generation."
+            if source == "git_cms" and cms_payload.get("source") == "openai"
+            else
             "Core wine details were sourced from the local Git-based CMS."
             if source == "git_cms"
             else
@@ -134,30 +980,67 @@ def explain_wine(name: str, vintage: Optional[int] = None):
             else "Vinou data was unavailable; details were generated by OpenAI."
         ),
         "source_highlights": _build_source_highlights(
-            winevybe_payload=winevybe_payload,
-            vinou_payload=vinou_payload,
+            winevybe_payload=resolution["winevybe_payload"],
+            vinou_payload=resolution["vinou_payload"],
             cms_payload=cms_payload,
             source=source,
             structured=structured,
+            queried_sources=resolution["queried_sources"],
+            pending_sources=resolution["pending_sources"],
+            circuit_open_sources=resolution.get("circuit_open_sources"),
         ),
         "raw_openai_payload": structured,
     }
 
 
 @app.get("/cms/wines")
-def list_cms_wines():
-    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+def list_cms_wines(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    region: Optional[str] = None,
+    wine_type: Optional[str] = None,
+    producer: Optional[str] = None,
+    vintage_from: Optional[int] = None,
+    vintage_to: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=422, detail="limit must be between 1 and 1000.")
+    filters = {
+        field: _normalize_cms_name(value)
+        for field, value in (("region", region), ("wine_type", wine_type), ("producer", producer))
+        if value and value.strip()
+    }
+    projection = [field.strip() for field in (fields or "").split(",") if field.strip()]
+
+    slugs, next_cursor = _page_cms_slugs(filters, vintage_from, vintage_to, cursor, limit)
     wines: list[dict[str, Any]] = []
-    for item in sorted(CMS_WINES_DIR.glob("*.json")):
-        payload = _load_json_file(item)
-        if payload:
-            wines.append(payload)
-    return {"count": len(wines), "wines": wines}
+    for slug in slugs:
+        payload = _load_cms_document(slug)
+        if not payload:
+            _unindex_cms_wine(slug)
+            continue
+        if projection:
+            payload = {"slug": payload.get("slug") or slug, **{field: payload.get(field) for field in projection}}
+        wines.append(payload)
+    return {"count": len(wines), "wines": wines, "next_cursor": next_cursor}
+
+
+@app.get("/cms/search")
+def search_cms_wines(q: str, limit: int = 20):
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=422, detail="limit must be between 1 and 100.")
+    match = _cms_search_expression(q)
+    if not match:
+        raise HTTPException(status_code=422, detail="Search query must contain at least one word.")
+    results = _search_cms(match, limit)
+    return {"query": q, "count": len(results), "results": results}
 
 
 @app.get("/cms/wines/{slug}")
 def get_cms_wine(slug: str):
-    payload = _load_json_file(_cms_wine_path(slug))
+    _ensure_cms_index()
+    payload = _load_cms_document(slug)
     if not payload:
         raise HTTPException(status_code=404, detail="Wine entry not found in CMS.")
     return payload
@@ -171,28 +1054,142 @@ def upsert_cms_wine(slug: str, payload: dict[str, Any]):
     return {"status": "saved", "slug": slug, "wine": normalized}
 
 
+@app.post("/cms/pack")
+def pack_cms_wines():
+    return {"status": "packed", **_build_cms_pack()}
+
+
 @app.post("/cms/import/x-wines")
-def import_x_wines(limit: int = 500):
-    repo_url = "https://github.com/rogerioxavier/X-Wines.git"
-    imported = _import_x_wines_dataset(repo_url=repo_url, limit=limit)
+def import_x_wines(limit: int = 500, full: bool = False):
+    # Imports share the dataset checkout and the sync state file, so only one may run at a time.
+    if not _IMPORT_RUN_LOCK.acquire(blocking=False):
+        raise _import_already_running()
+    try:
+        imported = _import_x_wines_dataset(repo_url=XWINES_REPO_URL, limit=limit, full=full)
+    finally:
+        _IMPORT_RUN_LOCK.release()
     return {
         "status": "ok",
-        "source": repo_url,
+        "source": XWINES_REPO_URL,
         "imported": imported,
     }
 
 
+@app.post("/cms/import/x-wines/jobs", status_code=202)
+def start_x_wines_import_job(limit: Optional[int] = None, full: bool = False):
+    # Taken here and released by the job thread, so no other import can slip in before the job starts.
+    if not _IMPORT_RUN_LOCK.acquire(blocking=False):
+        raise _import_already_running()
+    with _IMPORT_JOBS_LOCK:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "source": XWINES_REPO_URL,
+            "limit": limit,
+            "full": full,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _IMPORT_JOBS[job["job_id"]] = job
+        _prune_import_jobs()
+    try:
+        threading.Thread(target=_run_x_wines_import_job, args=(job,), name=f"import-{job['job_id'][:8]}", daemon=True).start()
+    except BaseException:
+        _IMPORT_RUN_LOCK.release()
+        raise
+    return _import_job_status(job)
+
+
+def _prune_import_jobs() -> None:
+    # Caller holds _IMPORT_JOBS_LOCK. Keeps the IMPORT_JOBS_RETAINED most recent jobs; a running job is never dropped.
+    retained = max(_safe_int(os.getenv("IMPORT_JOBS_RETAINED"), 50), 1)
+    finished = [job_id for job_id, job in _IMPORT_JOBS.items() if job["status"] in {"succeeded", "failed"}]
+    for job_id in finished[: max(len(_IMPORT_JOBS) - retained, 0)]:
+        del _IMPORT_JOBS[job_id]
+
+
+def _import_already_running() -> HTTPException:
+    with _IMPORT_JOBS_LOCK:
+        running = [job for job in _IMPORT_JOBS.values() if job["status"] in {"queued", "running"}]
+    if running:
+        return HTTPException(status_code=409, detail=f"Import job {running[0]['job_id']} is already running.")
+    return HTTPException(status_code=409, detail="An X-Wines import is already running.")
+
+
+@app.get("/cms/import/jobs/{job_id}")
+def get_import_job(job_id: str):
+    job = _IMPORT_JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found.")
+    return _import_job_status(job)
+
+
+def _run_x_wines_import_job(job: dict[str, Any]) -> None:
+    job["status"] = "running"
+    job["started_monotonic"] = time.monotonic()
+    job["started_at"] = datetime.now(timezone.utc).isoformat()
+    try:
+        _import_x_wines_dataset(repo_url=job["source"], limit=job["limit"], progress=job, full=job["full"])
+    except HTTPException as exc:
+        outcome = {"status": "failed", "error": exc.detail}
+    except Exception as exc:
+        outcome = {"status": "failed", "error": repr(exc)}
+    else:
+        outcome = {"status": "succeeded"}
+    finally:
+        # Released before the final status is published, so a client that sees it can start the next import.
+        _IMPORT_RUN_LOCK.release()
+    job.update(outcome, finished_monotonic=time.monotonic(), finished_at=datetime.now(timezone.utc).isoformat())
+
+
+def _import_job_status(job: dict[str, Any]) -> dict[str, Any]:
+    started = job.get("started_monotonic")
+    elapsed = ((job.get("finished_monotonic") or time.monotonic()) - started) if started else 0.0
+    rows_read = job.get("rows_read", 0)
+    bytes_total = job.get("bytes_total") or 0
+    fractions = [job.get("bytes_read", 0) / bytes_total] if bytes_total else []
+    if job.get("limit") and job.get("mode") != "incremental":
+        fractions.append(job.get("imported", 0) / max(1, job["limit"]))
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "source": job["source"],
+        "limit": job["limit"],
+        "dataset_file": job.get("dataset_file"),
+        "mode": job.get("mode"),
+        "since_commit": job.get("since_commit"),
+        "synced_commit": job.get("synced_commit"),
+        "created_at": job["created_at"],
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at"),
+        "rows_read": rows_read,
+        "imported": job.get("imported", 0),
+        "skipped": job.get("skipped", 0),
+        "written": job.get("written", 0),
+        "unchanged": job.get("unchanged", 0),
+        "ratings_rows": job.get("ratings_rows", 0),
+        "ratings_skipped": job.get("ratings_skipped", 0),
+        "ratings_attached": job.get("ratings_attached", 0),
+        "error_count": job.get("error_count", 0),
+        "errors": list(job.get("errors", [])),
+        "error": job.get("error"),
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed > 0 else 0.0,
+        "progress": 1.0 if job["status"] == "succeeded" else round(min(1.0, max(fractions, default=0.0)), 4),
+    }
+
+
 def _normalize_git_cms_payload(payload: Optional[dict[str, Any]]) -> dict[str, Any]:
     if not payload:
         return {}
 
     tasting = payload.get("tasting_profile") or {}
     drinking = payload.get("drinking_experience") or {}
+    stored_breakdown = payload.get("description_breakdown")
     return {
         "wine_name": payload.get("wine_name") or payload.get("name"),
         "requested_vintage": payload.get("vintage"),
         "summary": payload.get("summary") or "Git CMS entry with no summary.",
-        "description_breakdown": {
+        "description_breakdown": stored_breakdown if isinstance(stored_breakdown, dict) and stored_breakdown else {
             "producer_and_region": f"{payload.get('producer') or 'Not disclosed'}, {payload.get('region') or 'Not disclosed'}",
             "grape_composition_and_style": payload.get("grape_composition") or payload.get("grapes") or "Not disclosed",
             "tasting_profile": {
@@ -217,9 +1214,11 @@ def _normalize_git_cms_payload(payload: Optional[dict[str, Any]]) -> dict[str, A
         "abv": payload.get("abv"),
         "availability_status": payload.get("availability_status"),
         "comparable_wines": payload.get("comparable_wines"),
+        "ratings": payload.get("ratings"),
     }
 
 
+@_timed_stage("openai")
 def _fetch_openai_payload(parsed_name: str, parsed_vintage: Optional[int]) -> dict[str, Any]:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -335,10 +1334,157 @@ def _load_json_file(path: Path) -> Optional[dict[str, Any]]:
     return payload if isinstance(payload, dict) else None
 
 
-def _write_cms_wine(slug: str, payload: dict[str, Any]) -> None:
+def _write_cms_wine(
+    slug: str, payload: dict[str, Any], search_changes: Optional[dict[str, Optional[dict[str, Any]]]] = None
+) -> None:
+    # Bulk writers pass `search_changes` and apply it in one transaction per batch via _apply_cms_search_changes.
     CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    _drop_from_cms_pack(slug)
+    with _CMS_INDEX_LOCK:
+        previous_name = _CMS_SLUG_KEYS.get(slug, ("", None))[0]
     with _cms_wine_path(slug).open("w", encoding="utf-8") as handle:
         json.dump(payload, handle, ensure_ascii=False, indent=2)
+    # Again after the write: a repack published in between may have packed the old bytes under the old stat.
+    _drop_from_cms_pack(slug)
+    _index_cms_wine(slug, payload)
+    if search_changes is None:
+        _index_cms_search(slug, payload)
+    else:
+        search_changes[slug] = payload
+    _record_cms_file_stat(slug)
+    _invalidate_explain_cache(slug, (previous_name, payload.get("name") or payload.get("wine_name")))
+
+
+def _cms_pack_paths() -> tuple[Path, Path]:
+    return CMS_WINES_DIR.parent / "wines.pack", CMS_WINES_DIR.parent / "wines.pack.index.json"
+
+
+def _load_cms_document(slug: str) -> Optional[dict[str, Any]]:
+    with _CMS_PACK_LOCK:
+        span = _CMS_PACK.get("offsets", {}).get(slug)
+        raw = _CMS_PACK["mmap"][span[0]:span[0] + span[1]] if span else None
+    if raw is not None:
+        return json.loads(raw)
+    return _load_json_file(_cms_wine_path(slug))
+
+
+def _drop_from_cms_pack(slug: str) -> None:
+    with _CMS_PACK_LOCK:
+        _CMS_PACK.get("offsets", {}).pop(slug, None)
+        for dropped in _CMS_PACK_PENDING_DROPS:
+            dropped.add(slug)
+
+
+def _build_cms_pack() -> dict[str, Any]:
+    """Regenerate the packed store (one compact JSON document per line plus an offset index) from cms/wines/*.json.
+
+    Each index entry records the source file's mtime and size, so entries whose file has since
+    changed or disappeared are ignored when the pack is opened and those reads go to the file.
+    """
+    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    with _CMS_PACK_WRITE_LOCK:
+        return _write_cms_pack()
+
+
+def _write_cms_pack() -> dict[str, Any]:
+    # Caller holds _CMS_PACK_WRITE_LOCK; readers keep using the previous pack until _open_cms_pack swaps it.
+    pack_path, index_path = _cms_pack_paths()
+    tmp_path = pack_path.with_name(f".{pack_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    documents: dict[str, list[int]] = {}
+    offset = 0
+    with tmp_path.open("wb") as handle:
+        for entry in sorted(os.scandir(CMS_WINES_DIR), key=lambda item: item.name):
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            payload = _load_json_file(Path(entry.path))
+            if not payload:
+                continue
+            line = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            handle.write(line + b"\n")
+            documents[entry.name[: -len(".json")]] = [offset, len(line), stat.st_mtime_ns, stat.st_size]
+            offset += len(line) + 1
+
+    os.replace(tmp_path, pack_path)
+    _write_json_atomic(
+        index_path,
+        {"version": 1, "generated_at": datetime.now(timezone.utc).isoformat(), "documents": documents},
+    )
+    _open_cms_pack()
+    return {"documents": len(documents), "bytes": offset}
+
+
+def _schedule_cms_pack_rebuild() -> bool:
+    """Repack in the background once enough documents have fallen out of the pack.
+
+    Rewritten documents are already read from their files, so a small sync does not need an O(corpus) repack;
+    only when more than CMS_PACK_REBUILD_RATIO of the corpus bypasses the pack is it worth regenerating.
+    """
+    if not _cms_pack_paths()[0].exists():
+        return False
+    with _CMS_PACK_LOCK:
+        packed = len(_CMS_PACK.get("offsets", ()))
+    with _CMS_INDEX_LOCK:
+        corpus = len(_CMS_SLUG_KEYS)
+    if corpus - packed <= corpus * max(_env_float("CMS_PACK_REBUILD_RATIO", 0.05), 0.0):
+        return False
+    if not _CMS_PACK_REBUILD_LOCK.acquire(blocking=False):
+        return False
+
+    def rebuild() -> None:
+        try:
+            _build_cms_pack()
+        except OSError:
+            pass
+        finally:
+            _CMS_PACK_REBUILD_LOCK.release()
+
+    threading.Thread(target=rebuild, name="cms-repack", daemon=True).start()
+    return True
+
+
+def _open_cms_pack() -> None:
+    # Validate against the corpus before taking _CMS_PACK_LOCK, which is only held for the swap.
+    # Writes that land while it runs are recorded in `dropped` and evicted from the new pack at the swap.
+    pack: dict[str, Any] = {}
+    dropped: set[str] = set()
+    with _CMS_PACK_LOCK:
+        _CMS_PACK_PENDING_DROPS.append(dropped)
+    try:
+        pack_path, index_path = _cms_pack_paths()
+        index = _load_json_file(index_path)
+        if index and index.get("version") == 1 and pack_path.exists() and pack_path.stat().st_size:
+            pack = _map_cms_pack(pack_path, index)
+    except BaseException:
+        with _CMS_PACK_LOCK:
+            _CMS_PACK_PENDING_DROPS.remove(dropped)
+        raise
+    with _CMS_PACK_LOCK:
+        _CMS_PACK_PENDING_DROPS.remove(dropped)
+        for slug in dropped:
+            pack.get("offsets", {}).pop(slug, None)
+        previous = dict(_CMS_PACK)
+        _CMS_PACK.clear()
+        _CMS_PACK.update(pack)
+    if previous.get("mmap") is not None:
+        previous["mmap"].close()
+        previous["handle"].close()
+
+
+def _map_cms_pack(pack_path: Path, index: dict[str, Any]) -> dict[str, Any]:
+    sources = {
+        entry.name[: -len(".json")]: entry.stat()
+        for entry in os.scandir(CMS_WINES_DIR)
+        if entry.name.endswith(".json") and entry.is_file()
+    }
+    offsets = {}
+    for slug, (offset, length, mtime_ns, size) in (index.get("documents") or {}).items():
+        stat = sources.get(slug)
+        if stat and stat.st_mtime_ns == mtime_ns and stat.st_size == size:
+            offsets[slug] = (offset, length)
+
+    handle = pack_path.open("rb")
+    return {"handle": handle, "mmap": mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ), "offsets": offsets}
 
 
 def _normalize_cms_document(payload: dict[str, Any]) -> dict[str, Any]:
@@ -352,123 +1498,1293 @@ def _normalize_cms_document(payload: dict[str, Any]) -> dict[str, Any]:
     return normalized
 
 
+@_timed_stage("cms_lookup")
 def _fetch_git_cms_wine_data(name: str, vintage: Optional[int]) -> Optional[dict[str, Any]]:
+    payload = _find_git_cms_wine(name, vintage)
+    _count_cache("cms", hit=payload is not None)
+    return payload
+
+
+def _find_git_cms_wine(name: str, vintage: Optional[int]) -> Optional[dict[str, Any]]:
     CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    _ensure_cms_index()
     requested_slug = _slugify(name)
-    payload = _load_json_file(_cms_wine_path(requested_slug))
-    if payload and _matches_vintage(payload, vintage):
+    payload = _load_cms_document(requested_slug)
+    if payload and _matches_vintage(payload, vintage) and not _is_expired_cms_document(payload):
         return payload
 
-    for item in CMS_WINES_DIR.glob("*.json"):
-        candidate = _load_json_file(item)
+    requested_name = _normalize_cms_name(name)
+    payload = _load_indexed_cms_wine(requested_name, vintage)
+    if payload:
+        return payload
+
+    # Accent/typo variants ("Chateau Margeaux") are still cheaper to serve locally than from a paid upstream.
+    threshold = min(_env_float("CMS_FUZZY_MATCH_THRESHOLD", 0.6), 1.0)
+    if threshold <= 0:
+        return None
+    for candidate_name in _fuzzy_cms_names(name, threshold):
+        if candidate_name != requested_name:
+            payload = _load_indexed_cms_wine(candidate_name, vintage)
+            if payload:
+                return payload
+    return None
+
+
+def _load_indexed_cms_wine(requested_name: str, vintage: Optional[int]) -> Optional[dict[str, Any]]:
+    for slug in _lookup_cms_index(requested_name, vintage):
+        candidate = _load_cms_document(slug)
         if not candidate:
+            _unindex_cms_wine(slug)
             continue
-        candidate_name = str(candidate.get("name") or candidate.get("wine_name") or "").strip().lower()
-        if candidate_name == name.strip().lower() and _matches_vintage(candidate, vintage):
+        if _normalize_cms_name(candidate.get("name") or candidate.get("wine_name")) == requested_name and _matches_vintage(candidate, vintage):
+            if _is_expired_cms_document(candidate):
+                continue
             return candidate
+        _index_cms_wine(slug, candidate)
     return None
 
 
-def _matches_vintage(payload: dict[str, Any], requested: Optional[int]) -> bool:
-    if requested is None:
+def _is_expired_cms_document(payload: dict[str, Any]) -> bool:
+    if payload.get("source") != "openai" or not payload.get("expires_at"):
+        return False
+    try:
+        expires_at = datetime.fromisoformat(str(payload["expires_at"]))
+    except ValueError:
         return True
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _store_openai_payload_in_cms(name: str, vintage: Optional[int], structured: dict[str, Any]) -> None:
+    ttl_days = _env_float("OPENAI_CMS_TTL_DAYS", 30.0)
+    if ttl_days <= 0 or not structured:
+        return
+
+    slug = _slugify(f"{name}-{vintage or 'nv'}")
+    existing = _load_json_file(_cms_wine_path(slug))
+    if existing and existing.get("source") != "openai":
+        # Never overwrite curated or imported entries with generated content.
+        return
+
+    generated_at = datetime.now(timezone.utc)
+    climate_context = structured.get("climate_context") if isinstance(structured.get("climate_context"), dict) else {}
+    document = _normalize_cms_document(
+        {
+            **({"created_at": existing["created_at"]} if existing and existing.get("created_at") else {}),
+            "name": name,
+            "wine_name": name,
+            "vintage": vintage,
+            "region": climate_context.get("region"),
+            "summary": structured.get("summary"),
+            "description_breakdown": structured.get("description_breakdown") or {},
+            "vintage_intelligence": structured.get("vintage_intelligence") or {},
+            "climate_context": climate_context,
+            "uncertainty_notes": structured.get("uncertainty_notes") or [],
+            "source": "openai",
+            "model": "gpt-4.1-mini",
+            "generated_at": generated_at.isoformat(),
+            "ttl_days": ttl_days,
+            "expires_at": (generated_at + timedelta(days=ttl_days)).isoformat(),
+        }
+    )
+    document["slug"] = slug
     try:
-        return int(payload.get("vintage")) == requested
-    except (TypeError, ValueError):
-        return False
+        _write_cms_wine(slug, document)
+    except OSError:
+        return
 
 
-def _import_x_wines_dataset(repo_url: str, limit: int) -> int:
-    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
-    XWINES_CLONE_DIR.parent.mkdir(parents=True, exist_ok=True)
-    if XWINES_CLONE_DIR.exists():
-        subprocess.run(["git", "-C", str(XWINES_CLONE_DIR), "pull", "--ff-only"], check=False)
-    else:
-        subprocess.run(["git", "clone", "--depth", "1", repo_url, str(XWINES_CLONE_DIR)], check=False)
+def _normalize_cms_name(value: Any) -> str:
+    return str(value or "").strip().lower()
 
-    dataset_file = _find_x_wines_dataset_file(XWINES_CLONE_DIR)
-    if not dataset_file:
-        raise HTTPException(status_code=502, detail="X-Wines repository cloned but no supported dataset file was found.")
 
-    records = _load_x_wines_records(dataset_file)
-    imported = 0
-    for record in records:
-        if imported >= max(1, limit):
-            break
-        mapped = _map_x_wines_record(record)
-        if not mapped:
-            continue
-        slug = _slugify(f"{mapped.get('name', 'wine')}-{mapped.get('vintage') or 'nv'}")
-        existing = _load_json_file(_cms_wine_path(slug)) or {}
-        merged = _normalize_cms_document({**existing, **mapped, "source": "x-wines"})
-        merged["slug"] = slug
-        _write_cms_wine(slug, merged)
-        imported += 1
-    return imported
+def _fold_cms_name(value: Any) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(value or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"[^\W_]+", stripped.casefold()))
 
 
-def _find_x_wines_dataset_file(repo_dir: Path) -> Optional[Path]:
-    candidates = [
-        *repo_dir.glob("*.json"),
-        *repo_dir.glob("*.csv"),
-        *repo_dir.glob("data/*.json"),
-        *repo_dir.glob("data/*.csv"),
-        *repo_dir.glob("dataset/*.json"),
-        *repo_dir.glob("dataset/*.csv"),
-    ]
-    for file in candidates:
-        if "wine" in file.name.lower():
-            return file
-    return candidates[0] if candidates else None
+def _name_trigrams(folded: str) -> frozenset[str]:
+    # Words are padded like pg_trgm ("  word "), so shared prefixes weigh more than shared endings.
+    # Numbers are kept whole ("#389"): "Bin 389" and "Bin 407" are different wines, not typos of each other.
+    trigrams = set()
+    for word in folded.split():
+        if word.isdigit():
+            trigrams.add(f"#{word}")
+            continue
+        padded = f"  {word} "
+        trigrams.update(padded[idx : idx + 3] for idx in range(len(padded) - 2))
+    return frozenset(trigrams)
 
 
-def _load_x_wines_records(dataset_file: Path) -> list[dict[str, Any]]:
-    suffix = dataset_file.suffix.lower()
-    if suffix == ".json":
-        with dataset_file.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-        if isinstance(payload, list):
-            return [item for item in payload if isinstance(item, dict)]
-        if isinstance(payload, dict):
-            if isinstance(payload.get("data"), list):
-                return [item for item in payload["data"] if isinstance(item, dict)]
-            return [payload]
-        return []
+def _fuzzy_cms_names(name: str, threshold: float) -> list[str]:
+    """Indexed names whose folded trigram sets have Jaccard similarity >= threshold with `name`, best first.
 
-    if suffix == ".csv":
-        lines = dataset_file.read_text(encoding="utf-8").splitlines()
-        if not lines:
+    Candidates must carry exactly the query's numbers. Otherwise a match shares at least
+    ceil(threshold * |query|) trigrams with the query, so it contains one of the |query| - that + 1
+    rarest query trigrams; only those posting lists are scanned.
+    """
+    _ensure_cms_index()
+    query = _name_trigrams(_fold_cms_name(name))
+    if not query:
+        return []
+    numbers = {trigram for trigram in query if trigram.startswith("#")}
+    required = max(1, math.ceil(threshold * len(query) - 1e-9))
+    scored = []
+    with _CMS_INDEX_LOCK:
+        if numbers:
+            candidates = set.intersection(*(_CMS_TRIGRAM_INDEX.get(number, set()) for number in numbers))
+        else:
+            postings = sorted((_CMS_TRIGRAM_INDEX.get(trigram, ()) for trigram in query), key=len)[: len(query) - required + 1]
+            if len(postings[-1]) > _CMS_FUZZY_MAX_CANDIDATES:
+                # Only common words survive the typo ("Chateau Cuvée"); too ambiguous to pick one wine.
+                return []
+            candidates = set().union(*postings)
+        for folded in candidates:
+            trigrams = _CMS_FOLDED_TRIGRAMS[folded]
+            if {trigram for trigram in trigrams if trigram.startswith("#")} != numbers:
+                continue
+            shared = len(query & trigrams)
+            similarity = shared / (len(query) + len(trigrams) - shared)
+            if similarity >= threshold:
+                scored.append((-similarity, folded))
+        scored.sort()
+        return [match for _, folded in scored for match in sorted(_CMS_FOLDED_NAMES[folded])]
+
+
+def _add_to_fuzzy_index(name: str) -> None:
+    folded = _fold_cms_name(name)
+    if not folded:
+        return
+    names = _CMS_FOLDED_NAMES.setdefault(folded, set())
+    if not names:
+        trigrams = _CMS_FOLDED_TRIGRAMS[folded] = _name_trigrams(folded)
+        for trigram in trigrams:
+            _CMS_TRIGRAM_INDEX.setdefault(trigram, set()).add(folded)
+    names.add(name)
+
+
+def _remove_from_fuzzy_index(name: str) -> None:
+    folded = _fold_cms_name(name)
+    names = _CMS_FOLDED_NAMES.get(folded)
+    if names is None:
+        return
+    names.discard(name)
+    if names:
+        return
+    del _CMS_FOLDED_NAMES[folded]
+    for trigram in _CMS_FOLDED_TRIGRAMS.pop(folded, ()):
+        _discard_from_posting(_CMS_TRIGRAM_INDEX, trigram, folded)
+
+
+def _cms_index_key(payload: dict[str, Any]) -> tuple[str, Optional[int]]:
+    try:
+        vintage = int(payload.get("vintage"))
+    except (TypeError, ValueError):
+        vintage = None
+    return _normalize_cms_name(payload.get("name") or payload.get("wine_name")), vintage
+
+
+def _ensure_cms_index() -> None:
+    global _CMS_INDEX_READY
+    if _CMS_INDEX_READY:
+        return
+    with _CMS_INDEX_LOCK:
+        if _CMS_INDEX_READY:
+            return
+        CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+        _CMS_NAME_INDEX.clear()
+        _CMS_SLUG_KEYS.clear()
+        _CMS_SLUG_FACETS.clear()
+        _CMS_FACET_INDEX.clear()
+        _CMS_VINTAGE_INDEX.clear()
+        _CMS_SORTED_VIEWS.clear()
+        _CMS_TRIGRAM_INDEX.clear()
+        _CMS_FOLDED_NAMES.clear()
+        _CMS_FOLDED_TRIGRAMS.clear()
+        _open_cms_pack()
+        with _CMS_SEARCH_LOCK:
+            # Documents may have changed behind the index's back; resync search on its next use.
+            _CMS_SEARCH["stale"] = True
+        # Stat before reading: the watcher treats these as what the indexes reflect, so a file changed
+        # mid-build is re-applied rather than missed.
+        stats = _cms_file_stats_on_disk()
+        for slug in stats:
+            payload = _load_cms_document(slug)
+            if payload:
+                _add_to_cms_index(slug, payload)
+        with _CMS_WATCHER_LOCK:
+            _CMS_FILE_STATS.clear()
+            _CMS_FILE_STATS.update(stats)
+        _CMS_INDEX_READY = True
+
+
+def _lookup_cms_index(name: str, vintage: Optional[int]) -> list[str]:
+    _ensure_cms_index()
+    with _CMS_INDEX_LOCK:
+        by_vintage = _CMS_NAME_INDEX.get(name)
+        if not by_vintage:
             return []
-        headers = [part.strip() for part in lines[0].split(",")]
-        rows: list[dict[str, Any]] = []
-        for line in lines[1:]:
-            values = [part.strip() for part in line.split(",")]
-            if len(values) != len(headers):
+        if vintage is not None:
+            return sorted(by_vintage.get(vintage, ()))
+        return sorted(slug for slugs in by_vintage.values() for slug in slugs)
+
+
+def _index_cms_wine(slug: str, payload: dict[str, Any]) -> None:
+    _ensure_cms_index()
+    with _CMS_INDEX_LOCK:
+        _remove_from_cms_index(slug)
+        _add_to_cms_index(slug, payload)
+
+
+def _unindex_cms_wine(slug: str) -> None:
+    with _CMS_INDEX_LOCK:
+        _remove_from_cms_index(slug)
+    _unindex_cms_search(slug)
+
+
+def _cms_search_path() -> Path:
+    return CMS_WINES_DIR.parent / "search.sqlite3"
+
+
+def _cms_search_connection() -> sqlite3.Connection:
+    """Open (or reopen, if the file was removed) the FTS5 index and sync it with cms/wines.
+
+    Caller holds _CMS_SEARCH_LOCK. The sync only re-reads documents whose file mtime or size
+    differs from what was indexed, so reopening an up-to-date index costs one directory scan.
+    """
+    path = _cms_search_path()
+    connection = _CMS_SEARCH.get("connection")
+    if connection is not None and not _CMS_SEARCH.get("stale") and _CMS_SEARCH.get("path") == path and path.exists():
+        return connection
+    if connection is not None:
+        connection.close()
+    _CMS_SEARCH.clear()
+
+    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    # Each uvicorn worker holds its own connection; writers queue on SQLite's lock instead of failing.
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA cache_size=-65536")
+    connection.execute("PRAGMA mmap_size=268435456")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS documents ("
+        "id INTEGER PRIMARY KEY, slug TEXT NOT NULL UNIQUE, name TEXT, vintage INTEGER, mtime_ns INTEGER, size INTEGER)"
+    )
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS wines USING fts5("
+        "name, producer, region, grapes, summary, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    _CMS_SEARCH.update(connection=connection, path=path)
+
+    indexed = {slug: (mtime_ns, size) for slug, mtime_ns, size in connection.execute("SELECT slug, mtime_ns, size FROM documents")}
+    seen = set()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for entry in os.scandir(CMS_WINES_DIR):
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            slug = entry.name[: -len(".json")]
+            seen.add(slug)
+            stat = entry.stat()
+            if indexed.get(slug) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            payload = _load_cms_document(slug)
+            if payload:
+                _upsert_cms_search_row(connection, slug, payload, stat)
+            else:
+                _delete_cms_search_row(connection, slug)
+        for slug in indexed.keys() - seen:
+            _delete_cms_search_row(connection, slug)
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return connection
+
+
+def _close_cms_search() -> None:
+    with _CMS_SEARCH_LOCK:
+        connection = _CMS_SEARCH.pop("connection", None)
+        _CMS_SEARCH.clear()
+    if connection is not None:
+        connection.close()
+
+
+def _upsert_cms_search_row(connection: sqlite3.Connection, slug: str, payload: dict[str, Any], stat: Optional[os.stat_result]) -> None:
+    _delete_cms_search_row(connection, slug)
+    grapes = payload.get("grape_composition") or payload.get("grapes") or ""
+    if isinstance(grapes, list):
+        grapes = ", ".join(str(item) for item in grapes)
+    vintage = _safe_int(payload.get("vintage"), 0) or None
+    row_id = connection.execute(
+        "INSERT INTO documents (slug, name, vintage, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+        (
+            slug,
+            payload.get("name") or payload.get("wine_name"),
+            vintage,
+            stat.st_mtime_ns if stat else None,
+            stat.st_size if stat else None,
+        ),
+    ).lastrowid
+    connection.execute(
+        "INSERT INTO wines (rowid, name, producer, region, grapes, summary) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            row_id,
+            str(payload.get("name") or payload.get("wine_name") or ""),
+            str(payload.get("producer") or payload.get("winery") or ""),
+            str(payload.get("region") or ""),
+            str(grapes),
+            str(payload.get("summary") or ""),
+        ),
+    )
+
+
+def _delete_cms_search_row(connection: sqlite3.Connection, slug: str) -> None:
+    row = connection.execute("SELECT id FROM documents WHERE slug = ?", (slug,)).fetchone()
+    if row:
+        connection.execute("DELETE FROM wines WHERE rowid = ?", row)
+        connection.execute("DELETE FROM documents WHERE id = ?", row)
+
+
+def _index_cms_search(slug: str, payload: dict[str, Any]) -> None:
+    _apply_cms_search_changes({slug: payload})
+
+
+def _unindex_cms_search(slug: str) -> None:
+    _apply_cms_search_changes({slug: None})
+
+
+def _apply_cms_search_changes(changes: dict[str, Optional[dict[str, Any]]]) -> None:
+    # One transaction per batch: a `git pull` touching thousands of files commits once, not once per file.
+    stats: dict[str, Optional[os.stat_result]] = {}
+    for slug, payload in changes.items():
+        if payload is not None:
+            try:
+                stats[slug] = _cms_wine_path(slug).stat()
+            except OSError:
+                stats[slug] = None
+    with _CMS_SEARCH_LOCK:
+        connection = _cms_search_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for slug, payload in changes.items():
+                if payload is None:
+                    _delete_cms_search_row(connection, slug)
+                else:
+                    _upsert_cms_search_row(connection, slug, payload, stats[slug])
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def _cms_file_stat(slug: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = _cms_wine_path(slug).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _record_cms_file_stat(slug: str) -> None:
+    # Lets the watcher recognise the event for a write the API has already applied.
+    stat = _cms_file_stat(slug)
+    with _CMS_WATCHER_LOCK:
+        if stat is None:
+            _CMS_FILE_STATS.pop(slug, None)
+        else:
+            _CMS_FILE_STATS[slug] = stat
+
+
+def _apply_cms_file_changes(slugs: set[str]) -> int:
+    """Bring the in-memory indexes, the pack overlay and search in line with cms/wines for these slugs.
+
+    Files whose mtime and size match what was last applied (including the API's own writes) are skipped.
+    Returns how many documents were re-read or dropped.
+    """
+    search_changes: dict[str, Optional[dict[str, Any]]] = {}
+    for slug in sorted(slugs):
+        stat = _cms_file_stat(slug)
+        with _CMS_WATCHER_LOCK:
+            if slug in _CMS_FILE_STATS and _CMS_FILE_STATS[slug] == stat:
+                continue
+        _drop_from_cms_pack(slug)
+        with _CMS_INDEX_LOCK:
+            previous_name = _CMS_SLUG_KEYS.get(slug, ("", None))[0]
+        payload = _load_json_file(_cms_wine_path(slug)) if stat else None
+        if payload:
+            _index_cms_wine(slug, payload)
+        else:
+            with _CMS_INDEX_LOCK:
+                _remove_from_cms_index(slug)
+        search_changes[slug] = payload
+        with _CMS_WATCHER_LOCK:
+            if stat is None:
+                _CMS_FILE_STATS.pop(slug, None)
+            else:
+                _CMS_FILE_STATS[slug] = stat
+        current_name = (payload.get("name") or payload.get("wine_name")) if payload else None
+        _invalidate_explain_cache(slug, (previous_name, current_name))
+    if search_changes:
+        _apply_cms_search_changes(search_changes)
+    return len(search_changes)
+
+
+def _cms_file_stats_on_disk() -> dict[str, tuple[int, int]]:
+    current = {}
+    try:
+        entries = os.scandir(CMS_WINES_DIR)
+    except FileNotFoundError:
+        return current
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and not entry.name.startswith("."):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                current[entry.name[: -len(".json")]] = (stat.st_mtime_ns, stat.st_size)
+    return current
+
+
+def _diff_cms_file_stats(current: dict[str, tuple[int, int]], known: dict[str, tuple[int, int]]) -> set[str]:
+    return {slug for slug in current.keys() | known.keys() if current.get(slug) != known.get(slug)}
+
+
+def _open_inotify(directory: Path) -> Optional[int]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        # Typically fs.inotify.max_user_watches exhausted, or a filesystem without inotify support.
+        os.close(fd)
+        return None
+    return fd
+
+
+def _read_inotify(fd: int, timeout: float) -> tuple[set[str], bool]:
+    """Wait up to `timeout` for events; returns (changed slugs, needs a full rescan)."""
+    if not select.select([fd], [], [], timeout)[0]:
+        return set(), False
+    try:
+        buffer = os.read(fd, 256 * 1024)
+    except BlockingIOError:
+        return set(), False
+    slugs, rescan, offset = set(), False, 0
+    while offset + 16 <= len(buffer):
+        _wd, mask, _cookie, length = struct.unpack_from("iIII", buffer, offset)
+        name = buffer[offset + 16 : offset + 16 + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+        offset += 16 + length
+        if mask & (_IN_Q_OVERFLOW | _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+            rescan = True
+        elif name.endswith(".json") and not name.startswith("."):
+            slugs.add(name[: -len(".json")])
+    return slugs, rescan
+
+
+def _start_cms_watcher() -> None:
+    mode = (os.getenv("CMS_WATCH") or "auto").strip().lower()
+    if mode in {"0", "off", "false"}:
+        return
+    with _CMS_WATCHER_LOCK:
+        if _CMS_WATCHER.get("thread"):
+            return
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=_run_cms_watcher,
+            args=(
+                mode == "polling",
+                stop,
+                _env_float("CMS_WATCH_DEBOUNCE_SECONDS", 0.25),
+                _env_float("CMS_WATCH_POLL_SECONDS", 2.0),
+            ),
+            name="cms-watcher",
+            daemon=True,
+        )
+        _CMS_WATCHER.update(thread=thread, stop=stop, mode="starting", batches=0, files_applied=0, last_batch_at=None, last_error=None)
+    thread.start()
+
+
+def _stop_cms_watcher() -> None:
+    with _CMS_WATCHER_LOCK:
+        thread = _CMS_WATCHER.get("thread")
+        stop = _CMS_WATCHER.get("stop")
+    if thread is None:
+        return
+    stop.set()
+    thread.join(timeout=5)
+    with _CMS_WATCHER_LOCK:
+        _CMS_WATCHER.clear()
+
+
+def _run_cms_watcher(force_polling: bool, stop: threading.Event, debounce: float, poll_interval: float) -> None:
+    """Apply add/modify/delete events under cms/wines to the in-memory indexes until `stop` is set.
+
+    Events are collected until the directory has been quiet for `debounce` seconds (or for at most
+    20x that while changes keep arriving), then applied as one batch, so a large `git pull` costs one
+    pass over the files it touched rather than a rebuild per file.
+    """
+    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    fd = None if force_polling else _open_inotify(CMS_WINES_DIR)
+    with _CMS_WATCHER_LOCK:
+        _CMS_WATCHER["mode"] = "inotify" if fd is not None else "polling"
+    _ensure_cms_index()
+    # Start from the file stats the indexes were built from, so edits since then are picked up too.
+    with _CMS_WATCHER_LOCK:
+        snapshot = dict(_CMS_FILE_STATS)
+    pending: set[str] = set()
+    first_event_at = last_event_at = 0.0
+    try:
+        while not stop.is_set():
+            wait = min(debounce, poll_interval) if pending else poll_interval
+            if fd is not None:
+                changed, rescan = _read_inotify(fd, min(wait, 1.0))
+                if rescan:
+                    # Events were dropped (queue overflow) or the directory was replaced: re-arm the watch,
+                    # then diff the directory against what was applied.
+                    os.close(fd)
+                    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+                    fd = _open_inotify(CMS_WINES_DIR)
+                    current = _cms_file_stats_on_disk()
+                    with _CMS_WATCHER_LOCK:
+                        known = dict(_CMS_FILE_STATS)
+                        _CMS_WATCHER["mode"] = "inotify" if fd is not None else "polling"
+                    changed |= _diff_cms_file_stats(current, known)
+                    snapshot = current
+            else:
+                if stop.wait(wait):
+                    break
+                # Diff against the previous scan, so a burst only counts as activity while files are still changing.
+                current = _cms_file_stats_on_disk()
+                changed, snapshot = _diff_cms_file_stats(current, snapshot), current
+
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                first_event_at = first_event_at or now
+                last_event_at = now
+            if pending and (now - last_event_at >= debounce or now - first_event_at >= 20 * debounce):
+                batch, pending, first_event_at = pending, set(), 0.0
+                try:
+                    applied = _apply_cms_file_changes(batch)
+                except Exception as exc:
+                    with _CMS_WATCHER_LOCK:
+                        _CMS_WATCHER["last_error"] = repr(exc)
+                    continue
+                with _CMS_WATCHER_LOCK:
+                    _CMS_WATCHER["batches"] = _CMS_WATCHER.get("batches", 0) + 1
+                    _CMS_WATCHER["files_applied"] = _CMS_WATCHER.get("files_applied", 0) + applied
+                    _CMS_WATCHER["last_batch_at"] = datetime.now(timezone.utc).isoformat()
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+def _cms_watcher_snapshot() -> dict[str, Any]:
+    with _CMS_WATCHER_LOCK:
+        if not _CMS_WATCHER:
+            return {"mode": "off"}
+        return {key: _CMS_WATCHER.get(key) for key in ("mode", "batches", "files_applied", "last_batch_at", "last_error")}
+
+
+def _cms_search_expression(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression: every word must match, the last one as a prefix.
+
+    Words are quoted so FTS5 operators in user input are treated as plain text; a trailing `*` on any
+    word also makes that word a prefix match. A single-character last word stays exact, since its
+    prefix would expand to a large share of the vocabulary.
+    """
+    words = re.findall(r"\w+\*?", query)
+    terms = []
+    for idx, word in enumerate(words):
+        bare = word.rstrip("*")
+        prefix = word.endswith("*") or (idx == len(words) - 1 and len(bare) > 1)
+        terms.append(f'"{bare}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _search_cms(match: str, limit: int) -> list[dict[str, Any]]:
+    """Rank matches by weighted bm25 (name > producer > region/grapes > summary).
+
+    SQLite scores every match and keeps only the best `limit` rows, so the page is exact however broad the query.
+    """
+    _ensure_cms_index()
+    weights = ", ".join(str(weight) for weight in _CMS_SEARCH_WEIGHTS)
+    with _CMS_SEARCH_LOCK:
+        connection = _cms_search_connection()
+        ranked = connection.execute(
+            f"SELECT rowid, bm25(wines, {weights}) AS score FROM wines WHERE wines MATCH ? ORDER BY score LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        # Stored fields only for the page being returned, via rowid lookups rather than another MATCH.
+        fields = {
+            row[0]: row[1:]
+            for row in connection.execute(
+                "SELECT documents.id, documents.slug, documents.name, documents.vintage, wines.producer, wines.region "
+                "FROM documents JOIN wines ON wines.rowid = documents.id "
+                f"WHERE documents.id IN ({', '.join('?' * len(ranked))})",
+                [row_id for row_id, _ in ranked],
+            )
+        }
+    results = []
+    for row_id, score in ranked:
+        slug, name, vintage, producer, region = fields[row_id]
+        results.append(
+            {
+                "slug": slug,
+                "name": name,
+                "vintage": vintage,
+                "producer": producer or None,
+                "region": region or None,
+                "score": round(-score, 4),
+            }
+        )
+    return results
+
+
+def _add_to_cms_index(slug: str, payload: dict[str, Any]) -> None:
+    name, vintage = _cms_index_key(payload)
+    facets = {field: _normalize_cms_name(payload.get(field)) or None for field in _CMS_FACET_FIELDS}
+    facets["vintage"] = vintage
+    _CMS_SLUG_FACETS[slug] = facets
+    for field in _CMS_FACET_FIELDS:
+        if facets[field]:
+            _CMS_FACET_INDEX.setdefault((field, facets[field]), set()).add(slug)
+    if vintage is not None:
+        _CMS_VINTAGE_INDEX.setdefault(vintage, set()).add(slug)
+    for _key, view in _cms_views_of(facets):
+        position = bisect.bisect_left(view, slug)
+        if position == len(view) or view[position] != slug:
+            view.insert(position, slug)
+
+    if not name:
+        return
+    if name not in _CMS_NAME_INDEX:
+        _add_to_fuzzy_index(name)
+    _CMS_NAME_INDEX.setdefault(name, {}).setdefault(vintage, set()).add(slug)
+    _CMS_SLUG_KEYS[slug] = (name, vintage)
+
+
+def _remove_from_cms_index(slug: str) -> None:
+    facets = _CMS_SLUG_FACETS.pop(slug, None)
+    if facets is not None:
+        for field in _CMS_FACET_FIELDS:
+            _discard_from_posting(_CMS_FACET_INDEX, (field, facets[field]), slug)
+        _discard_from_posting(_CMS_VINTAGE_INDEX, facets["vintage"], slug)
+        for key, view in _cms_views_of(facets):
+            position = bisect.bisect_left(view, slug)
+            if position < len(view) and view[position] == slug:
+                del view[position]
+            if not view and key is not None:
+                del _CMS_SORTED_VIEWS[key]
+
+    key = _CMS_SLUG_KEYS.pop(slug, None)
+    if key is None:
+        return
+    name, vintage = key
+    by_vintage = _CMS_NAME_INDEX.get(name, {})
+    slugs = by_vintage.get(vintage, set())
+    slugs.discard(slug)
+    if not slugs:
+        by_vintage.pop(vintage, None)
+    if not by_vintage and _CMS_NAME_INDEX.pop(name, None) is not None:
+        _remove_from_fuzzy_index(name)
+
+
+def _discard_from_posting(index: dict[Any, set[str]], key: Any, slug: str) -> None:
+    slugs = index.get(key)
+    if slugs is None:
+        return
+    slugs.discard(slug)
+    if not slugs:
+        index.pop(key, None)
+
+
+def _cms_views_of(facets: dict[str, Any]) -> Iterator[tuple[Any, list[str]]]:
+    # The sorted views already built that list this document; writes keep them sorted in place.
+    keys = [None, *((field, facets[field]) for field in _CMS_FACET_FIELDS if facets[field])]
+    if facets["vintage"] is not None:
+        keys.append(("vintage", facets["vintage"]))
+    for key in keys:
+        view = _CMS_SORTED_VIEWS.get(key)
+        if view is not None:
+            yield key, view
+
+
+def _sorted_cms_view(key: Any) -> list[str]:
+    # Views are sorted once on first use and then patched in place by each write, so a page stays O(page size).
+    view = _CMS_SORTED_VIEWS.get(key)
+    if view is None:
+        if key is None:
+            view = sorted(_CMS_SLUG_FACETS)
+        elif key[0] == "vintage":
+            view = sorted(_CMS_VINTAGE_INDEX.get(key[1], ()))
+        else:
+            view = sorted(_CMS_FACET_INDEX.get(key, ()))
+        _CMS_SORTED_VIEWS[key] = view
+    return view
+
+
+def _page_cms_slugs(
+    filters: dict[str, str],
+    vintage_from: Optional[int],
+    vintage_to: Optional[int],
+    cursor: Optional[str],
+    limit: int,
+) -> tuple[list[str], Optional[str]]:
+    _ensure_cms_index()
+    with _CMS_INDEX_LOCK:
+        streams: list[list[list[str]]] = [[_sorted_cms_view((field, value))] for field, value in filters.items()]
+        if vintage_from is not None or vintage_to is not None:
+            streams.append(
+                [
+                    _sorted_cms_view(("vintage", year))
+                    for year in _CMS_VINTAGE_INDEX
+                    if (vintage_from is None or year >= vintage_from) and (vintage_to is None or year <= vintage_to)
+                ]
+            )
+        if not streams:
+            streams.append([_sorted_cms_view(None)])
+
+        # Walk the most selective posting list and check the remaining filters per candidate.
+        driver = min(streams, key=lambda views: sum(len(view) for view in views))
+        starts = [bisect.bisect_right(view, cursor) if cursor else 0 for view in driver]
+        candidates = heapq.merge(*(view[start:] for view, start in zip(driver, starts))) if len(driver) > 1 else iter(driver[0][starts[0]:])
+
+        page: list[str] = []
+        for slug in candidates:
+            facets = _CMS_SLUG_FACETS.get(slug)
+            if facets is None:
+                continue
+            if any(facets[field] != value for field, value in filters.items()):
+                continue
+            year = facets["vintage"]
+            if vintage_from is not None and (year is None or year < vintage_from):
+                continue
+            if vintage_to is not None and (year is None or year > vintage_to):
+                continue
+            page.append(slug)
+            if len(page) > limit:
+                break
+
+    if len(page) > limit:
+        return page[:limit], page[limit - 1]
+    return page, None
+
+
+def _matches_vintage(payload: dict[str, Any], requested: Optional[int]) -> bool:
+    if requested is None:
+        return True
+    try:
+        return int(payload.get("vintage")) == requested
+    except (TypeError, ValueError):
+        return False
+
+
+def _import_x_wines_dataset(
+    repo_url: str,
+    limit: Optional[int],
+    progress: Optional[dict[str, Any]] = None,
+    full: bool = False,
+) -> int:
+    CMS_WINES_DIR.mkdir(parents=True, exist_ok=True)
+    XWINES_CLONE_DIR.parent.mkdir(parents=True, exist_ok=True)
+    if XWINES_CLONE_DIR.exists():
+        subprocess.run(["git", "-C", str(XWINES_CLONE_DIR), "pull", "--ff-only"], check=False)
+    else:
+        subprocess.run(["git", "clone", "--depth", "1", repo_url, str(XWINES_CLONE_DIR)], check=False)
+
+    dataset_file = _find_x_wines_dataset_file(XWINES_CLONE_DIR)
+    if not dataset_file:
+        raise HTTPException(status_code=502, detail="X-Wines repository cloned but no supported dataset file was found.")
+
+    progress = progress if progress is not None else {}
+    progress.update({"dataset_file": dataset_file.name, "bytes_total": dataset_file.stat().st_size})
+    state = _load_x_wines_import_state()
+    head = _git_head(XWINES_CLONE_DIR)
+    dataset_path = dataset_file.relative_to(XWINES_CLONE_DIR).as_posix()
+    header = _read_first_line(dataset_file)
+
+    changed_rows = None
+    if not full and head and state.get("last_commit") and state.get("dataset_file") == dataset_path and state.get("dataset_header") == header:
+        changed_rows = _x_wines_changed_rows(XWINES_CLONE_DIR, state["last_commit"], head, dataset_file, header)
+
+    try:
+        if changed_rows is not None:
+            progress.update({"mode": "incremental", "since_commit": state["last_commit"], "bytes_total": 0})
+            records: Iterator[dict[str, Any]] = iter(changed_rows)
+            # The diff is already bounded by what changed upstream. Capping it would re-read the same first rows on
+            # every run and never advance the sync point.
+            limit = None
+        else:
+            progress["mode"] = "full"
+            records = _iter_x_wines_records(dataset_file, progress)
+        imported = _apply_x_wines_records(records, limit=limit, progress=progress, state=state)
+        complete = limit is None or imported < max(1, limit)
+
+        # Ratings are keyed on their own file plus the WineID -> slug map, not on the wines pass being complete, so a
+        # limited sync does not re-stream the (multi-million row) ratings file every time.
+        ratings_file = _find_x_wines_ratings_file(XWINES_CLONE_DIR)
+        if ratings_file:
+            ratings_key = f"{_x_wines_file_signature(XWINES_CLONE_DIR, ratings_file)}:{_content_hash(state.get('wine_ids', {}))}"
+            if full or state.get("ratings_key") != ratings_key:
+                stats = _aggregate_x_wines_ratings(ratings_file, progress)
+                _attach_x_wines_ratings(stats, state, progress)
+                state["ratings_key"] = ratings_key
+
+        # Only a pass that reached the end of the dataset (or diff) may advance the sync point.
+        if head and complete:
+            state.update({"last_commit": head, "dataset_file": dataset_path, "dataset_header": header})
+            progress["synced_commit"] = head
+    finally:
+        _save_x_wines_import_state(state)
+    if progress.get("written") or progress.get("ratings_attached"):
+        _schedule_cms_pack_rebuild()
+    return imported
+
+
+def _apply_x_wines_records(
+    records: Iterator[dict[str, Any]],
+    limit: Optional[int],
+    progress: dict[str, Any],
+    state: dict[str, Any],
+) -> int:
+    max_records = max(1, limit) if limit is not None else None
+    chunk_size = max(1, int(_env_float("XWINES_IMPORT_CHUNK_SIZE", 500)))
+    hashes: dict[str, str] = state.setdefault("hashes", {})
+    wine_ids: dict[str, str] = state.setdefault("wine_ids", {})
+    imported = 0
+    with ThreadPoolExecutor(
+        max_workers=max(1, int(_env_float("XWINES_IMPORT_WRITERS", 8))),
+        thread_name_prefix="import-writer",
+    ) as writers:
+        while max_records is None or imported < max_records:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+            pending: dict[str, dict[str, Any]] = {}
+            for record in chunk:
+                if max_records is not None and imported >= max_records:
+                    break
+                progress["rows_read"] = progress.get("rows_read", 0) + 1
+                mapped = _map_x_wines_record(record)
+                if not mapped:
+                    progress["skipped"] = progress.get("skipped", 0) + 1
+                    continue
+                slug = _slugify(f"{mapped.get('name', 'wine')}-{mapped.get('vintage') or 'nv'}")
+                pending[slug] = {**pending.get(slug, {}), **mapped}
+                if mapped.get("x_wines_id"):
+                    wine_ids[str(mapped["x_wines_id"])] = slug
+                imported += 1
+
+            writes: list[tuple[str, dict[str, Any], str]] = []
+            for slug, mapped in pending.items():
+                digest = _content_hash(mapped)
+                if hashes.get(slug) == digest and _cms_wine_path(slug).exists():
+                    progress["unchanged"] = progress.get("unchanged", 0) + 1
+                    continue
+                writes.append((slug, mapped, digest))
+
+            search_changes: dict[str, Optional[dict[str, Any]]] = {}
+            results = writers.map(lambda write: _write_x_wines_record(write, search_changes), writes)
+            for (slug, _mapped, digest), error in zip(writes, results):
+                if error is None:
+                    hashes[slug] = digest
+                    progress["written"] = progress.get("written", 0) + 1
+                    continue
+                progress["error_count"] = progress.get("error_count", 0) + 1
+                progress.setdefault("errors", []).append(f"{slug}: {error!r}")
+                del progress["errors"][:-20]
+            if search_changes:
+                _apply_cms_search_changes(search_changes)
+            progress["imported"] = imported
+    return imported
+
+
+def _aggregate_x_wines_ratings(ratings_file: Path, progress: dict[str, Any]) -> dict[int, dict[str, Any]]:
+    chunk_rows = max(1, int(_env_float("XWINES_RATINGS_CHUNK_ROWS", 200_000)))
+    wine_slots: dict[int, int] = {}
+    vintage_slots: dict[int, int] = {}
+    by_wine = _new_rating_accumulator()
+    by_vintage = _new_rating_accumulator()
+
+    with ratings_file.open("r", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        headers = [part.strip().lower() for part in next(reader, [])]
+        try:
+            wine_col, vintage_col, rating_col = (headers.index(name) for name in ("wineid", "vintage", "rating"))
+        except ValueError:
+            return {}
+        width = max(wine_col, vintage_col, rating_col) + 1
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+            complete_rows = [row for row in rows if len(row) >= width]
+            progress["ratings_skipped"] = progress.get("ratings_skipped", 0) + len(rows) - len(complete_rows)
+            columns = list(zip(*complete_rows))
+            if not columns:
+                continue
+            wine_ids, wine_ok = _parse_rating_column(columns[wine_col], np.int64)
+            ratings, rating_ok = _parse_rating_column(columns[rating_col], np.float64)
+            raw_vintages = np.char.strip(np.array(columns[vintage_col]))
+            vintages = np.where(np.char.isdigit(raw_vintages), raw_vintages, "0").astype(np.int64)
+            valid = wine_ok & rating_ok
+            if not valid.all():
+                progress["ratings_skipped"] = progress.get("ratings_skipped", 0) + int((~valid).sum())
+                wine_ids, ratings, vintages = wine_ids[valid], ratings[valid], vintages[valid]
+
+            _accumulate_ratings(by_wine, wine_slots, wine_ids, ratings)
+            _accumulate_ratings(by_vintage, vintage_slots, wine_ids * 10_000 + vintages, ratings)
+            progress["ratings_rows"] = progress.get("ratings_rows", 0) + len(ratings)
+
+    stats = {wine_id: {**_summarize_ratings(by_wine, slot), "by_vintage": {}} for wine_id, slot in wine_slots.items()}
+    for key, slot in vintage_slots.items():
+        wine_id, vintage = divmod(key, 10_000)
+        if vintage:
+            stats[wine_id]["by_vintage"][str(vintage)] = _summarize_ratings(by_vintage, slot)
+    progress["ratings_wines"] = len(stats)
+    return stats
+
+
+def _parse_rating_column(values: tuple[str, ...], dtype: type) -> tuple[np.ndarray, np.ndarray]:
+    """Parse one column of a ratings chunk; returns the values and a mask of the rows that parsed."""
+    try:
+        parsed = np.array(values).astype(dtype)
+        valid = np.ones(len(values), dtype=bool)
+    except ValueError:
+        # Rare malformed rows: fall back to per-value parsing so only those rows are dropped, not the chunk.
+        parsed = np.zeros(len(values), dtype=dtype)
+        valid = np.zeros(len(values), dtype=bool)
+        for idx, value in enumerate(values):
+            try:
+                parsed[idx] = dtype(value.strip())
+            except (TypeError, ValueError, OverflowError):
+                continue
+            valid[idx] = True
+    if dtype is np.float64:
+        valid &= np.isfinite(parsed)
+    return parsed, valid
+
+
+def _new_rating_accumulator() -> dict[str, np.ndarray]:
+    return {
+        "count": np.zeros(0, dtype=np.int64),
+        "sum": np.zeros(0, dtype=np.float64),
+        "distribution": np.zeros((0, len(XWINES_RATING_STEPS)), dtype=np.int64),
+    }
+
+
+def _accumulate_ratings(
+    accumulator: dict[str, np.ndarray],
+    slots: dict[int, int],
+    keys: np.ndarray,
+    ratings: np.ndarray,
+) -> None:
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    slot_ids = np.fromiter(
+        (slots.setdefault(int(key), len(slots)) for key in unique_keys),
+        dtype=np.int64,
+        count=len(unique_keys),
+    )
+    rows = slot_ids[inverse]
+
+    capacity = len(accumulator["count"])
+    if len(slots) > capacity:
+        grown = max(len(slots), capacity * 2)
+        accumulator["count"] = np.concatenate([accumulator["count"], np.zeros(grown - capacity, dtype=np.int64)])
+        accumulator["sum"] = np.concatenate([accumulator["sum"], np.zeros(grown - capacity, dtype=np.float64)])
+        accumulator["distribution"] = np.vstack(
+            [accumulator["distribution"], np.zeros((grown - capacity, len(XWINES_RATING_STEPS)), dtype=np.int64)]
+        )
+        capacity = grown
+
+    steps = len(XWINES_RATING_STEPS)
+    buckets = np.clip(np.rint(ratings * 2).astype(np.int64) - 2, 0, steps - 1)
+    accumulator["count"] += np.bincount(rows, minlength=capacity)
+    accumulator["sum"] += np.bincount(rows, weights=ratings, minlength=capacity)
+    accumulator["distribution"] += np.bincount(rows * steps + buckets, minlength=capacity * steps).reshape(capacity, steps)
+
+
+def _summarize_ratings(accumulator: dict[str, np.ndarray], slot: int) -> dict[str, Any]:
+    count = int(accumulator["count"][slot])
+    return {
+        "count": count,
+        "mean": round(float(accumulator["sum"][slot]) / count, 2) if count else None,
+        "distribution": {
+            step: int(value) for step, value in zip(XWINES_RATING_STEPS, accumulator["distribution"][slot])
+        },
+    }
+
+
+def _attach_x_wines_ratings(stats: dict[int, dict[str, Any]], state: dict[str, Any], progress: dict[str, Any]) -> None:
+    wine_ids: dict[str, str] = state.get("wine_ids", {})
+    rating_hashes: dict[str, str] = state.setdefault("rating_hashes", {})
+    chunk_size = max(1, int(_env_float("XWINES_IMPORT_CHUNK_SIZE", 500)))
+    search_changes: dict[str, Optional[dict[str, Any]]] = {}
+    try:
+        for wine_id, block in stats.items():
+            slug = wine_ids.get(str(wine_id))
+            if not slug:
                 continue
-            rows.append({headers[idx]: values[idx] for idx in range(len(headers))})
-        return rows
+            digest = _content_hash(block)
+            if rating_hashes.get(slug) == digest and _cms_wine_path(slug).exists():
+                continue
+            existing = _load_json_file(_cms_wine_path(slug))
+            if not existing:
+                continue
+            document = _normalize_cms_document({**existing, "ratings": block})
+            _write_cms_wine(slug, document, search_changes)
+            rating_hashes[slug] = digest
+            progress["ratings_attached"] = progress.get("ratings_attached", 0) + 1
+            if len(search_changes) >= chunk_size:
+                _apply_cms_search_changes(search_changes)
+                search_changes = {}
+    finally:
+        if search_changes:
+            _apply_cms_search_changes(search_changes)
+
+
+def _git_head(repo_dir: Path) -> Optional[str]:
+    result = subprocess.run(["git", "-C", str(repo_dir), "rev-parse", "HEAD"], capture_output=True, text=True, check=False)
+    if result.returncode != 0 or not isinstance(result.stdout, str):
+        return None
+    return result.stdout.strip() or None
+
+
+def _x_wines_file_signature(repo_dir: Path, path: Path) -> str:
+    # The committed blob id when the checkout is a git repo; otherwise size and mtime.
+    result = subprocess.run(
+        ["git", "-C", str(repo_dir), "rev-parse", f"HEAD:{path.relative_to(repo_dir).as_posix()}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode == 0 and isinstance(result.stdout, str) and result.stdout.strip():
+        return f"blob:{result.stdout.strip()}"
+    stat = path.stat()
+    return f"stat:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_first_line(path: Path) -> str:
+    with path.open("r", encoding="utf-8-sig") as handle:
+        return handle.readline().rstrip("\r\n")
+
+
+def _x_wines_changed_rows(
+    repo_dir: Path,
+    since: str,
+    head: str,
+    dataset_file: Path,
+    header: str,
+) -> Optional[list[dict[str, Any]]]:
+    if dataset_file.suffix.lower() != ".csv":
+        return None
+    if since == head:
+        return []
+    result = subprocess.run(
+        [
+            "git",
+            "-C",
+            str(repo_dir),
+            "diff",
+            "--unified=0",
+            "--no-color",
+            "--no-ext-diff",
+            f"{since}..{head}",
+            "--",
+            dataset_file.relative_to(repo_dir).as_posix(),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        # The old commit can be missing (e.g. a re-clone); fall back to a full, hash-skipping pass.
+        return None
+
+    added = [line[1:] for line in result.stdout.splitlines() if line.startswith("+") and not line.startswith("+++")]
+    reader = csv.reader([header, *added])
+    headers = [part.strip() for part in next(reader)]
+    return [
+        {headers[idx]: values[idx].strip() for idx in range(len(headers))}
+        for values in reader
+        if len(values) == len(headers)
+    ]
+
+
+def _write_x_wines_record(
+    write: tuple[str, dict[str, Any], str], search_changes: dict[str, Optional[dict[str, Any]]]
+) -> Optional[Exception]:
+    slug, mapped, digest = write
+    try:
+        existing = _load_json_file(_cms_wine_path(slug)) or {}
+        merged = _normalize_cms_document({**existing, **mapped, "source": "x-wines"})
+        merged["slug"] = slug
+        merged["source_hash"] = digest
+        _write_cms_wine(slug, merged, search_changes)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def _content_hash(payload: dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _load_x_wines_import_state() -> dict[str, Any]:
+    return _load_json_file(XWINES_STATE_FILE) or {}
+
+
+def _save_x_wines_import_state(state: dict[str, Any]) -> None:
+    _write_json_atomic(XWINES_STATE_FILE, state)
+
+
+def _find_x_wines_dataset_file(repo_dir: Path) -> Optional[Path]:
+    candidates = [
+        *repo_dir.glob("*.json"),
+        *repo_dir.glob("*.csv"),
+        *repo_dir.glob("data/*.json"),
+        *repo_dir.glob("data/*.csv"),
+        *repo_dir.glob("dataset/*.json"),
+        *repo_dir.glob("dataset/*.csv"),
+    ]
+    # X-Wines ships its ratings next to the catalog ("XWines_*_ratings.csv"); never import those as wines.
+    catalogs = [file for file in candidates if "rating" not in file.name.lower()]
+    for file in catalogs:
+        if "wine" in file.name.lower():
+            return file
+    return catalogs[0] if catalogs else None
+
+
+def _find_x_wines_ratings_file(repo_dir: Path) -> Optional[Path]:
+    for pattern in ("*.csv", "data/*.csv", "dataset/*.csv"):
+        for file in sorted(repo_dir.glob(pattern)):
+            if "rating" in file.name.lower():
+                return file
+    return None
+
+
+def _iter_x_wines_records(dataset_file: Path, progress: Optional[dict[str, Any]] = None) -> Iterator[dict[str, Any]]:
+    progress = progress if progress is not None else {}
+    suffix = dataset_file.suffix.lower()
+    if suffix == ".json":
+        # The stdlib has no incremental JSON parser; X-Wines ships CSV, so JSON dumps are expected to be small.
+        with dataset_file.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        progress["bytes_read"] = progress.get("bytes_total", 0)
+        if isinstance(payload, dict):
+            payload = payload["data"] if isinstance(payload.get("data"), list) else [payload]
+        if isinstance(payload, list):
+            yield from (item for item in payload if isinstance(item, dict))
+        return
 
-    return []
+    if suffix == ".csv":
+        with dataset_file.open("rb") as handle:
+            reader = csv.reader(_counting_lines(handle, progress))
+            headers = [part.strip() for part in next(reader, [])]
+            if not headers:
+                return
+            for values in reader:
+                if len(values) != len(headers):
+                    continue
+                yield {headers[idx]: values[idx].strip() for idx in range(len(headers))}
+
+
+def _counting_lines(handle: Any, progress: dict[str, Any]) -> Iterator[str]:
+    progress["bytes_read"] = 0
+    for raw in handle:
+        progress["bytes_read"] += len(raw)
+        yield raw.decode("utf-8-sig" if progress["bytes_read"] == len(raw) else "utf-8")
 
 
 def _map_x_wines_record(record: dict[str, Any]) -> Optional[dict[str, Any]]:
-    name = record.get("name") or record.get("wine") or record.get("wine_name")
+    name = record.get("name") or record.get("wine") or record.get("wine_name") or record.get("WineName")
     if not name:
         return None
-    return {
+    mapped = {
         "name": str(name),
         "wine_name": str(name),
         "vintage": _safe_int(record.get("vintage"), 0) or None,
-        "producer": record.get("winery") or record.get("producer"),
-        "region": record.get("region") or record.get("country"),
+        "producer": record.get("winery") or record.get("producer") or record.get("WineryName"),
+        "region": record.get("region") or record.get("country") or record.get("RegionName") or record.get("Country"),
         "summary": record.get("description") or record.get("summary") or "Imported from X-Wines dataset.",
-        "grape_composition": record.get("grapes") or record.get("variety"),
-        "wine_type": record.get("type") or record.get("wine_type"),
-        "abv": record.get("abv") or record.get("alcohol"),
+        "grape_composition": record.get("grapes") or record.get("variety") or record.get("Grapes"),
+        "wine_type": record.get("type") or record.get("wine_type") or record.get("Type"),
+        "abv": record.get("abv") or record.get("alcohol") or record.get("ABV"),
     }
+    wine_id = _safe_int(record.get("WineID") or record.get("wine_id"), 0)
+    if wine_id:
+        mapped["x_wines_id"] = wine_id
+    return mapped
+
+
+def _http_client_key(url: str) -> str:
+    parts = parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _new_http_client() -> httpx.Client:
+    max_connections = max(1, _safe_int(os.getenv("UPSTREAM_MAX_CONNECTIONS_PER_HOST"), 20))
+    keepalive_seconds = max(0.0, _env_float("UPSTREAM_KEEPALIVE_SECONDS", 30.0))
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_seconds,
+        ),
+        # HTTP/2 needs the optional h2 package; without it the pool stays on keep-alive HTTP/1.1.
+        http2=find_spec("h2") is not None,
+        follow_redirects=True,
+    )
+
+
+def _http_client(url: str) -> httpx.Client:
+    """Return the pooled client for the URL's host, creating it on first use.
 
+    One client per scheme+host gives each upstream its own connection limit, so a slow
+    host cannot starve the pool used by the others.
+    """
+    key = _http_client_key(url)
+    with _HTTP_CLIENTS_LOCK:
+        client = _HTTP_CLIENTS.get(key)
+        if client is None or client.is_closed:
+            client = _HTTP_CLIENTS[key] = _new_http_client()
+        return client
 
-def _fetch_vinou_wine_data(name: str, vintage: Optional[int]) -> Optional[dict[str, Any]]:
+
+def _open_http_clients() -> None:
+    for url in (os.getenv("WINEVYBE_API_URL"), os.getenv("VINOU_API_URL"), OPEN_METEO_ARCHIVE_URL):
+        if url:
+            _http_client(url)
+
+
+def _close_http_clients() -> None:
+    with _HTTP_CLIENTS_LOCK:
+        clients = list(_HTTP_CLIENTS.values())
+        _HTTP_CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+def _http_get_json(url: str, headers: Optional[dict[str, str]] = None, timeout: float = 12) -> Any:
+    response = _http_client(url).get(url, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _fetch_vinou_wine_data(name: str, vintage: Optional[int], timeout: float = 12) -> Optional[dict[str, Any]]:
     vinou_url = os.getenv("VINOU_API_URL")
     if not vinou_url:
         return None
@@ -477,17 +2793,18 @@ def _fetch_vinou_wine_data(name: str, vintage: Optional[int]) -> Optional[dict[s
     if vintage is not None:
         params["vintage"] = vintage
 
-    req = request.Request(f"{vinou_url}?{parse.urlencode(params)}")
-    req.add_header("Accept", "application/json")
+    headers = {"Accept": "application/json"}
     vinou_api_key = os.getenv("VINOU_API_KEY")
     if vinou_api_key:
-        req.add_header("Authorization", f"Bearer {vinou_api_key}")
+        headers["Authorization"] = f"Bearer {vinou_api_key}"
 
     try:
-        with request.urlopen(req, timeout=12) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except Exception:
-        return None
+        payload = _http_get_json(f"{vinou_url}?{parse.urlencode(params)}", headers=headers, timeout=timeout)
+    except httpx.HTTPStatusError as exc:
+        # A 404 is a clean "no match"; anything else counts against the source's circuit breaker.
+        if exc.response.status_code == 404:
+            return None
+        raise
 
     if not isinstance(payload, dict):
         return None
@@ -496,7 +2813,7 @@ def _fetch_vinou_wine_data(name: str, vintage: Optional[int]) -> Optional[dict[s
     return data if isinstance(data, dict) and data else None
 
 
-def _fetch_winevybe_wine_data(name: str, vintage: Optional[int]) -> Optional[dict[str, Any]]:
+def _fetch_winevybe_wine_data(name: str, vintage: Optional[int], timeout: float = 12) -> Optional[dict[str, Any]]:
     winevybe_url = os.getenv("WINEVYBE_API_URL")
     if not winevybe_url:
         return None
@@ -505,17 +2822,18 @@ def _fetch_winevybe_wine_data(name: str, vintage: Optional[int]) -> Optional[dic
     if vintage is not None:
         params["vintage"] = vintage
 
-    req = request.Request(f"{winevybe_url}?{parse.urlencode(params)}")
-    req.add_header("Accept", "application/json")
+    headers = {"Accept": "application/json"}
     winevybe_api_key = os.getenv("WINEVYBE_API_KEY")
     if winevybe_api_key:
-        req.add_header("Authorization", f"Bearer {winevybe_api_key}")
+        headers["Authorization"] = f"Bearer {winevybe_api_key}"
 
     try:
-        with request.urlopen(req, timeout=12) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except Exception:
-        return None
+        payload = _http_get_json(f"{winevybe_url}?{parse.urlencode(params)}", headers=headers, timeout=timeout)
+    except httpx.HTTPStatusError as exc:
+        # A 404 is a clean "no match"; anything else counts against the source's circuit breaker.
+        if exc.response.status_code == 404:
+            return None
+        raise
 
     if not isinstance(payload, dict):
         return None
@@ -581,34 +2899,88 @@ def _build_source_highlights(
     cms_payload: Optional[dict[str, Any]],
     source: str,
     structured: dict[str, Any],
+    queried_sources: Optional[set[str]] = None,
+    pending_sources: Optional[set[str]] = None,
+    circuit_open_sources: Optional[set[str]] = None,
 ) -> dict[str, Any]:
+    queried = queried_sources if queried_sources is not None else {"git_cms", "winevybe", "vinou"}
+    pending = pending_sources or set()
+    circuit_open = circuit_open_sources or set()
+    if source == "openai":
+        queried = {*queried, "openai"}
     return {
         "git_cms": {
             "available": bool(cms_payload),
+            "queried": "git_cms" in queried,
+            "status": _source_status(cms_payload, "git_cms" in queried),
             "producer": (cms_payload or {}).get("producer"),
             "region": (cms_payload or {}).get("region"),
             "wine_type": (cms_payload or {}).get("wine_type"),
         },
         "winevybe": {
             "available": bool(winevybe_payload),
+            "queried": "winevybe" in queried,
+            "status": _upstream_status("winevybe", winevybe_payload, queried, pending, circuit_open),
             "producer": (winevybe_payload or {}).get("producer") or (winevybe_payload or {}).get("winery"),
             "region": (winevybe_payload or {}).get("region") or (winevybe_payload or {}).get("appellation"),
             "wine_type": (winevybe_payload or {}).get("wine_type"),
         },
         "vinou": {
             "available": bool(vinou_payload),
+            "queried": "vinou" in queried,
+            "status": _upstream_status("vinou", vinou_payload, queried, pending, circuit_open),
             "producer": (vinou_payload or {}).get("producer"),
             "region": (vinou_payload or {}).get("region"),
             "wine_type": (vinou_payload or {}).get("wine_type"),
         },
         "openai": {
             "available": source == "openai",
+            "queried": "openai" in queried,
+            "status": _source_status(structured if source == "openai" else None, "openai" in queried),
             "model": "gpt-4.1-mini" if source == "openai" else None,
             "summary_excerpt": structured.get("summary") if source == "openai" else None,
         },
     }
 
 
+def _select_rating_stats(ratings: Any, vintage: Optional[int]) -> Optional[dict[str, Any]]:
+    if not isinstance(ratings, dict) or not ratings.get("count"):
+        return None
+    by_vintage = ratings.get("by_vintage") or {}
+    return {
+        "count": ratings.get("count"),
+        "mean": ratings.get("mean"),
+        "distribution": ratings.get("distribution"),
+        "selected_vintage": by_vintage.get(str(vintage)) if vintage else None,
+        "vintages_rated": len(by_vintage),
+    }
+
+
+def _source_status(payload: Optional[dict[str, Any]], queried: bool) -> str:
+    if not queried:
+        return "not queried"
+    return "available" if payload else "no match"
+
+
+def _upstream_status(
+    source: str,
+    payload: Optional[dict[str, Any]],
+    queried: set[str],
+    pending: set[str],
+    circuit_open: set[str],
+) -> str:
+    if source in circuit_open:
+        return "circuit open"
+    if source in pending:
+        return "pending"
+    return _source_status(payload, source in queried)
+
+
+def _source_cascade_mode() -> str:
+    mode = (os.getenv("SOURCE_CASCADE_MODE") or "lazy").strip().lower()
+    return mode if mode in {"lazy", "eager"} else "lazy"
+
+
 def _normalize_vinou_payload(vinou_payload: Optional[dict[str, Any]]) -> dict[str, Any]:
     if not vinou_payload:
         return {}
@@ -656,6 +3028,190 @@ def _normalize_vinou_payload(vinou_payload: Optional[dict[str, Any]]) -> dict[st
     }
 
 
+_UPSTREAM_SOURCES = ("winevybe", "vinou")
+
+
+def _upstream_fetcher(source: str) -> Callable[..., Optional[dict[str, Any]]]:
+    return {"winevybe": _fetch_winevybe_wine_data, "vinou": _fetch_vinou_wine_data}[source]
+
+
+def _upstream_normalizer(source: str) -> Callable[[Optional[dict[str, Any]]], dict[str, Any]]:
+    return {"winevybe": _normalize_winevybe_payload, "vinou": _normalize_vinou_payload}[source]
+
+
+def _fetch_upstream_payloads(
+    name: str,
+    vintage: Optional[int],
+    deadline: float,
+    wait_for_all: bool,
+    on_payload: Optional[Callable[[str, dict[str, Any]], None]] = None,
+    circuit_open: Optional[set[str]] = None,
+) -> dict[str, Optional[dict[str, Any]]]:
+    results: dict[str, Optional[dict[str, Any]]] = {}
+    futures = {}
+    for source in _UPSTREAM_SOURCES:
+        tracked = _upstream_configured(source)
+        timeout, probe = _admit_upstream_call(source, deadline) if tracked else (deadline, False)
+        if timeout is None:
+            results[source] = None
+            if circuit_open is not None:
+                circuit_open.add(source)
+            continue
+        futures[source] = _submit_in_context(_UPSTREAM_EXECUTOR, _call_upstream, source, name, vintage, timeout, tracked, probe)
+    pending = set(futures.values())
+    ends_at = time.monotonic() + deadline
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, ends_at - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for source, future in futures.items():
+            if future not in done:
+                continue
+            try:
+                results[source] = future.result()
+            except Exception:
+                results[source] = None
+            if results[source] and on_payload:
+                on_payload(source, results[source])
+        if not wait_for_all and _highest_priority_upstream_resolved(results):
+            break
+    return results
+
+
+def _call_upstream(
+    source: str,
+    name: str,
+    vintage: Optional[int],
+    timeout: float,
+    tracked: bool,
+    probe: bool = False,
+) -> Optional[dict[str, Any]]:
+    started = time.monotonic()
+    try:
+        payload = _upstream_fetcher(source)(name, vintage, timeout=timeout)
+    except Exception:
+        elapsed = time.monotonic() - started
+        _observe_stage(source, elapsed)
+        if tracked:
+            _record_upstream_call(source, elapsed, ok=False, probe=probe)
+        return None
+    elapsed = time.monotonic() - started
+    _observe_stage(source, elapsed)
+    if tracked:
+        _record_upstream_call(source, elapsed, ok=True, probe=probe)
+    return payload
+
+
+def _upstream_configured(source: str) -> bool:
+    return bool(os.getenv(f"{source.upper()}_API_URL"))
+
+
+def _upstream_health(source: str) -> dict[str, Any]:
+    health = _UPSTREAM_HEALTH.get(source)
+    if health is None:
+        health = _UPSTREAM_HEALTH[source] = {
+            "state": "closed",
+            "consecutive_failures": 0,
+            "opened_at": None,
+            "probe_in_flight": False,
+            "latencies": deque(maxlen=_UPSTREAM_HEALTH_WINDOW),
+            "outcomes": deque(maxlen=_UPSTREAM_HEALTH_WINDOW),
+        }
+    return health
+
+
+def _admit_upstream_call(source: str, deadline: float) -> tuple[Optional[float], bool]:
+    """Return the timeout to use for a call to `source` (None while its circuit is open) and whether it is the probe.
+
+    An open circuit lets a single probe through once UPSTREAM_BREAKER_RESET_SECONDS have
+    passed (half-open); only the probe's outcome closes or re-opens it.
+    """
+    reset_seconds = _env_float("UPSTREAM_BREAKER_RESET_SECONDS", 30.0)
+    with _UPSTREAM_HEALTH_LOCK:
+        health = _upstream_health(source)
+        if health["state"] == "open":
+            if time.monotonic() - health["opened_at"] < reset_seconds:
+                return None, False
+            health["state"] = "half_open"
+        if health["state"] == "half_open":
+            if health["probe_in_flight"]:
+                return None, False
+            health["probe_in_flight"] = True
+            return _adaptive_upstream_timeout(health, deadline), True
+        return _adaptive_upstream_timeout(health, deadline), False
+
+
+def _adaptive_upstream_timeout(health: dict[str, Any], deadline: float) -> float:
+    latencies = health["latencies"]
+    if len(latencies) < _UPSTREAM_MIN_LATENCY_SAMPLES:
+        return deadline
+    p99 = float(np.percentile(np.fromiter(latencies, dtype=float), 99))
+    floor = _env_float("UPSTREAM_MIN_TIMEOUT_SECONDS", 1.0)
+    return min(deadline, max(floor, p99 * 2))
+
+
+def _record_upstream_call(source: str, elapsed: float, ok: bool, probe: bool = False) -> None:
+    threshold = max(1, int(_env_float("UPSTREAM_BREAKER_FAILURES", 5)))
+    with _UPSTREAM_HEALTH_LOCK:
+        health = _upstream_health(source)
+        health["outcomes"].append(ok)
+        if ok:
+            health["latencies"].append(elapsed)
+        if probe:
+            health["probe_in_flight"] = False
+        elif health["state"] != "closed":
+            # Admitted before the circuit opened; only the half-open probe decides whether the source recovered.
+            return
+        if ok:
+            health["consecutive_failures"] = 0
+            health["state"] = "closed"
+            health["opened_at"] = None
+            return
+        health["consecutive_failures"] += 1
+        if probe or health["consecutive_failures"] >= threshold:
+            health["state"] = "open"
+            health["opened_at"] = time.monotonic()
+
+
+def _upstream_health_snapshot(source: str) -> dict[str, Any]:
+    reset_seconds = _env_float("UPSTREAM_BREAKER_RESET_SECONDS", 30.0)
+    deadline = _env_float("UPSTREAM_DEADLINE_SECONDS", 12.0)
+    with _UPSTREAM_HEALTH_LOCK:
+        health = _upstream_health(source)
+        latencies = np.fromiter(health["latencies"], dtype=float)
+        outcomes = list(health["outcomes"])
+        retry_in = None
+        if health["state"] == "open":
+            retry_in = round(max(0.0, reset_seconds - (time.monotonic() - health["opened_at"])), 3)
+        snapshot = {
+            "circuit": {
+                "state": health["state"],
+                "consecutive_failures": health["consecutive_failures"],
+                "retry_in_seconds": retry_in,
+            },
+            "timeout_seconds": round(_adaptive_upstream_timeout(health, deadline), 3),
+        }
+    snapshot["latency_ms"] = {
+        "samples": int(latencies.size),
+        **{
+            f"p{pct}": round(float(np.percentile(latencies, pct)) * 1000, 1) if latencies.size else None
+            for pct in (50, 95, 99)
+        },
+    }
+    snapshot["error_rate"] = round(outcomes.count(False) / len(outcomes), 3) if outcomes else None
+    snapshot["recent_calls"] = len(outcomes)
+    return snapshot
+
+
+def _highest_priority_upstream_resolved(results: dict[str, Optional[dict[str, Any]]]) -> bool:
+    for source in _UPSTREAM_SOURCES:
+        if source not in results:
+            return False
+        if results[source]:
+            return True
+    return True
+
+
 def _normalize_wine_query(name: str, vintage: Optional[int]) -> tuple[str, Optional[int]]:
     normalized_name = name.strip()
     if not normalized_name:
@@ -682,34 +3238,24 @@ def _normalize_wine_query(name: str, vintage: Optional[int]) -> tuple[str, Optio
 def _build_growing_season_weather(
     climate_context: dict[str, Any],
     selected_vintage: Optional[int],
+    daily: Optional[dict[str, list[Any]]] = None,
 ) -> dict[str, Any]:
-    latitude = _parse_float(climate_context.get("latitude"))
-    longitude = _parse_float(climate_context.get("longitude"))
-    if latitude is None or longitude is None:
-        return {"error": "No usable location returned for growing season weather analysis."}
-
-    season = climate_context.get("growing_season") or {}
-    start_month = _safe_int(season.get("start_month"), 4)
-    start_day = _safe_int(season.get("start_day"), 1)
-    end_month = _safe_int(season.get("end_month"), 10)
-    end_day = _safe_int(season.get("end_day"), 31)
-
-    if (end_month, end_day) < (start_month, start_day):
-        start_month, start_day, end_month, end_day = 4, 1, 10, 31
-
-    current_year = datetime.now(timezone.utc).year
-    end_year = current_year - 1
-    start_year = min((selected_vintage or end_year), end_year) - 20
-    start_year = max(start_year, 1980)
-    if start_year > end_year:
-        start_year = end_year
-
-    daily = _fetch_open_meteo_history(
-        latitude=latitude,
-        longitude=longitude,
-        start_date=f"{start_year:04d}-{start_month:02d}-{start_day:02d}",
-        end_date=f"{end_year:04d}-{end_month:02d}-{end_day:02d}",
-    )
+    plan = _plan_growing_season_weather(climate_context, selected_vintage)
+    if "error" in plan:
+        return plan
+    latitude = plan["latitude"]
+    longitude = plan["longitude"]
+    start_month, start_day = plan["start_month"], plan["start_day"]
+    end_month, end_day = plan["end_month"], plan["end_day"]
+    start_year, end_year = plan["start_year"], plan["end_year"]
+
+    if daily is None:
+        daily = _fetch_open_meteo_history(
+            latitude=latitude,
+            longitude=longitude,
+            start_date=f"{start_year:04d}-{start_month:02d}-{start_day:02d}",
+            end_date=f"{end_year:04d}-{end_month:02d}-{end_day:02d}",
+        )
     by_year = _aggregate_seasonal_metrics(
         daily=daily,
         start_month=start_month,
@@ -717,6 +3263,8 @@ def _build_growing_season_weather(
         end_month=end_month,
         end_day=end_day,
     )
+    # A shared history (batch requests) can span more years than this vintage asked for.
+    by_year = {year: metrics for year, metrics in by_year.items() if start_year <= year <= end_year}
     if not by_year:
         return {"error": "No weather records were available for the requested growing season."}
 
@@ -744,6 +3292,81 @@ def _build_growing_season_weather(
     }
 
 
+def _plan_growing_season_weather(
+    climate_context: dict[str, Any],
+    selected_vintage: Optional[int],
+) -> dict[str, Any]:
+    latitude = _parse_float(climate_context.get("latitude"))
+    longitude = _parse_float(climate_context.get("longitude"))
+    if latitude is None or longitude is None:
+        return {"error": "No usable location returned for growing season weather analysis."}
+
+    season = climate_context.get("growing_season") or {}
+    start_month = _safe_int(season.get("start_month"), 4)
+    start_day = _safe_int(season.get("start_day"), 1)
+    end_month = _safe_int(season.get("end_month"), 10)
+    end_day = _safe_int(season.get("end_day"), 31)
+
+    if (end_month, end_day) < (start_month, start_day):
+        start_month, start_day, end_month, end_day = 4, 1, 10, 31
+
+    current_year = datetime.now(timezone.utc).year
+    end_year = current_year - 1
+    start_year = min((selected_vintage or end_year), end_year) - 20
+    start_year = max(start_year, 1980)
+    if start_year > end_year:
+        start_year = end_year
+
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "start_month": start_month,
+        "start_day": start_day,
+        "end_month": end_month,
+        "end_day": end_day,
+        "start_year": start_year,
+        "end_year": end_year,
+    }
+
+
+def _prefetch_growing_season_weather(
+    prefetched: dict[str, Future],
+    climate_context: dict[str, Any],
+    selected_vintage: Optional[int],
+) -> None:
+    if not isinstance(climate_context, dict):
+        return
+    if _parse_float(climate_context.get("latitude")) is None or _parse_float(climate_context.get("longitude")) is None:
+        return
+    key = _weather_prefetch_key(climate_context)
+    if key not in prefetched:
+        prefetched[key] = _submit_in_context(
+            _UPSTREAM_EXECUTOR,
+            _build_growing_season_weather,
+            climate_context=climate_context,
+            selected_vintage=selected_vintage,
+        )
+
+
+def _collect_growing_season_weather(
+    prefetched: dict[str, Future],
+    climate_context: dict[str, Any],
+    selected_vintage: Optional[int],
+) -> dict[str, Any]:
+    key = _weather_prefetch_key(climate_context)
+    future = prefetched.get(key)
+    if future is None:
+        return _single_flight(
+            ("growing-season-weather", key, selected_vintage),
+            lambda: _build_growing_season_weather(climate_context=climate_context, selected_vintage=selected_vintage),
+        )
+    return future.result()
+
+
+def _weather_prefetch_key(climate_context: Any) -> str:
+    return json.dumps(climate_context, sort_keys=True, default=str)
+
+
 def _parse_float(value: Any) -> Optional[float]:
     try:
         if value is None:
@@ -753,6 +3376,11 @@ def _parse_float(value: Any) -> Optional[float]:
         return None
 
 
+def _env_float(key: str, fallback: float) -> float:
+    parsed = _parse_float(os.getenv(key))
+    return parsed if parsed is not None else fallback
+
+
 def _safe_int(value: Any, fallback: int) -> int:
     try:
         parsed = int(value)
@@ -761,25 +3389,73 @@ def _safe_int(value: Any, fallback: int) -> int:
     return parsed
 
 
+@_timed_stage("open_meteo")
 def _fetch_open_meteo_history(
     latitude: float,
     longitude: float,
     start_date: str,
     end_date: str,
+) -> dict[str, list[Any]]:
+    cache_dir = OPEN_METEO_CACHE_DIR / f"{latitude:.2f}_{longitude:.2f}"
+    years = range(int(start_date[:4]), int(end_date[:4]) + 1)
+    series_by_year: dict[int, dict[str, list[Any]]] = {}
+    for year in years:
+        cached = _load_json_file(cache_dir / f"{year}.json")
+        if cached and isinstance(cached.get("time"), list):
+            series_by_year[year] = cached
+
+    missing = [year for year in years if year not in series_by_year]
+    _count_cache("open_meteo_years", hit=True, amount=len(series_by_year))
+    _count_cache("open_meteo_years", hit=False, amount=len(missing))
+    for first_year, last_year in _contiguous_year_runs(missing):
+        daily = _download_open_meteo_daily(
+            latitude=latitude,
+            longitude=longitude,
+            start_date=f"{first_year:04d}-01-01",
+            end_date=f"{last_year:04d}-12-31",
+        )
+        for year, series in _split_daily_by_year(daily).items():
+            if year not in years:
+                continue
+            series_by_year[year] = series
+            if _is_complete_year(year, series):
+                _write_json_atomic(cache_dir / f"{year}.json", series)
+
+    merged: dict[str, list[Any]] = {"time": [], **{field: [] for field in OPEN_METEO_DAILY_FIELDS}}
+    for year in years:
+        series = series_by_year.get(year)
+        if not series:
+            continue
+        # Each year's stamps are sorted ISO dates, so the requested window is one slice per field.
+        stamps = series["time"]
+        first = bisect.bisect_left(stamps, start_date)
+        last = bisect.bisect_right(stamps, end_date)
+        merged["time"].extend(stamps[first:last])
+        for field in OPEN_METEO_DAILY_FIELDS:
+            values = (series.get(field) or [])[first:last]
+            merged[field].extend(values)
+            merged[field].extend([None] * (last - first - len(values)))
+    return merged
+
+
+def _download_open_meteo_daily(
+    latitude: float,
+    longitude: float,
+    start_date: str,
+    end_date: str,
 ) -> dict[str, list[Any]]:
     params = {
-        "latitude": f"{latitude:.4f}",
-        "longitude": f"{longitude:.4f}",
+        "latitude": f"{latitude:.2f}",
+        "longitude": f"{longitude:.2f}",
         "start_date": start_date,
         "end_date": end_date,
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+        "daily": ",".join(OPEN_METEO_DAILY_FIELDS),
         "timezone": "UTC",
     }
-    url = f"https://archive-api.open-meteo.com/v1/archive?{parse.urlencode(params)}"
+    url = f"{OPEN_METEO_ARCHIVE_URL}?{parse.urlencode(params)}"
 
     try:
-        with request.urlopen(url, timeout=20) as response:
-            payload = json.loads(response.read().decode("utf-8"))
+        payload = _http_get_json(url, timeout=20)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Open-Meteo call failed: {exc}") from exc
 
@@ -789,12 +3465,147 @@ def _fetch_open_meteo_history(
     return daily
 
 
+def _split_daily_by_year(daily: dict[str, list[Any]]) -> dict[int, dict[str, list[Any]]]:
+    dates = daily.get("time") or []
+    by_year: dict[int, dict[str, list[Any]]] = {}
+    for idx, stamp in enumerate(dates):
+        year = _safe_int(stamp[:4] if isinstance(stamp, str) else None, 0)
+        if not year:
+            continue
+        bucket = by_year.setdefault(year, {"time": [], **{field: [] for field in OPEN_METEO_DAILY_FIELDS}})
+        bucket["time"].append(stamp)
+        for field in OPEN_METEO_DAILY_FIELDS:
+            values = daily.get(field) or []
+            bucket[field].append(values[idx] if idx < len(values) else None)
+    return by_year
+
+
+def _contiguous_year_runs(years: list[int]) -> list[tuple[int, int]]:
+    runs: list[tuple[int, int]] = []
+    for year in sorted(years):
+        if runs and runs[-1][1] == year - 1:
+            runs[-1] = (runs[-1][0], year)
+        else:
+            runs.append((year, year))
+    return runs
+
+
+def _is_complete_year(year: int, series: dict[str, list[Any]]) -> bool:
+    days = 366 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 365
+    if len(series["time"]) != days:
+        return False
+    # The archive lags real time by a few days; never cache a year whose tail is still null.
+    return all(series[field] and series[field][-1] is not None for field in OPEN_METEO_DAILY_FIELDS)
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+@_timed_stage("seasonal_aggregation")
 def _aggregate_seasonal_metrics(
     daily: dict[str, list[Any]],
     start_month: int,
     start_day: int,
     end_month: int,
     end_day: int,
+) -> dict[int, dict[str, float]]:
+    try:
+        return _aggregate_seasonal_metrics_vectorized(daily, start_month, start_day, end_month, end_day)
+    except (TypeError, ValueError):
+        # Non-ISO dates or non-numeric readings: the row-by-row path skips them individually.
+        return _aggregate_seasonal_metrics_rowwise(daily, start_month, start_day, end_month, end_day)
+
+
+def _aggregate_seasonal_metrics_vectorized(
+    daily: dict[str, list[Any]],
+    start_month: int,
+    start_day: int,
+    end_month: int,
+    end_day: int,
+) -> dict[int, dict[str, float]]:
+    dates = daily.get("time") or []
+    highs = daily.get("temperature_2m_max") or []
+    lows = daily.get("temperature_2m_min") or []
+    rain = daily.get("precipitation_sum") or []
+
+    length = min(len(dates), len(highs), len(lows), len(rain))
+    if not length:
+        return {}
+
+    stamps = np.array(dates[:length], dtype="datetime64[D]")
+    months_start = stamps.astype("datetime64[M]")
+    years = stamps.astype("datetime64[Y]").astype(np.int64) + 1970
+    month_day = (months_start.astype(np.int64) % 12 + 1) * 100 + (stamps - months_start).astype(np.int64) + 1
+    in_season = (
+        ~np.isnat(stamps)
+        & (month_day >= start_month * 100 + start_day)
+        & (month_day <= end_month * 100 + end_day)
+    )
+    if not in_season.any():
+        return {}
+
+    season_years = years[in_season]
+    unique_years, first_seen, year_idx = np.unique(season_years, return_index=True, return_inverse=True)
+    bins = len(unique_years)
+
+    def _readings(values: list[Any]) -> tuple[np.ndarray, np.ndarray]:
+        raw = np.array(values[:length], dtype=object)[in_season]
+        present = raw != None  # noqa: E711 - elementwise comparison on an object array
+        parsed = np.zeros(len(raw), dtype=np.float64)
+        parsed[present] = raw[present].astype(np.float64)
+        return parsed, present
+
+    high_values, high_present = _readings(highs)
+    low_values, low_present = _readings(lows)
+    rain_values, rain_present = _readings(rain)
+
+    def _sums(values: np.ndarray, present: np.ndarray) -> list[float]:
+        # The same builtin sum() over the same floats in the same order as the row-wise path, so the totals are
+        # identical on every Python version (sum() compensates on 3.12+, where bincount's running sum would not).
+        groups = year_idx[present]
+        order = np.argsort(groups, kind="stable")
+        bounds = np.searchsorted(groups[order], np.arange(1, bins))
+        return [sum(chunk.tolist()) for chunk in np.split(values[present][order], bounds)]
+
+    high_count = np.bincount(year_idx, weights=high_present, minlength=bins)
+    low_count = np.bincount(year_idx, weights=low_present, minlength=bins)
+    high_sum = _sums(high_values, high_present)
+    low_sum = _sums(low_values, low_present)
+    rain_count = np.bincount(year_idx, weights=rain_present, minlength=bins)
+    rain_sum = _sums(rain_values, rain_present)
+    rainy_days = np.bincount(year_idx[rain_present & (rain_values >= 1.0)], minlength=bins)
+
+    high_max = np.full(bins, -np.inf)
+    np.maximum.at(high_max, year_idx[high_present], high_values[high_present])
+    low_min = np.full(bins, np.inf)
+    np.minimum.at(low_min, year_idx[low_present], low_values[low_present])
+
+    summarized: dict[int, dict[str, float]] = {}
+    for bucket in np.argsort(first_seen, kind="stable"):
+        if not high_count[bucket] or not low_count[bucket]:
+            continue
+        summarized[int(unique_years[bucket])] = {
+            "avg_high_c": round(float(high_sum[bucket]) / int(high_count[bucket]), 2),
+            "max_high_c": round(float(high_max[bucket]), 2),
+            "avg_low_c": round(float(low_sum[bucket]) / int(low_count[bucket]), 2),
+            "min_low_c": round(float(low_min[bucket]), 2),
+            "rain_total_mm": round(float(rain_sum[bucket]), 2) if rain_count[bucket] else 0,
+            "rainy_days": int(rainy_days[bucket]),
+        }
+    return summarized
+
+
+def _aggregate_seasonal_metrics_rowwise(
+    daily: dict[str, list[Any]],
+    start_month: int,
+    start_day: int,
+    end_month: int,
+    end_day: int,
 ) -> dict[int, dict[str, float]]:
     dates = daily.get("time") or []
     highs = daily.get("temperature_2m_max") or []
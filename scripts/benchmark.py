@@ -0,0 +1,764 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the Wine Reference API hot paths.
+
+Usage:
+  python scripts/benchmark.py cms-index --sizes 100 1000 10000 100000
+  python scripts/benchmark.py seasonal --years 20 40
+  python scripts/benchmark.py upstream-pool --requests 2000 --concurrency 16
+  python scripts/benchmark.py cms-pack --sizes 1000 10000 100000
+  python scripts/benchmark.py explain-cache --size 10000 --requests 2000
+  python scripts/benchmark.py suite --sizes 1000 10000 100000 --json artifacts/bench.json
+  python scripts/benchmark.py suite --sizes 1000 --baseline artifacts/bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib import parse, request
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app import main  # noqa: E402
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def format_us(seconds: float) -> str:
+    return f"{seconds * 1_000_000:9.1f} us"
+
+
+STUB_VINEYARDS = [(44.84, -0.58), (38.5, -122.47), (42.47, -2.45), (47.04, 4.84), (-33.92, 18.86)]
+
+
+SYNTHETIC_GRAPES = ("Cabernet Sauvignon", "Merlot", "Pinot Noir", "Syrah", "Tempranillo", "Nebbiolo", "Riesling", "Chardonnay")
+SYNTHETIC_NOTES = (
+    "blackcurrant", "cherry", "plum", "violet", "tobacco", "cedar", "leather", "graphite", "citrus", "peach",
+    "honey", "brioche", "flint", "pepper", "licorice", "mint", "truffle", "vanilla", "apricot", "rose",
+)  # fmt: skip
+
+
+def write_synthetic_cms(wines_dir: Path, size: int, with_climate: bool = False) -> list[tuple[str, int]]:
+    wines_dir.mkdir(parents=True, exist_ok=True)
+    queries: list[tuple[str, int]] = []
+    for idx in range(size):
+        name = f"Synthetic Cuvee {idx}"
+        vintage = 1990 + idx % 30
+        # Slugs intentionally differ from the name so lookups miss the slug fast path.
+        slug = f"wine-{idx:06d}"
+        document = {
+            "slug": slug,
+            "name": name,
+            "wine_name": name,
+            "vintage": vintage,
+            "producer": f"Producer {idx % 500}",
+            "region": f"Region {idx % 40}",
+            "grapes": [SYNTHETIC_GRAPES[idx % len(SYNTHETIC_GRAPES)], SYNTHETIC_GRAPES[(idx // 7) % len(SYNTHETIC_GRAPES)]],
+            "summary": "Synthetic benchmark document with "
+            + ", ".join(SYNTHETIC_NOTES[(idx * step) % len(SYNTHETIC_NOTES)] for step in (1, 3, 11))
+            + " notes.",
+        }
+        if with_climate:
+            latitude, longitude = STUB_VINEYARDS[idx % len(STUB_VINEYARDS)]
+            document["climate_context"] = {"latitude": latitude, "longitude": longitude}
+        with (wines_dir / f"{slug}.json").open("w", encoding="utf-8") as handle:
+            json.dump(document, handle)
+        queries.append((name, vintage))
+    return queries
+
+
+def bench_cms_index(sizes: list[int], lookups: int) -> None:
+    print(
+        f"{'documents':>10} {'build':>12} {'exact p50':>12} {'exact p99':>12} "
+        f"{'typo p50':>12} {'typo p99':>12} {'miss p50':>12} {'miss p99':>12}"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            main.CMS_WINES_DIR = Path(tmp) / "wines"
+            main._CMS_INDEX_READY = False
+            queries = write_synthetic_cms(main.CMS_WINES_DIR, size)
+
+            started = time.perf_counter()
+            main._ensure_cms_index()
+            build_s = time.perf_counter() - started
+
+            samples: dict[str, list[float]] = {"exact": [], "typo": [], "miss": []}
+            for idx in range(lookups):
+                name, vintage = queries[(idx * 7919) % size]
+                # Exact name; a transposition plus missing accents, resolved by the trigram index; a name
+                # absent from the CMS, which pays for the fuzzy probe before falling through to upstreams.
+                for kind, query, expect in (
+                    ("exact", name, name),
+                    ("typo", name.replace("Synthetic Cuvee", "Syntehtic Cuvée"), name),
+                    ("miss", name.replace("Synthetic", "Unlisted"), None),
+                ):
+                    started = time.perf_counter()
+                    found = main._fetch_git_cms_wine_data(query, vintage)
+                    samples[kind].append(time.perf_counter() - started)
+                    if (found or {}).get("name") != expect:
+                        raise RuntimeError(f"Lookup for {query} {vintage} returned {found and found.get('name')}")
+
+            print(
+                f"{size:>10} {build_s:>10.2f} s "
+                + " ".join(f"{format_us(statistics.median(values))} {format_us(percentile(values, 99))}" for values in samples.values())
+            )
+
+
+def bench_cms_pack(sizes: list[int], reads: int) -> None:
+    print(f"{'documents':>10} {'store':>6} {'index build':>12} {'get p50':>12} {'page p50':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            main.CMS_WINES_DIR = Path(tmp) / "wines"
+            write_synthetic_cms(main.CMS_WINES_DIR, size)
+            slugs = sorted(f"wine-{idx:06d}" for idx in range(size))
+            for store in ("files", "pack"):
+                if store == "pack":
+                    main._build_cms_pack()
+                main._CMS_INDEX_READY = False
+                started = time.perf_counter()
+                main._ensure_cms_index()
+                build_s = time.perf_counter() - started
+
+                get_samples = []
+                page_samples = []
+                for idx in range(reads):
+                    slug = slugs[(idx * 7919) % size]
+                    started = time.perf_counter()
+                    main.get_cms_wine(slug)
+                    get_samples.append(time.perf_counter() - started)
+                    started = time.perf_counter()
+                    main.list_cms_wines(limit=100, cursor=slug)
+                    page_samples.append(time.perf_counter() - started)
+                print(
+                    f"{size:>10} {store:>6} {build_s:>10.2f} s {format_us(statistics.median(get_samples))} "
+                    f"{format_us(statistics.median(page_samples))}"
+                )
+            (main.CMS_WINES_DIR.parent / "wines.pack").unlink()
+            main._open_cms_pack()
+
+
+def bench_cms_search(sizes: list[int], queries: int) -> None:
+    print(f"{'documents':>10} {'initial build':>14} {'reopen':>10} {'upsert':>12} {'query p50':>12} {'query p95':>12} {'query p99':>12}")
+    terms = ["cuvee 12", "producer 4", "region 7 pinot", "tobacco cedar", "syn", "tempran", "graphite", "noir violet"]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            main.CMS_WINES_DIR = Path(tmp) / "wines"
+            write_synthetic_cms(main.CMS_WINES_DIR, size)
+            main._CMS_INDEX_READY = False
+            main._ensure_cms_index()
+
+            with main._CMS_SEARCH_LOCK:
+                started = time.perf_counter()
+                main._cms_search_connection()
+                build_s = time.perf_counter() - started
+                main._CMS_SEARCH["stale"] = True
+                started = time.perf_counter()
+                main._cms_search_connection()
+                reopen_s = time.perf_counter() - started
+
+            upserts = []
+            for idx in range(min(200, size)):
+                slug = f"wine-{(idx * 7919) % size:06d}"
+                payload = main._load_cms_document(slug)
+                started = time.perf_counter()
+                main._index_cms_search(slug, {**payload, "summary": f"Revised {idx}."})
+                upserts.append(time.perf_counter() - started)
+
+            samples = []
+            for idx in range(queries):
+                match = main._cms_search_expression(terms[idx % len(terms)])
+                started = time.perf_counter()
+                main._search_cms(match, 20)
+                samples.append(time.perf_counter() - started)
+            print(
+                f"{size:>10} {build_s:>12.2f} s {reopen_s * 1000:>7.1f} ms {format_us(statistics.median(upserts))} "
+                f"{format_us(percentile(samples, 50))} {format_us(percentile(samples, 95))} {format_us(percentile(samples, 99))}"
+            )
+            main._close_cms_search()
+
+
+def bench_cms_watch(size: int, changes: list[int], debounce_ms: float) -> None:
+    print(f"{'corpus':>8} {'mode':>8} {'changed':>8} {'batches':>8} {'visible after':>14} {'applied':>8}")
+    for mode in ("auto", "polling"):
+        with tempfile.TemporaryDirectory() as tmp:
+            main.CMS_WINES_DIR = Path(tmp) / "wines"
+            write_synthetic_cms(main.CMS_WINES_DIR, size)
+            main._CMS_INDEX_READY = False
+            main._ensure_cms_index()
+            os.environ.update(CMS_WATCH=mode, CMS_WATCH_DEBOUNCE_SECONDS=str(debounce_ms / 1000), CMS_WATCH_POLL_SECONDS="0.5")
+            main._start_cms_watcher()
+            try:
+                while main._cms_watcher_snapshot()["mode"] == "starting":
+                    time.sleep(0.01)
+                for round_idx, count in enumerate(changes):
+                    before = main._cms_watcher_snapshot()
+                    # Stand-in for a `git pull`: rewrite `count` documents as fast as possible.
+                    for idx in range(count):
+                        slug = f"wine-{(idx * 7919) % size:06d}"
+                        with (main.CMS_WINES_DIR / f"{slug}.json").open("w", encoding="utf-8") as handle:
+                            json.dump({"name": f"Pulled Cuvee {round_idx}-{idx}", "vintage": 2020}, handle)
+                    written_at = time.perf_counter()
+                    last = f"pulled cuvee {round_idx}-{count - 1}"
+                    while not main._lookup_cms_index(last, 2020):
+                        time.sleep(0.005)
+                    visible_s = time.perf_counter() - written_at
+                    while main._cms_watcher_snapshot()["files_applied"] - before["files_applied"] < count:
+                        time.sleep(0.005)
+                    after = main._cms_watcher_snapshot()
+                    print(
+                        f"{size:>8} {after['mode']:>8} {count:>8} {after['batches'] - before['batches']:>8} "
+                        f"{visible_s * 1000:>11.0f} ms {after['files_applied'] - before['files_applied']:>8}"
+                    )
+            finally:
+                main._stop_cms_watcher()
+                main._close_cms_search()
+
+
+def synthetic_daily(years: int) -> dict[str, list]:
+    rng = random.Random(years)
+    end = date(2024, 12, 31)
+    current = date(end.year - years + 1, 1, 1)
+    daily: dict[str, list] = {"time": [], "temperature_2m_max": [], "temperature_2m_min": [], "precipitation_sum": []}
+    while current <= end:
+        daily["time"].append(current.isoformat())
+        daily["temperature_2m_max"].append(round(rng.uniform(10, 38), 1))
+        daily["temperature_2m_min"].append(round(rng.uniform(-4, 18), 1))
+        daily["precipitation_sum"].append(round(max(0.0, rng.gauss(1.5, 4)), 1))
+        current += timedelta(days=1)
+    return daily
+
+
+def bench_seasonal(year_counts: list[int], repeats: int) -> None:
+    print(f"{'years':>6} {'rows':>7} {'row-wise':>12} {'vectorized':>12} {'speedup':>8}")
+    for years in year_counts:
+        daily = synthetic_daily(years)
+        window = (4, 1, 10, 31)
+        expected = main._aggregate_seasonal_metrics_rowwise(daily, *window)
+        if main._aggregate_seasonal_metrics_vectorized(daily, *window) != expected:
+            raise RuntimeError("Vectorized aggregation diverged from the row-wise implementation.")
+
+        timings = {}
+        for label, func in (
+            ("rowwise", main._aggregate_seasonal_metrics_rowwise),
+            ("vectorized", main._aggregate_seasonal_metrics_vectorized),
+        ):
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                func(daily, *window)
+                samples.append(time.perf_counter() - started)
+            timings[label] = statistics.median(samples)
+
+        print(
+            f"{years:>6} {len(daily['time']):>7} {timings['rowwise'] * 1000:>9.2f} ms "
+            f"{timings['vectorized'] * 1000:>9.2f} ms {timings['rowwise'] / timings['vectorized']:>7.1f}x"
+        )
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """Keep-alive JSON stub standing in for WineVybe/Vinou.
+
+    Loopback connections are nearly free, so `handshake_seconds` charges each new connection
+    the TCP+TLS setup cost a real upstream would.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    handshake_seconds = 0.0
+    body = json.dumps({"data": {"name": "Opus One", "summary": "Stub upstream profile."}}).encode("utf-8")
+
+    def setup(self) -> None:
+        time.sleep(self.handshake_seconds)
+        super().setup()
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stub_server(handler: type[BaseHTTPRequestHandler]) -> tuple[ThreadingHTTPServer, str]:
+    server = StubServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def fresh_connection_get(url: str) -> dict:
+    with request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def pooled_get(url: str) -> dict:
+    return main._http_get_json(url, timeout=10)
+
+
+def run_concurrent(call: Callable[[int], object], total: int, concurrency: int) -> tuple[list[float], float]:
+    def timed(idx: int) -> float:
+        started = time.perf_counter()
+        call(idx)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(total)))
+    return samples, time.perf_counter() - started
+
+
+def bench_upstream_pool(total: int, concurrency: int, handshake_ms: float) -> None:
+    StubUpstreamHandler.handshake_seconds = handshake_ms / 1000
+    server, url = start_stub_server(StubUpstreamHandler)
+    try:
+        print(f"{'client':>16} {'p50':>12} {'p95':>12} {'p99':>12} {'req/s':>9}")
+        for label, fetch in (("fresh urlopen", fresh_connection_get), ("pooled httpx", pooled_get)):
+            fetch(url)
+            samples, elapsed = run_concurrent(
+                lambda idx: fetch(f"{url}/wine?name=Opus+One&vintage={2000 + idx % 20}"), total, concurrency
+            )
+            print(
+                f"{label:>16} {format_us(percentile(samples, 50))} {format_us(percentile(samples, 95))} "
+                f"{format_us(percentile(samples, 99))} {total / elapsed:>9.0f}"
+            )
+    finally:
+        main._close_http_clients()
+        server.shutdown()
+
+
+def daily_between(start: date, end: date) -> dict[str, list]:
+    rng = random.Random(start.toordinal())
+    daily: dict[str, list] = {"time": [], "temperature_2m_max": [], "temperature_2m_min": [], "precipitation_sum": []}
+    current = start
+    while current <= end:
+        daily["time"].append(current.isoformat())
+        daily["temperature_2m_max"].append(round(rng.uniform(10, 38), 1))
+        daily["temperature_2m_min"].append(round(rng.uniform(-4, 18), 1))
+        daily["precipitation_sum"].append(round(max(0.0, rng.gauss(1.5, 4)), 1))
+        current += timedelta(days=1)
+    return daily
+
+
+class StubSourcesHandler(BaseHTTPRequestHandler):
+    """One local server standing in for WineVybe, Vinou, Open-Meteo and the OpenAI Responses API.
+
+    Names starting with "Unlisted" miss both wine sources, so those lookups fall through to OpenAI.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency_seconds = 0.0
+    openai_latency_seconds = 0.0
+    payload_kb = 1
+
+    def do_GET(self) -> None:
+        url = parse.urlsplit(self.path)
+        query = {key: values[0] for key, values in parse.parse_qs(url.query).items()}
+        time.sleep(self.latency_seconds)
+        if url.path == "/v1/archive":
+            daily = daily_between(date.fromisoformat(query["start_date"]), date.fromisoformat(query["end_date"]))
+            self.send_json(200, {"daily": daily})
+        elif url.path in {"/winevybe", "/vinou"} and not query.get("name", "").startswith("Unlisted"):
+            latitude, longitude = STUB_VINEYARDS[sum(map(ord, query["name"])) % len(STUB_VINEYARDS)]
+            self.send_json(
+                200,
+                {
+                    "data": {
+                        "name": query["name"],
+                        "summary": f"Stub {url.path[1:]} profile.",
+                        "producer": "Stub Estate",
+                        "region": "Stub Valley",
+                        "climate_context": {"latitude": latitude, "longitude": longitude},
+                        "notes": "x" * (self.payload_kb * 1024),
+                    }
+                },
+            )
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.openai_latency_seconds)
+        text = json.dumps({"summary": "Stub OpenAI overview. " + "y" * (self.payload_kb * 1024), "uncertainty_notes": []})
+        self.send_json(
+            200,
+            {
+                "id": "resp_stub",
+                "object": "response",
+                "created_at": int(time.time()),
+                "model": "gpt-4.1-mini",
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "id": "msg_stub",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}],
+                    }
+                ],
+                "parallel_tool_calls": False,
+                "tool_choice": "auto",
+                "tools": [],
+            },
+        )
+
+    def send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+def write_x_wines_origin(origin: Path, rows: int) -> None:
+    origin.mkdir(parents=True, exist_ok=True)
+    lines = ["WineID,WineName,Type,WineryName,RegionName"]
+    lines += [f"{100000 + idx},Synthetic Import {idx},Red,Winery {idx % 500},Region {idx % 40}" for idx in range(rows)]
+    (origin / "XWines_Bench_wines.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    commit_all(origin, "dataset", init=True)
+
+
+def commit_all(repo: Path, message: str, init: bool = False) -> None:
+    if init:
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    git = ["git", "-C", str(repo), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run([*git, "add", "-A"], check=True)
+    subprocess.run([*git, "commit", "-qm", message], check=True)
+
+
+def point_app_at(root: Path) -> None:
+    main.CMS_DIR = root / "cms"
+    main.CMS_WINES_DIR = main.CMS_DIR / "wines"
+    main.XWINES_CLONE_DIR = main.CMS_DIR / "sources" / "x-wines"
+    main.XWINES_STATE_FILE = main.CMS_DIR / "sources" / "x-wines.state.json"
+    main.OPEN_METEO_CACHE_DIR = root / "open-meteo"
+    main._CMS_INDEX_READY = False
+
+
+def summarize(samples: list[float], elapsed: float) -> dict[str, float]:
+    return {
+        "requests": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+    }
+
+
+def bench_http_scenarios(size: int, queries: list[tuple[str, int]], total: int, concurrency: int) -> dict[str, dict]:
+    from fastapi.testclient import TestClient
+
+    local = threading.local()
+
+    def client() -> TestClient:
+        if not hasattr(local, "client"):
+            local.client = TestClient(main.app)
+        return local.client
+
+    def get(path: str, **params) -> None:
+        response = client().get(path, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} {params} returned {response.status_code}: {response.text[:200]}")
+
+    rng = random.Random(size)
+    slugs = sorted(f"wine-{idx:06d}" for idx in range(size))
+    scenarios: dict[str, Callable[[int], object]] = {
+        "explain-wine cms": lambda idx: get("/explain-wine", name=queries[(idx * 7919) % size][0], vintage=queries[(idx * 7919) % size][1]),
+        "explain-wine upstream": lambda idx: get("/explain-wine", name=f"Stub Cuvee {size}-{idx}", vintage=2015),
+        "explain-wine openai": lambda idx: get("/explain-wine", name=f"Unlisted Cuvee {size}-{idx}", vintage=2015),
+        "cms/wines page": lambda idx: get("/cms/wines", limit=100, cursor=slugs[rng.randrange(size)]),
+        "cms/wines filtered": lambda idx: get(
+            "/cms/wines", region=f"Region {idx % 40}", vintage_from=2000, vintage_to=2010, fields="name,vintage", limit=50
+        ),
+    }
+    # Measure steady state: every stub vineyard's weather history is already in the disk cache.
+    for latitude, longitude in STUB_VINEYARDS:
+        main._build_growing_season_weather({"latitude": latitude, "longitude": longitude}, 2015)
+    results = {}
+    for label, call in scenarios.items():
+        call(-1)  # Warm-up: pooled connections and sorted index views.
+        samples, elapsed = run_concurrent(call, total, concurrency)
+        results[label] = summarize(samples, elapsed)
+    return results
+
+
+def bench_importer(root: Path, rows: int) -> dict[str, dict]:
+    origin = root / "x-wines-origin"
+    write_x_wines_origin(origin, rows)
+    point_app_at(root / "import")
+    results = {}
+    # "unchanged" forces a full re-read; as a sync it would see no new commit and read nothing. It measures the
+    # content-hash skip path instead.
+    phases = [("import full", None, False), ("import unchanged", None, True), ("import 1% changed", max(1, rows // 100), False)]
+    for label, changed, full in phases:
+        if changed:
+            csv_path = origin / "XWines_Bench_wines.csv"
+            lines = csv_path.read_text(encoding="utf-8").splitlines()
+            for idx in range(1, changed + 1):
+                lines[idx] = lines[idx].replace(",Red,", ",White,")
+            csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            commit_all(origin, "update")
+        progress: dict = {}
+        started = time.perf_counter()
+        main._import_x_wines_dataset(repo_url=origin.as_uri(), limit=None, progress=progress, full=full)
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "requests": 1,
+            "seconds": elapsed,
+            "rows_read": progress.get("rows_read", 0),
+            "written": progress.get("written", 0),
+            "throughput": rows / elapsed,
+        }
+    return results
+
+
+def bench_explain_cache(size: int, total: int, concurrency: int, upstream_latency_ms: float) -> None:
+    from fastapi.testclient import TestClient
+
+    StubSourcesHandler.latency_seconds = upstream_latency_ms / 1000
+    server, url = start_stub_server(StubSourcesHandler)
+    env = {"WINEVYBE_API_URL": f"{url}/winevybe", "VINOU_API_URL": f"{url}/vinou"}
+    saved_env = {key: os.environ.get(key) for key in (*env, "EXPLAIN_WINE_CACHE_TTL_SECONDS")}
+    saved_paths = (main.CMS_DIR, main.CMS_WINES_DIR, main.XWINES_CLONE_DIR, main.XWINES_STATE_FILE, main.OPEN_METEO_CACHE_DIR)
+    saved_archive_url = main.OPEN_METEO_ARCHIVE_URL
+    os.environ.update(env)
+    main.OPEN_METEO_ARCHIVE_URL = f"{url}/v1/archive"
+    local = threading.local()
+
+    def get(query: tuple[str, int], etag: bool = False) -> None:
+        if not hasattr(local, "client"):
+            local.client = TestClient(main.app)
+        headers = {"If-None-Match": main._EXPLAIN_CACHE[query]["etag"]} if etag else {}
+        response = local.client.get("/explain-wine", params={"name": query[0], "vintage": query[1]}, headers=headers)
+        if response.status_code != (304 if etag else 200):
+            raise RuntimeError(f"/explain-wine {query} returned {response.status_code}: {response.text[:200]}")
+
+    print(f"{'source':>9} {'scenario':<22} {'p50':>12} {'p95':>12} {'p99':>12} {'req/s':>9}")
+    root = Path(tempfile.mkdtemp(prefix="wine-bench-explain-cache-"))
+    try:
+        point_app_at(root)
+        sources = {
+            "git_cms": write_synthetic_cms(main.CMS_WINES_DIR, size)[:total],
+            "upstream": [(f"Stub Cuvee {idx}", 2015) for idx in range(total)],
+        }
+        main._ensure_cms_index()
+        for latitude, longitude in STUB_VINEYARDS:
+            main._build_growing_season_weather({"latitude": latitude, "longitude": longitude}, 2015)
+        for source, queries in sources.items():
+            main._clear_explain_cache()
+            for label, ttl, etag in (("uncached", "0", False), ("miss", "300", False), ("hit", "300", False), ("304", "300", True)):
+                os.environ["EXPLAIN_WINE_CACHE_TTL_SECONDS"] = ttl
+                samples, elapsed = run_concurrent(lambda idx: get(queries[idx], etag), len(queries), concurrency)
+                print(
+                    f"{source:>9} {label:<22} {format_us(percentile(samples, 50))} {format_us(percentile(samples, 95))} "
+                    f"{format_us(percentile(samples, 99))} {len(samples) / elapsed:>9.0f}"
+                )
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        main.CMS_DIR, main.CMS_WINES_DIR, main.XWINES_CLONE_DIR, main.XWINES_STATE_FILE, main.OPEN_METEO_CACHE_DIR = saved_paths
+        main.OPEN_METEO_ARCHIVE_URL = saved_archive_url
+        main._CMS_INDEX_READY = False
+        main._clear_explain_cache()
+        main._close_http_clients()
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def print_suite_row(size: int, label: str, stats: dict) -> None:
+    if "seconds" in stats:
+        print(
+            f"{size:>7} {label:<24} {stats['rows_read']:>8} rows {stats['written']:>8} written "
+            f"{stats['seconds']:>8.2f} s {stats['throughput']:>9.0f} rows/s"
+        )
+        return
+    print(
+        f"{size:>7} {label:<24} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+        f"{stats['throughput']:>9.0f}"
+    )
+
+
+def compare_to_baseline(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions = []
+    for key, stats in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        if "p95_ms" in stats and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {before['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+        if stats["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {before['throughput']:.0f} -> {stats['throughput']:.0f}/s")
+    return regressions
+
+
+def bench_suite(args: argparse.Namespace) -> int:
+    StubSourcesHandler.latency_seconds = args.upstream_latency_ms / 1000
+    StubSourcesHandler.openai_latency_seconds = args.openai_latency_ms / 1000
+    StubSourcesHandler.payload_kb = args.payload_kb
+    server, url = start_stub_server(StubSourcesHandler)
+    env = {
+        "WINEVYBE_API_URL": f"{url}/winevybe",
+        "VINOU_API_URL": f"{url}/vinou",
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"{url}/v1",
+        "OPENAI_CMS_TTL_DAYS": "0",
+        # Scenarios measure the full pipeline; `explain-cache` covers the response cache.
+        "EXPLAIN_WINE_CACHE_TTL_SECONDS": "0",
+    }
+    saved_env = {key: os.environ.get(key) for key in env}
+    saved_paths = (main.CMS_DIR, main.CMS_WINES_DIR, main.XWINES_CLONE_DIR, main.XWINES_STATE_FILE, main.OPEN_METEO_CACHE_DIR)
+    saved_archive_url = main.OPEN_METEO_ARCHIVE_URL
+    os.environ.update(env)
+    main.OPEN_METEO_ARCHIVE_URL = f"{url}/v1/archive"
+
+    results: dict[str, dict] = {}
+    print(f"{'wines':>7} {'scenario':<24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    try:
+        for size in args.sizes:
+            root = Path(tempfile.mkdtemp(prefix=f"wine-bench-{size}-"))
+            try:
+                point_app_at(root)
+                queries = write_synthetic_cms(main.CMS_WINES_DIR, size, with_climate=True)
+                started = time.perf_counter()
+                main._ensure_cms_index()
+                print(f"{size:>7} {'cms index build':<24} {(time.perf_counter() - started) * 1000:>9.0f} ms")
+                for label, stats in bench_http_scenarios(size, queries, args.requests, args.concurrency).items():
+                    results[f"{size}/{label}"] = stats
+                    print_suite_row(size, label, stats)
+                if not args.skip_import:
+                    for label, stats in bench_importer(root, size).items():
+                        results[f"{size}/{label}"] = stats
+                        print_suite_row(size, label, stats)
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        main.CMS_DIR, main.CMS_WINES_DIR, main.XWINES_CLONE_DIR, main.XWINES_STATE_FILE, main.OPEN_METEO_CACHE_DIR = saved_paths
+        main.OPEN_METEO_ARCHIVE_URL = saved_archive_url
+        main._CMS_INDEX_READY = False
+        main._close_http_clients()
+        server.shutdown()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        regressions = compare_to_baseline(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    cms_index = subparsers.add_parser("cms-index", help="Git CMS name/vintage lookup latency by corpus size.")
+    cms_index.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    cms_index.add_argument("--lookups", type=int, default=2000)
+
+    seasonal = subparsers.add_parser("seasonal", help="Row-wise vs vectorized growing-season aggregation.")
+    seasonal.add_argument("--years", type=int, nargs="+", default=[20, 40])
+    seasonal.add_argument("--repeats", type=int, default=20)
+
+    cms_pack = subparsers.add_parser("cms-pack", help="Per-file JSON vs the mmap'd pack for index build, get and list.")
+    cms_pack.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    cms_pack.add_argument("--reads", type=int, default=500)
+
+    cms_search = subparsers.add_parser("cms-search", help="FTS5 build, incremental upsert and ranked query latency.")
+    cms_search.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    cms_search.add_argument("--queries", type=int, default=2000)
+
+    cms_watch = subparsers.add_parser("cms-watch", help="External bulk edits (a simulated git pull) picked up by the CMS watcher.")
+    cms_watch.add_argument("--size", type=int, default=20000)
+    cms_watch.add_argument("--changes", type=int, nargs="+", default=[10, 1000, 10000])
+    cms_watch.add_argument("--debounce-ms", type=float, default=250.0)
+
+    explain_cache = subparsers.add_parser("explain-cache", help="/explain-wine response cache: off, cold, warm and 304, per source.")
+    explain_cache.add_argument("--size", type=int, default=10000)
+    explain_cache.add_argument("--requests", type=int, default=2000)
+    explain_cache.add_argument("--concurrency", type=int, default=8)
+    explain_cache.add_argument("--upstream-latency-ms", type=float, default=20.0, help="WineVybe/Vinou stub latency.")
+
+    upstream_pool = subparsers.add_parser("upstream-pool", help="Fresh urllib connections vs the pooled upstream client.")
+    upstream_pool.add_argument("--requests", type=int, default=2000)
+    upstream_pool.add_argument("--concurrency", type=int, default=16)
+    upstream_pool.add_argument("--handshake-ms", type=float, default=30.0, help="Simulated per-connection setup cost.")
+
+    suite = subparsers.add_parser(
+        "suite", help="End-to-end latency/throughput against local stubs for every upstream, per corpus size."
+    )
+    suite.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    suite.add_argument("--requests", type=int, default=300, help="Requests per scenario.")
+    suite.add_argument("--concurrency", type=int, default=8)
+    suite.add_argument("--upstream-latency-ms", type=float, default=20.0, help="WineVybe/Vinou/Open-Meteo stub latency.")
+    suite.add_argument("--openai-latency-ms", type=float, default=200.0)
+    suite.add_argument("--payload-kb", type=int, default=2, help="Filler added to each stub wine/OpenAI payload.")
+    suite.add_argument("--skip-import", action="store_true")
+    suite.add_argument("--json", help="Write results to this file (use as a later --baseline).")
+    suite.add_argument("--baseline", help="Compare against an earlier --json run; exit 1 on regressions.")
+    suite.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95/throughput drift vs the baseline.")
+
+    args = parser.parse_args()
+    if args.command == "cms-index":
+        bench_cms_index(args.sizes, args.lookups)
+    elif args.command == "seasonal":
+        bench_seasonal(args.years, args.repeats)
+    elif args.command == "cms-pack":
+        bench_cms_pack(args.sizes, args.reads)
+    elif args.command == "cms-search":
+        bench_cms_search(args.sizes, args.queries)
+    elif args.command == "cms-watch":
+        bench_cms_watch(args.size, args.changes, args.debounce_ms)
+    elif args.command == "explain-cache":
+        bench_explain_cache(args.size, args.requests, args.concurrency, args.upstream_latency_ms)
+    elif args.command == "upstream-pool":
+        bench_upstream_pool(args.requests, args.concurrency, args.handshake_ms)
+    elif args.command == "suite":
+        return bench_suite(args)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
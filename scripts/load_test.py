@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Drive concurrent traffic against a locally launched Wine Reference API.
+
+Usage:
+  python scripts/load_test.py --workers 4 --concurrency 32 --duration 30
+  python scripts/load_test.py --workers 2 --rate 200 --mix explain=6,list=3,put=1 --stub-upstreams
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ui_loop import port_is_free, start_server, stop_server, wait_for_server  # noqa: E402
+
+OPERATIONS = ("explain", "list", "put")
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {op!r}; expected one of {', '.join(OPERATIONS)}.")
+        mix[op] = int(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The traffic mix needs at least one positive weight.")
+    return mix
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def seed_corpus(client: httpx.Client, size: int) -> list[str]:
+    names = []
+    for idx in range(size):
+        name = f"Load Test Cuvee {idx}"
+        # Slug matches the name so every worker's slug fast path finds it, not just the one that indexed the write.
+        response = client.put(
+            f"/cms/wines/{slugify(name)}",
+            json={"name": name, "producer": f"Producer {idx % 50}", "region": f"Region {idx % 10}", "summary": "Seeded."},
+        )
+        response.raise_for_status()
+        names.append(name)
+    return names
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, op: str, latency: float, status: str) -> None:
+        with self.lock:
+            self.latencies[op].append(latency)
+            self.statuses[op][status] += 1
+
+
+def build_operations(names: list[str], miss_ratio: float) -> dict[str, Callable[[httpx.Client, random.Random], httpx.Response]]:
+    def explain(client: httpx.Client, rng: random.Random) -> httpx.Response:
+        if rng.random() < miss_ratio:
+            return client.get("/explain-wine", params={"name": f"Unlisted Cuvee {rng.randrange(10**9)}", "vintage": 2015})
+        return client.get("/explain-wine", params={"name": rng.choice(names)})
+
+    def list_wines(client: httpx.Client, rng: random.Random) -> httpx.Response:
+        if rng.random() < 0.5:
+            return client.get("/cms/wines", params={"limit": 50, "cursor": slugify(rng.choice(names))})
+        return client.get("/cms/wines", params={"region": f"Region {rng.randrange(10)}", "fields": "name,producer", "limit": 50})
+
+    def put(client: httpx.Client, rng: random.Random) -> httpx.Response:
+        name = rng.choice(names)
+        return client.put(f"/cms/wines/{slugify(name)}", json={"name": name, "summary": f"Revision {rng.randrange(10**6)}."})
+
+    return {"explain": explain, "list": list_wines, "put": put}
+
+
+def run_load(
+    base_url: str,
+    operations: dict[str, Callable],
+    mix: dict[str, int],
+    duration: float,
+    concurrency: int,
+    rate: float,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    ops = [op for op, weight in mix.items() if weight > 0]
+    weights = [mix[op] for op in ops]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    client = httpx.Client(base_url=base_url, timeout=30, limits=limits)
+
+    def issue(rng: random.Random, scheduled: float) -> None:
+        op = rng.choices(ops, weights)[0]
+        try:
+            status = str(operations[op](client, rng).status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        # Latency counts from the scheduled start so a backed-up server is not hidden (no coordinated omission).
+        recorder.record(op, time.perf_counter() - scheduled, status)
+
+    started = time.perf_counter()
+    ends_at = started + duration
+    try:
+        if rate > 0:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                rng = random.Random(0)
+                interval = 1 / rate
+                scheduled = started
+                while scheduled < ends_at:
+                    time.sleep(max(0.0, scheduled - time.perf_counter()))
+                    executor.submit(issue, random.Random(rng.random()), scheduled)
+                    scheduled += interval
+        else:
+            def closed_loop(seed: int) -> None:
+                rng = random.Random(seed)
+                while time.perf_counter() < ends_at:
+                    issue(rng, time.perf_counter())
+
+            threads = [threading.Thread(target=closed_loop, args=(seed,)) for seed in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        client.close()
+    return recorder, time.perf_counter() - started
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def report(recorder: Recorder, elapsed: float) -> None:
+    print(f"{'operation':<10} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}  statuses")
+    rows = [(op, recorder.latencies[op], recorder.statuses[op]) for op in OPERATIONS if recorder.latencies[op]]
+    rows.append(("total", [value for _, samples, _ in rows for value in samples], sum((s for _, _, s in rows), Counter())))
+    for op, samples, statuses in rows:
+        errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+        print(
+            f"{op:<10} {len(samples):>9} {len(samples) / elapsed:>8.1f} {percentile(samples, 50) * 1000:>9.1f} "
+            f"{percentile(samples, 95) * 1000:>9.1f} {percentile(samples, 99) * 1000:>9.1f} "
+            f"{errors / len(samples):>6.1%}  {dict(sorted(statuses.items()))}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8124)
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes.")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight requests (closed loop) or max in flight with --rate.")
+    parser.add_argument("--rate", type=float, default=0, help="Target requests/second (open loop); 0 runs closed-loop.")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("explain=6,list=3,put=1"))
+    parser.add_argument("--seed-wines", type=int, default=500, help="CMS documents created before the run.")
+    parser.add_argument("--miss-ratio", type=float, default=0.0, help="Share of /explain-wine calls for wines not in the CMS.")
+    parser.add_argument("--stub-upstreams", action="store_true", help="Point WineVybe/Vinou/Open-Meteo/OpenAI at local stubs.")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    if not port_is_free(args.port):
+        raise RuntimeError(f"Port {args.port} is in use. Stop other servers or pass --port <free-port>.")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="wine-load-"))
+    env = {"CMS_DIR": str(work_dir / "cms"), "OPEN_METEO_CACHE_DIR": str(work_dir / "open-meteo")}
+    stub = None
+    if args.stub_upstreams:
+        from benchmark import StubSourcesHandler, start_stub_server
+
+        StubSourcesHandler.latency_seconds = args.upstream_latency_ms / 1000
+        StubSourcesHandler.openai_latency_seconds = args.openai_latency_ms / 1000
+        stub, stub_url = start_stub_server(StubSourcesHandler)
+        env.update(
+            {
+                "WINEVYBE_API_URL": f"{stub_url}/winevybe",
+                "VINOU_API_URL": f"{stub_url}/vinou",
+                "OPEN_METEO_ARCHIVE_URL": f"{stub_url}/v1/archive",
+                "OPENAI_API_KEY": "stub-key",
+                "OPENAI_BASE_URL": f"{stub_url}/v1",
+                "OPENAI_CMS_TTL_DAYS": "0",
+            }
+        )
+
+    server = start_server(args.port, workers=args.workers, env=env)
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        wait_for_server(f"{base_url}/health")
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            names = seed_corpus(client, args.seed_wines)
+        print(
+            f"Seeded {len(names)} wines; {args.workers} worker(s), "
+            + (f"{args.rate:g} req/s target" if args.rate > 0 else f"{args.concurrency} concurrent")
+            + f", {args.duration:g}s, mix {args.mix}"
+        )
+        recorder, elapsed = run_load(
+            base_url,
+            build_operations(names, args.miss_ratio),
+            args.mix,
+            args.duration,
+            args.concurrency,
+            args.rate,
+        )
+        report(recorder, elapsed)
+        return 0
+    finally:
+        stop_server(server)
+        if stub:
+            stub.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,13 +8,17 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import socket
 import subprocess
 import sys
 import time
 from pathlib import Path
+from typing import Optional
 from urllib.request import urlopen
 
+ROOT = Path(__file__).resolve().parents[1]
+
 
 def wait_for_server(url: str, timeout_s: float = 20.0) -> None:
     deadline = time.time() + timeout_s
@@ -33,6 +37,36 @@ def port_is_free(port: int) -> bool:
         return sock.connect_ex(("127.0.0.1", port)) != 0
 
 
+def start_server(port: int, workers: int = 1, env: Optional[dict[str, str]] = None) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "0.0.0.0",
+        "--port",
+        str(port),
+    ]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    return subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
 def capture_ui(base_url: str, name: str, vintage: str, output: Path) -> None:
     try:
         from playwright.sync_api import sync_playwright
@@ -76,20 +110,7 @@ def main() -> int:
             f"Port {args.port} is in use. Stop other servers or pass --port <free-port>."
         )
 
-    server = subprocess.Popen(
-        [
-            sys.executable,
-            "-m",
-            "uvicorn",
-            "app.main:app",
-            "--host",
-            "0.0.0.0",
-            "--port",
-            str(args.port),
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+    server = start_server(args.port)
 
     try:
         base_url = f"http://127.0.0.1:{args.port}"
@@ -98,11 +119,7 @@ def main() -> int:
         print(f"Saved screenshot: {args.out}")
         return 0
     finally:
-        server.terminate()
-        try:
-            server.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            server.kill()
+        stop_server(server)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,480 @@
+import json
+import unittest
+from unittest.mock import patch
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+
+
+class GitCmsTests(unittest.TestCase):
+    def setUp(self):
+        self.cms_dir = Path("cms")
+        if self.cms_dir.exists():
+            shutil.rmtree(self.cms_dir)
+        main._clear_explain_cache()
+        main._CMS_INDEX_READY = False
+
+    def tearDown(self):
+        if self.cms_dir.exists():
+            shutil.rmtree(self.cms_dir)
+        main._clear_explain_cache()
+        main._CMS_INDEX_READY = False
+
+    def test_name_index_resolves_documents_stored_under_other_slugs(self):
+        client = TestClient(app)
+        client.put("/cms/wines/om-2018", json={"name": "Opus One", "vintage": 2018})
+        client.put("/cms/wines/om-2019", json={"name": "Opus One", "vintage": "2019"})
+
+        found = main._fetch_git_cms_wine_data("  opus one ", 2019)
+        self.assertEqual(found["slug"], "om-2019")
+        self.assertIsNone(main._fetch_git_cms_wine_data("Opus One", 2017))
+        self.assertIn(main._fetch_git_cms_wine_data("Opus One", None)["slug"], {"om-2018", "om-2019"})
+
+    def test_name_index_follows_renames_and_deletes(self):
+        client = TestClient(app)
+        client.put("/cms/wines/om-2018", json={"name": "Opus One", "vintage": 2018})
+        client.put("/cms/wines/om-2018", json={"name": "Overture", "vintage": 2018})
+
+        self.assertIsNone(main._fetch_git_cms_wine_data("Opus One", 2018))
+        self.assertEqual(main._fetch_git_cms_wine_data("Overture", 2018)["slug"], "om-2018")
+
+        (self.cms_dir / "wines" / "om-2018.json").unlink()
+        self.assertIsNone(main._fetch_git_cms_wine_data("Overture", 2018))
+        self.assertNotIn("om-2018", main._CMS_SLUG_KEYS)
+
+    def test_fuzzy_name_resolution_folds_accents_and_tolerates_typos(self):
+        client = TestClient(app)
+        client.put("/cms/wines/margaux-2015", json={"name": "Château Margaux", "vintage": 2015})
+        client.put("/cms/wines/bin-389", json={"name": "Penfolds Bin 389", "vintage": 2018})
+
+        self.assertEqual(main._fetch_git_cms_wine_data("Chateau Margaux", 2015)["slug"], "margaux-2015")
+        self.assertEqual(main._fetch_git_cms_wine_data("chateau margeaux", 2015)["slug"], "margaux-2015")
+        self.assertIsNone(main._fetch_git_cms_wine_data("Chateau Margaux", 2016))
+        self.assertIsNone(main._fetch_git_cms_wine_data("Penfolds Bin 407", 2018))
+        self.assertIsNone(main._fetch_git_cms_wine_data("Château Latour", 2015))
+        with patch("app.main.os.getenv", side_effect=lambda key: {"CMS_FUZZY_MATCH_THRESHOLD": "0"}.get(key)):
+            self.assertIsNone(main._fetch_git_cms_wine_data("Chateau Margaux", 2015))
+
+        client.put("/cms/wines/margaux-2015", json={"name": "Pavillon Rouge", "vintage": 2015})
+        self.assertIsNone(main._fetch_git_cms_wine_data("Chateau Margaux", 2015))
+        self.assertEqual(main._fetch_git_cms_wine_data("Pavilon Rouge", 2015)["slug"], "margaux-2015")
+
+    def _wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                self.fail("condition not reached before timeout")
+            time.sleep(0.02)
+
+    def test_watcher_applies_external_changes_in_debounced_batches(self):
+        client = TestClient(app)
+        client.put("/cms/wines/kept", json={"name": "Kept Wine"})
+        wines = self.cms_dir / "wines"
+        for mode, expected in (("auto", "inotify"), ("polling", "polling")):
+            with self.subTest(mode=mode):
+                env = {"CMS_WATCH": mode, "CMS_WATCH_DEBOUNCE_SECONDS": "0.1", "CMS_WATCH_POLL_SECONDS": "0.05"}
+                with patch("app.main.os.getenv", side_effect=lambda key: env.get(key)):
+                    main._start_cms_watcher()
+                try:
+                    self._wait_for(lambda: main._cms_watcher_snapshot()["mode"] == expected)
+                    for idx in range(30):
+                        (wines / f"ext-{expected}-{idx}.json").write_text(
+                            json.dumps({"name": f"Pulled {expected} {idx}", "region": f"Mosel {expected}"}), encoding="utf-8"
+                        )
+                    self._wait_for(lambda: main._cms_watcher_snapshot()["files_applied"] == 30)
+                    self.assertLessEqual(main._cms_watcher_snapshot()["batches"], 2)
+                    self.assertEqual(main._lookup_cms_index(f"pulled {expected} 7", None), [f"ext-{expected}-7"])
+                    listing = client.get("/cms/wines", params={"region": f"Mosel {expected}", "limit": 100}).json()
+                    self.assertEqual(len(listing["wines"]), 30)
+
+                    (wines / f"ext-{expected}-0.json").write_text(json.dumps({"name": f"Renamed In Git {expected}"}), encoding="utf-8")
+                    (wines / f"ext-{expected}-1.json").unlink()
+                    client.put(f"/cms/wines/api-{expected}", json={"name": "Written Through The API"})
+                    self._wait_for(lambda: main._cms_watcher_snapshot()["files_applied"] == 32)
+                    self.assertIsNone(main._fetch_git_cms_wine_data(f"Pulled {expected} 1", None))
+                    self.assertEqual(main._lookup_cms_index(f"renamed in git {expected}", None), [f"ext-{expected}-0"])
+                    self.assertEqual(client.get("/cms/search", params={"q": f"renamed {expected}"}).json()["count"], 1)
+                    time.sleep(0.3)
+                    self.assertEqual(main._cms_watcher_snapshot()["files_applied"], 32)
+                finally:
+                    main._stop_cms_watcher()
+        self.assertEqual(main._cms_watcher_snapshot(), {"mode": "off"})
+
+    def _seed_listing(self, client):
+        for idx in range(7):
+            client.put(
+                f"/cms/wines/wine-{idx}",
+                json={
+                    "name": f"Wine {idx}",
+                    "vintage": 2015 + idx,
+                    "region": "Rioja" if idx % 2 else "Napa Valley",
+                    "wine_type": "Red",
+                    "producer": f"Producer {idx % 3}",
+                },
+            )
+
+    def test_listing_pages_with_a_cursor(self):
+        client = TestClient(app)
+        self._seed_listing(client)
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/cms/wines", params=params).json()
+            seen.extend(wine["slug"] for wine in page["wines"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, [f"wine-{idx}" for idx in range(7)])
+
+    def test_listing_views_are_patched_in_place_by_writes(self):
+        client = TestClient(app)
+        self._seed_listing(client)
+        client.get("/cms/wines", params={"limit": 2})
+        client.get("/cms/wines", params={"region": "rioja", "limit": 2})
+        views = dict(main._CMS_SORTED_VIEWS)
+
+        client.put("/cms/wines/wine-10", json={"name": "Wine 10", "region": "Rioja"})
+        client.put("/cms/wines/wine-3", json={"name": "Wine 3", "vintage": 2018, "region": "Napa"})
+        (self.cms_dir / "wines" / "wine-0.json").unlink()
+        main._unindex_cms_wine("wine-0")
+        with patch("app.main.sorted", side_effect=AssertionError("re-sorted a view"), create=True):
+            listed = client.get("/cms/wines", params={"limit": 20}).json()["wines"]
+            rioja = client.get("/cms/wines", params={"region": "rioja", "limit": 20}).json()["wines"]
+        self.assertEqual([wine["slug"] for wine in listed], ["wine-1", "wine-10", *(f"wine-{idx}" for idx in range(2, 7))])
+        self.assertNotIn("wine-3", [wine["slug"] for wine in rioja])
+        self.assertIn("wine-10", [wine["slug"] for wine in rioja])
+        self.assertIs(main._CMS_SORTED_VIEWS[None], views[None])
+        self.assertIs(main._CMS_SORTED_VIEWS[("region", "rioja")], views[("region", "rioja")])
+
+    def test_listing_filters_and_projects_fields(self):
+        client = TestClient(app)
+        self._seed_listing(client)
+
+        page = client.get(
+            "/cms/wines",
+            params={"region": "rioja", "vintage_from": 2017, "vintage_to": 2020, "fields": "name,vintage"},
+        ).json()
+        self.assertEqual(
+            page["wines"],
+            [
+                {"slug": "wine-3", "name": "Wine 3", "vintage": 2018},
+                {"slug": "wine-5", "name": "Wine 5", "vintage": 2020},
+            ],
+        )
+        self.assertIsNone(page["next_cursor"])
+
+        page = client.get("/cms/wines", params={"producer": "Producer 1", "wine_type": "RED", "fields": "name"}).json()
+        self.assertEqual([wine["slug"] for wine in page["wines"]], ["wine-1", "wine-4"])
+
+    def test_packed_store_serves_reads_until_a_document_changes(self):
+        client = TestClient(app)
+        self._seed_listing(client)
+        self.assertEqual(client.post("/cms/pack").json()["documents"], 7)
+        self.assertEqual(client.get("/sources/health").json()["sources"]["git_cms"]["packed_count"], 7)
+
+        with patch("app.main._load_json_file", side_effect=AssertionError("read from file")):
+            self.assertEqual(client.get("/cms/wines/wine-2").json()["name"], "Wine 2")
+            self.assertEqual(main._fetch_git_cms_wine_data("Wine 3", 2018)["slug"], "wine-3")
+            self.assertEqual(len(client.get("/cms/wines", params={"limit": 10}).json()["wines"]), 7)
+
+        client.put("/cms/wines/wine-2", json={"name": "Wine 2", "vintage": 2017, "summary": "Edited."})
+        self.assertEqual(client.get("/cms/wines/wine-2").json()["summary"], "Edited.")
+
+        (self.cms_dir / "wines" / "wine-4.json").write_text('{"name": "Wine 4", "summary": "Edited in Git."}', encoding="utf-8")
+        main._CMS_INDEX_READY = False
+        self.assertEqual(client.get("/cms/wines/wine-4").json()["summary"], "Edited in Git.")
+        self.assertEqual(client.get("/sources/health").json()["sources"]["git_cms"]["packed_count"], 5)
+
+    def test_repacks_racing_a_write_never_serve_the_old_document(self):
+        client = TestClient(app)
+        self._seed_listing(client)
+        client.post("/cms/pack")
+
+        # A repack published between the write's first eviction and the file write packs the old bytes.
+        drop = main._drop_from_cms_pack
+        repacked = []
+
+        def drop_then_repack(slug):
+            drop(slug)
+            if slug == "wine-2" and not repacked:
+                repacked.append(main._build_cms_pack())
+
+        with patch("app.main._drop_from_cms_pack", side_effect=drop_then_repack):
+            client.put("/cms/wines/wine-2", json={"name": "Wine 2", "vintage": 2017, "summary": "Edited."})
+        self.assertEqual(repacked[0]["documents"], 7)
+        self.assertEqual(client.get("/cms/wines/wine-2").json()["summary"], "Edited.")
+
+        # A write that lands while a new pack is validated is evicted from it at the swap.
+        map_pack = main._map_cms_pack
+
+        def map_then_write(*args):
+            pack = map_pack(*args)
+            client.put("/cms/wines/wine-3", json={"name": "Wine 3", "vintage": 2018, "summary": "Edited."})
+            return pack
+
+        with patch("app.main._map_cms_pack", side_effect=map_then_write):
+            client.post("/cms/pack")
+        self.assertEqual(client.get("/cms/wines/wine-3").json()["summary"], "Edited.")
+        self.assertEqual(client.get("/sources/health").json()["sources"]["git_cms"]["packed_count"], 6)
+
+    def test_full_text_search_ranks_prefix_matches_and_follows_writes(self):
+        client = TestClient(app)
+        client.put("/cms/wines/margaux-2015", json={"name": "Château Margaux", "vintage": 2015, "region": "Bordeaux"})
+        client.put(
+            "/cms/wines/pavillon-2016",
+            json={"name": "Pavillon Rouge", "vintage": 2016, "producer": "Château Margaux", "summary": "Second wine of Margaux."},
+        )
+        client.put("/cms/wines/rioja-2018", json={"name": "Viña Ardanza", "region": "Rioja", "grapes": ["Tempranillo", "Garnacha"]})
+
+        results = client.get("/cms/search", params={"q": "chateau marg"}).json()["results"]
+        self.assertEqual([hit["slug"] for hit in results], ["margaux-2015", "pavillon-2016"])
+        self.assertEqual(results[0]["vintage"], 2015)
+        self.assertEqual(client.get("/cms/search", params={"q": "tempran"}).json()["results"][0]["name"], "Viña Ardanza")
+        self.assertEqual(client.get("/cms/search", params={"q": '"OR NEAR('}).json()["count"], 0)
+        self.assertEqual(client.get("/cms/search", params={"q": "  ** "}).status_code, 422)
+
+        client.put("/cms/wines/rioja-2018", json={"name": "Viña Ardanza", "region": "Rioja", "grapes": "Graciano"})
+        self.assertEqual(client.get("/cms/search", params={"q": "tempran"}).json()["count"], 0)
+
+        (self.cms_dir / "wines" / "pavillon-2016.json").unlink()
+        (self.cms_dir / "wines" / "hand-edited.json").write_text('{"name": "Clos Margaux"}', encoding="utf-8")
+        main._CMS_INDEX_READY = False
+        hits = client.get("/cms/search", params={"q": "margaux"}).json()["results"]
+        self.assertEqual(sorted(hit["slug"] for hit in hits), ["hand-edited", "margaux-2015"])
+
+    def test_search_ranks_every_match_before_limiting(self):
+        client = TestClient(app)
+        client.put("/cms/wines/margaux-2015", json={"name": "Château Margaux", "vintage": 2015})
+        wines = self.cms_dir / "wines"
+        for idx in range(600):
+            (wines / f"left-bank-{idx}.json").write_text(
+                json.dumps({"name": f"Left Bank {idx}", "summary": "Tasted alongside Margaux."}), encoding="utf-8"
+            )
+        main._CMS_INDEX_READY = False
+
+        results = client.get("/cms/search", params={"q": "chateau margaux", "limit": 1}).json()["results"]
+        self.assertEqual([hit["slug"] for hit in results], ["margaux-2015"])
+        self.assertEqual(client.get("/cms/search", params={"q": "margaux", "limit": 5}).json()["results"][0]["slug"], "margaux-2015")
+
+    def _write_x_wines_clone(self, rows: int) -> Path:
+        clone_dir = self.cms_dir / "sources" / "x-wines"
+        clone_dir.mkdir(parents=True)
+        lines = ["name,vintage,winery,description"]
+        lines += [f'Cuvee {idx},{2000 + idx % 20},Winery {idx},"Dark fruit, firm tannins"' for idx in range(rows)]
+        lines.append("Broken row,2001")
+        (clone_dir / "wines.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return clone_dir
+
+    @patch("app.main.subprocess.run")
+    def test_import_job_streams_csv_in_the_background(self, _mock_run):
+        self._write_x_wines_clone(rows=25)
+        client = TestClient(app)
+        with patch("app.main.os.getenv", side_effect=lambda key: {"XWINES_IMPORT_CHUNK_SIZE": "4"}.get(key)):
+            started = client.post("/cms/import/x-wines/jobs")
+            self.assertEqual(started.status_code, 202)
+            job_id = started.json()["job_id"]
+
+            for _ in range(100):
+                status = client.get(f"/cms/import/jobs/{job_id}").json()
+                if status["status"] not in {"queued", "running"}:
+                    break
+                time.sleep(0.02)
+
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["imported"], 25)
+        self.assertEqual(status["progress"], 1.0)
+        stored = main._load_json_file(main._cms_wine_path("cuvee-3-2003"))
+        self.assertEqual(stored["producer"], "Winery 3")
+        self.assertEqual(stored["summary"], "Dark fruit, firm tannins")
+        self.assertEqual(client.get("/cms/import/jobs/missing").status_code, 404)
+
+    @patch("app.main.subprocess.run")
+    def test_finished_import_jobs_are_pruned_to_the_most_recent(self, _mock_run):
+        self._write_x_wines_clone(rows=3)
+        client = TestClient(app)
+        job_ids = []
+        with patch("app.main.os.getenv", side_effect=lambda key: {"IMPORT_JOBS_RETAINED": "2"}.get(key)):
+            for _ in range(4):
+                job_ids.append(client.post("/cms/import/x-wines/jobs").json()["job_id"])
+                self._wait_for(lambda: main._IMPORT_JOBS[job_ids[-1]]["status"] == "succeeded")
+
+        self.assertEqual([client.get(f"/cms/import/jobs/{job_id}").status_code for job_id in job_ids], [404, 404, 200, 200])
+
+    def test_sync_import_and_import_jobs_exclude_each_other(self):
+        release = threading.Event()
+
+        def slow_import(repo_url, limit, progress=None, full=False):
+            release.wait(5)
+            return 0
+
+        client = TestClient(app)
+        with patch("app.main._import_x_wines_dataset", side_effect=slow_import):
+            job_id = client.post("/cms/import/x-wines/jobs").json()["job_id"]
+            sync = client.post("/cms/import/x-wines")
+            self.assertEqual(sync.status_code, 409)
+            self.assertIn(job_id, sync.json()["detail"])
+            self.assertEqual(client.post("/cms/import/x-wines/jobs").status_code, 409)
+
+            release.set()
+            self._wait_for(lambda: client.get(f"/cms/import/jobs/{job_id}").json()["status"] == "succeeded")
+            self.assertEqual(client.post("/cms/import/x-wines").status_code, 200)
+
+            release.clear()
+            blocked = threading.Thread(target=client.post, args=("/cms/import/x-wines",))
+            blocked.start()
+            self._wait_for(main._IMPORT_RUN_LOCK.locked)
+            self.assertEqual(client.post("/cms/import/x-wines/jobs").status_code, 409)
+            release.set()
+            blocked.join()
+
+    @patch("app.main.subprocess.run")
+    def test_reimporting_an_unchanged_dataset_writes_nothing(self, _mock_run):
+        clone_dir = self._write_x_wines_clone(rows=10)
+        first = {}
+        with patch("app.main._apply_cms_search_changes", wraps=main._apply_cms_search_changes) as mock_search:
+            self.assertEqual(main._import_x_wines_dataset(repo_url="unused", limit=None, progress=first), 10)
+        self.assertEqual(first["written"], 10)
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(len(mock_search.call_args.args[0]), 10)
+        self.assertEqual(TestClient(app).get("/cms/search", params={"q": "cuvee", "limit": 20}).json()["count"], 10)
+        stamp = main._load_json_file(main._cms_wine_path("cuvee-1-2001"))["updated_at"]
+
+        second = {}
+        with patch("app.main._write_cms_wine") as mock_write:
+            self.assertEqual(main._import_x_wines_dataset(repo_url="unused", limit=None, progress=second), 10)
+        mock_write.assert_not_called()
+        self.assertEqual(second.get("written", 0), 0)
+        self.assertEqual(second["unchanged"], 10)
+        self.assertEqual(main._load_json_file(main._cms_wine_path("cuvee-1-2001"))["updated_at"], stamp)
+
+        csv_path = clone_dir / "wines.csv"
+        csv_path.write_text(csv_path.read_text(encoding="utf-8").replace("Winery 4,", "Bodega 4,"), encoding="utf-8")
+        third = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress=third)
+        self.assertEqual(third["written"], 1)
+        self.assertEqual(main._load_json_file(main._cms_wine_path("cuvee-4-2004"))["producer"], "Bodega 4")
+
+    @patch("app.main.subprocess.run")
+    def test_imports_repack_in_the_background_only_past_the_dirty_threshold(self, _mock_run):
+        clone_dir = self._write_x_wines_clone(rows=40)
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress={})
+        client = TestClient(app)
+        self.assertEqual(client.post("/cms/pack").json()["documents"], 40)
+        packed_count = lambda: client.get("/sources/health").json()["sources"]["git_cms"]["packed_count"]
+
+        csv_path = clone_dir / "wines.csv"
+        csv_path.write_text(csv_path.read_text(encoding="utf-8").replace("Winery 4,", "Bodega 4,"), encoding="utf-8")
+        with patch("app.main._build_cms_pack") as mock_build:
+            main._import_x_wines_dataset(repo_url="unused", limit=None, progress={})
+        mock_build.assert_not_called()
+        self.assertEqual(packed_count(), 39)
+
+        for idx in range(5, 9):
+            csv_path.write_text(csv_path.read_text(encoding="utf-8").replace(f"Winery {idx},", f"Bodega {idx},"), encoding="utf-8")
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress={})
+        self._wait_for(lambda: packed_count() == 40)
+        self.assertEqual(client.get("/cms/wines/cuvee-8-2008").json()["producer"], "Bodega 8")
+
+    def test_sync_applies_only_rows_changed_since_the_last_imported_commit(self):
+        clone_dir = self._write_x_wines_clone(rows=10)
+        git = ["git", "-C", str(clone_dir), "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        subprocess.run(["git", "init", "-q", str(clone_dir)], check=True)
+        subprocess.run([*git, "add", "wines.csv"], check=True)
+        subprocess.run([*git, "commit", "-qm", "v1"], check=True)
+
+        first = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress=first)
+        self.assertEqual(first["mode"], "full")
+        self.assertEqual(first["rows_read"], 10)
+
+        csv_path = clone_dir / "wines.csv"
+        text = csv_path.read_text(encoding="utf-8").replace("Winery 4,", "Bodega 4,")
+        csv_path.write_text(text + "Cuvee New,2021,Winery New,Fresh\n", encoding="utf-8")
+        subprocess.run([*git, "commit", "-qam", "v2"], check=True)
+
+        second = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress=second)
+        self.assertEqual(second["mode"], "incremental")
+        self.assertEqual(second["rows_read"], 2)
+        self.assertEqual(second["written"], 2)
+        self.assertEqual(main._load_json_file(main._cms_wine_path("cuvee-4-2004"))["producer"], "Bodega 4")
+        self.assertEqual(main._load_json_file(main._cms_wine_path("cuvee-new-2021"))["producer"], "Winery New")
+
+        third = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=None, progress=third)
+        self.assertEqual(third["mode"], "incremental")
+        self.assertEqual(third.get("rows_read", 0), 0)
+
+        # More changed rows than the limit: the sync still applies all of them and advances.
+        csv_path.write_text(csv_path.read_text(encoding="utf-8").replace("Winery ", "Domaine "), encoding="utf-8")
+        subprocess.run([*git, "commit", "-qam", "v3"], check=True)
+        fourth = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=5, progress=fourth)
+        self.assertEqual(fourth["mode"], "incremental")
+        self.assertEqual(fourth["written"], 10)
+        self.assertEqual(fourth["synced_commit"], main._git_head(clone_dir))
+        fifth = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=5, progress=fifth)
+        self.assertEqual(fifth.get("rows_read", 0), 0)
+
+    @patch("app.main.subprocess.run")
+    def test_ratings_are_aggregated_per_wine_and_vintage(self, _mock_run):
+        clone_dir = self.cms_dir / "sources" / "x-wines"
+        clone_dir.mkdir(parents=True)
+        (clone_dir / "XWines_Test_wines.csv").write_text(
+            "WineID,WineName,WineryName,Type,RegionName\n"
+            "100001,Espumante Moscatel,Casa Perini,Sparkling,Serra Gaucha\n"
+            "100002,Ancellotta,Casa Perini,Red,Serra Gaucha\n",
+            encoding="utf-8",
+        )
+        ratings = [(100001, "2018", 4.5), (100001, "2018", 3.5), (100001, "2019", 5.0), (100001, "N.V.", 1.0), (100002, "2020", 3.0)]
+        lines = ["RatingID,UserID,WineID,Vintage,Rating,Date"]
+        lines += [f"{idx},{idx},{wine},{vintage},{rating},2021-01-01" for idx, (wine, vintage, rating) in enumerate(ratings)]
+        lines.insert(2, "99,99,,2018,4.0,2021-01-01")  # Malformed: only this row is dropped, not its chunk.
+        (clone_dir / "XWines_Test_ratings.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        progress = {}
+        with patch("app.main.os.getenv", side_effect=lambda key: {"XWINES_RATINGS_CHUNK_ROWS": "2"}.get(key)):
+            main._import_x_wines_dataset(repo_url="unused", limit=None, progress=progress)
+
+        self.assertEqual(progress["ratings_rows"], 5)
+        self.assertEqual(progress["ratings_skipped"], 1)
+        stored = main._load_json_file(main._cms_wine_path("espumante-moscatel-nv"))
+        self.assertEqual(stored["producer"], "Casa Perini")
+        self.assertEqual(stored["ratings"]["count"], 4)
+        self.assertEqual(stored["ratings"]["mean"], 3.5)
+        self.assertEqual(stored["ratings"]["distribution"]["4.5"], 1)
+        self.assertEqual(stored["ratings"]["by_vintage"]["2018"]["count"], 2)
+        self.assertEqual(stored["ratings"]["by_vintage"]["2018"]["mean"], 4.0)
+        self.assertNotIn("0", stored["ratings"]["by_vintage"])
+
+        client = TestClient(app)
+        with patch("app.main.os.getenv", side_effect=lambda key: None):
+            payload = client.get("/explain-wine", params={"name": "Espumante Moscatel"}).json()
+        self.assertEqual(payload["data_source"], "git_cms")
+        self.assertEqual(payload["ratings"]["count"], 4)
+        self.assertEqual(main._select_rating_stats(stored["ratings"], 2019)["selected_vintage"]["mean"], 5.0)
+
+        # A limited re-sync with an unchanged ratings file does not re-stream it; a changed file does.
+        repeat = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=1, progress=repeat)
+        self.assertNotIn("ratings_rows", repeat)
+        lines.append("100,100,100001,2019,4.0,2021-02-01")
+        (clone_dir / "XWines_Test_ratings.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        changed = {}
+        main._import_x_wines_dataset(repo_url="unused", limit=1, progress=changed)
+        self.assertEqual(changed["ratings_rows"], 6)
+        self.assertEqual(main._load_json_file(main._cms_wine_path("espumante-moscatel-nv"))["ratings"]["count"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
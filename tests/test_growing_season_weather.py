@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+from datetime import date, timedelta
+from urllib import parse
+import json
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from app import main
+
+
+def _synthetic_daily(start: date, end: date) -> dict[str, list]:
+    daily = {"time": [], "temperature_2m_max": [], "temperature_2m_min": [], "precipitation_sum": []}
+    current = start
+    while current <= end:
+        daily["time"].append(current.isoformat())
+        daily["temperature_2m_max"].append(20 + current.month + current.day % 5)
+        daily["temperature_2m_min"].append(5 + current.month - current.day % 3)
+        daily["precipitation_sum"].append((current.day % 7) * 0.5)
+        current += timedelta(days=1)
+    return daily
+
+
+def _fake_open_meteo(url: str, **_kwargs) -> dict:
+    query = parse.parse_qs(parse.urlparse(url).query)
+    return {
+        "daily": _synthetic_daily(
+            date.fromisoformat(query["start_date"][0]),
+            date.fromisoformat(query["end_date"][0]),
+        )
+    }
+
+
+class OpenMeteoCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.cache_patch = patch("app.main.OPEN_METEO_CACHE_DIR", self.cache_dir)
+        self.cache_patch.start()
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    @patch("app.main._http_get_json", side_effect=_fake_open_meteo)
+    def test_repeat_lookups_are_served_from_disk(self, mock_http):
+        first = main._fetch_open_meteo_history(44.95, -0.75, "2001-04-01", "2003-10-31")
+        second = main._fetch_open_meteo_history(44.951, -0.749, "2001-04-01", "2003-10-31")
+
+        self.assertEqual(mock_http.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first["time"][0], "2001-04-01")
+        self.assertEqual(first["time"][-1], "2003-10-31")
+        self.assertEqual(first, _synthetic_daily(date(2001, 4, 1), date(2003, 10, 31)))
+
+        # A cached year whose field list is shorter than its dates is padded with None, not shifted.
+        cached_path = next(self.cache_dir.glob("*/2002.json"))
+        cached = json.loads(cached_path.read_text(encoding="utf-8"))
+        cached["precipitation_sum"] = cached["precipitation_sum"][:100]
+        cached_path.write_text(json.dumps(cached), encoding="utf-8")
+        third = main._fetch_open_meteo_history(44.95, -0.75, "2001-04-01", "2003-10-31")
+        self.assertEqual(third["time"], first["time"])
+        self.assertEqual(third["precipitation_sum"][275 + 99], first["precipitation_sum"][275 + 99])
+        self.assertEqual(third["precipitation_sum"][275 + 100 : 275 + 365], [None] * 265)
+        self.assertEqual(third["precipitation_sum"][275 + 365], first["precipitation_sum"][275 + 365])
+
+    @patch("app.main._http_get_json", side_effect=_fake_open_meteo)
+    def test_only_missing_years_are_downloaded(self, mock_http):
+        main._fetch_open_meteo_history(44.95, -0.75, "2001-04-01", "2003-10-31")
+        main._fetch_open_meteo_history(44.95, -0.75, "2001-04-01", "2005-10-31")
+
+        self.assertEqual(mock_http.call_count, 2)
+        query = parse.parse_qs(parse.urlparse(mock_http.call_args.args[0]).query)
+        self.assertEqual(query["start_date"], ["2004-01-01"])
+        self.assertEqual(query["end_date"], ["2005-12-31"])
+
+
+class SeasonalAggregationTests(unittest.TestCase):
+    def _noisy_daily(self) -> dict[str, list]:
+        rng = random.Random(7)
+        daily = _synthetic_daily(date(1999, 1, 1), date(2004, 12, 31))
+        for field in ("temperature_2m_max", "temperature_2m_min", "precipitation_sum"):
+            daily[field] = [
+                None if rng.random() < 0.05 else round(rng.uniform(-5, 35), 1)
+                for _ in daily[field]
+            ]
+        # A season where every rain reading is missing still reports highs and lows.
+        for idx, stamp in enumerate(daily["time"]):
+            if stamp.startswith("2002"):
+                daily["precipitation_sum"][idx] = None
+        return daily
+
+    def test_vectorized_matches_rowwise(self):
+        daily = self._noisy_daily()
+        for window in [(4, 1, 10, 31), (1, 1, 12, 31), (10, 1, 4, 30), (2, 29, 3, 1)]:
+            expected = main._aggregate_seasonal_metrics_rowwise(daily, *window)
+            actual = main._aggregate_seasonal_metrics_vectorized(daily, *window)
+            self.assertEqual(json.dumps(actual), json.dumps(expected))
+
+    def test_non_iso_dates_fall_back_to_rowwise(self):
+        daily = {
+            "time": ["2001-4-1", "2001-04-02", "bad"],
+            "temperature_2m_max": [20, "21.5", 22],
+            "temperature_2m_min": [5, 6, 7],
+            "precipitation_sum": [0, 1.5, None],
+        }
+        self.assertEqual(
+            main._aggregate_seasonal_metrics(daily, 4, 1, 10, 31),
+            main._aggregate_seasonal_metrics_rowwise(daily, 4, 1, 10, 31),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,14 @@ import unittest
 from unittest.mock import patch
 import json
 import shutil
+import threading
+import time
 from pathlib import Path
 
+import httpx
 from fastapi.testclient import TestClient
 
+from app import main
 from app.main import app
 
 
@@ -52,48 +56,26 @@ class _FakeOpenAI:
         return _FakeResponse()
 
 
-class _FakeVinouResponse:
-    def __enter__(self):
-        return self
+_VINOU_PAYLOAD = {
+    "data": {
+        "name": "Opus One",
+        "summary": "Authoritative producer data from Vinou.",
+        "producer": "Opus One Winery",
+        "region": "Napa Valley",
+        "grape_composition": "Cabernet Sauvignon-led blend",
+    }
+}
 
-    def __exit__(self, exc_type, exc, tb):
-        return False
 
-    def read(self):
-        return json.dumps(
-            {
-                "data": {
-                    "name": "Opus One",
-                    "summary": "Authoritative producer data from Vinou.",
-                    "producer": "Opus One Winery",
-                    "region": "Napa Valley",
-                    "grape_composition": "Cabernet Sauvignon-led blend",
-                }
-            }
-        ).encode("utf-8")
-
-
-
-
-class _FakeWineVybeResponse:
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
-
-    def read(self):
-        return json.dumps(
-            {
-                "data": {
-                    "name": "Opus One",
-                    "summary": "Source-checked profile from WineVybe.",
-                    "producer": "Opus One Winery",
-                    "region": "Napa Valley",
-                    "wine_type": "Red",
-                }
-            }
-        ).encode("utf-8")
+_WINEVYBE_PAYLOAD = {
+    "data": {
+        "name": "Opus One",
+        "summary": "Source-checked profile from WineVybe.",
+        "producer": "Opus One Winery",
+        "region": "Napa Valley",
+        "wine_type": "Red",
+    }
+}
 
 
 class WineQueryParsingTests(unittest.TestCase):
@@ -101,10 +83,12 @@ class WineQueryParsingTests(unittest.TestCase):
         self.cms_dir = Path("cms")
         if self.cms_dir.exists():
             shutil.rmtree(self.cms_dir)
+        main._clear_explain_cache()
 
     def tearDown(self):
         if self.cms_dir.exists():
             shutil.rmtree(self.cms_dir)
+        main._clear_explain_cache()
 
     @patch("app.main.OpenAI", _FakeOpenAI)
     @patch("app.main.os.getenv", side_effect=lambda key: {"OPENAI_API_KEY": "test-key"}.get(key))
@@ -137,9 +121,9 @@ class WineQueryParsingTests(unittest.TestCase):
         self.assertIn("- Selected vintage: 2020", _FakeOpenAI.last_input)
 
 
-    @patch("app.main.request.urlopen", return_value=_FakeWineVybeResponse())
+    @patch("app.main._http_get_json", return_value=_WINEVYBE_PAYLOAD)
     @patch("app.main.os.getenv", side_effect=lambda key: {"WINEVYBE_API_URL": "https://winevybe.example/api"}.get(key))
-    def test_winevybe_source_is_reported_when_available(self, _mock_getenv, _mock_urlopen):
+    def test_winevybe_source_is_reported_when_available(self, _mock_getenv, _mock_http):
         client = TestClient(app)
         response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2019})
 
@@ -150,9 +134,9 @@ class WineQueryParsingTests(unittest.TestCase):
         self.assertEqual(payload["summary"], "Source-checked profile from WineVybe.")
         self.assertTrue(payload["source_highlights"]["winevybe"]["available"])
 
-    @patch("app.main.request.urlopen", return_value=_FakeVinouResponse())
+    @patch("app.main._http_get_json", return_value=_VINOU_PAYLOAD)
     @patch("app.main.os.getenv", side_effect=lambda key: {"VINOU_API_URL": "https://vinou.example/api"}.get(key))
-    def test_vinou_source_is_reported_when_available(self, _mock_getenv, _mock_urlopen):
+    def test_vinou_source_is_reported_when_available(self, _mock_getenv, _mock_http):
         client = TestClient(app)
         response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2019})
 
@@ -187,6 +171,459 @@ class WineQueryParsingTests(unittest.TestCase):
         self.assertEqual(payload["summary"], "Stored in Git CMS.")
         self.assertTrue(payload["source_highlights"]["git_cms"]["available"])
 
+    @patch("app.main._http_get_json", return_value=_WINEVYBE_PAYLOAD)
+    @patch("app.main.os.getenv", side_effect=lambda key: {"WINEVYBE_API_URL": "https://winevybe.example/api"}.get(key))
+    def test_upstreams_are_not_queried_after_git_cms_hit(self, _mock_getenv, mock_http):
+        client = TestClient(app)
+        client.put("/cms/wines/opus-one-2019", json={"name": "Opus One", "vintage": 2019, "summary": "Stored in Git CMS."})
+
+        response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2019})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["data_source"], "git_cms")
+        mock_http.assert_not_called()
+        self.assertEqual(payload["source_highlights"]["winevybe"]["status"], "not queried")
+        self.assertEqual(payload["source_highlights"]["vinou"]["status"], "not queried")
+
+    @patch("app.main._http_get_json", return_value=_WINEVYBE_PAYLOAD)
+    @patch(
+        "app.main.os.getenv",
+        side_effect=lambda key: {
+            "WINEVYBE_API_URL": "https://winevybe.example/api",
+            "SOURCE_CASCADE_MODE": "eager",
+        }.get(key),
+    )
+    def test_eager_cascade_queries_every_source(self, _mock_getenv, mock_http):
+        client = TestClient(app)
+        client.put("/cms/wines/opus-one-2019", json={"name": "Opus One", "vintage": 2019, "summary": "Stored in Git CMS."})
+
+        response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2019})
+        payload = response.json()
+        self.assertEqual(payload["data_source"], "git_cms")
+        mock_http.assert_called_once()
+        self.assertEqual(payload["source_highlights"]["winevybe"]["status"], "available")
+
+    @patch(
+        "app.main.os.getenv",
+        side_effect=lambda key: {"WINEVYBE_API_URL": "https://winevybe.example/api", "WINEVYBE_API_KEY": "secret"}.get(key),
+    )
+    def test_upstream_calls_share_one_pooled_client_per_host(self, _mock_getenv):
+        seen = []
+
+        def handler(req: httpx.Request) -> httpx.Response:
+            seen.append(req)
+            return httpx.Response(200, json=_WINEVYBE_PAYLOAD)
+
+        main._close_http_clients()
+        created = []
+        with patch("app.main._new_http_client", side_effect=lambda: created.append(httpx.Client(transport=httpx.MockTransport(handler))) or created[-1]):
+            main._fetch_winevybe_wine_data("Opus One", 2019)
+            main._fetch_winevybe_wine_data("Opus One", 2018)
+            self.assertIsNot(main._http_client("https://vinou.example/api"), main._http_client("https://winevybe.example/other"))
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(seen[1].url.params["vintage"], "2018")
+        self.assertEqual(seen[0].headers["Authorization"], "Bearer secret")
+        main._close_http_clients()
+        self.assertTrue(all(client.is_closed for client in created))
+
+    @patch("app.main.OpenAI", _FakeOpenAI)
+    @patch("app.main._http_get_json", side_effect=httpx.ConnectError("connection refused"))
+    @patch(
+        "app.main.os.getenv",
+        side_effect=lambda key: {
+            "WINEVYBE_API_URL": "https://winevybe.example/api",
+            "OPENAI_API_KEY": "test-key",
+            "UPSTREAM_BREAKER_FAILURES": "3",
+            "UPSTREAM_BREAKER_RESET_SECONDS": "0.2",
+        }.get(key),
+    )
+    def test_circuit_breaker_skips_a_failing_upstream_until_it_recovers(self, _mock_getenv, mock_http):
+        main._UPSTREAM_HEALTH.clear()
+        self.addCleanup(main._UPSTREAM_HEALTH.clear)
+        client = TestClient(app)
+        for idx in range(3):
+            client.get("/explain-wine", params={"name": f"Outage Cuvee {idx}", "vintage": 2019})
+        self.assertEqual(mock_http.call_count, 3)
+
+        payload = client.get("/explain-wine", params={"name": "Outage Cuvee 3", "vintage": 2019}).json()
+        self.assertEqual(mock_http.call_count, 3)
+        self.assertEqual(payload["data_source"], "openai")
+        self.assertEqual(payload["source_highlights"]["winevybe"]["status"], "circuit open")
+
+        health = client.get("/sources/health").json()["sources"]["winevybe"]
+        self.assertEqual(health["circuit"]["state"], "open")
+        self.assertEqual(health["error_rate"], 1.0)
+
+        time.sleep(0.25)
+        mock_http.side_effect = None
+        mock_http.return_value = _WINEVYBE_PAYLOAD
+        payload = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2017}).json()
+        self.assertEqual(payload["data_source"], "winevybe")
+        health = client.get("/sources/health").json()["sources"]["winevybe"]
+        self.assertEqual(health["circuit"]["state"], "closed")
+        self.assertEqual(health["latency_ms"]["samples"], 1)
+
+    @patch(
+        "app.main.os.getenv",
+        side_effect=lambda key: {"UPSTREAM_BREAKER_FAILURES": "2", "UPSTREAM_BREAKER_RESET_SECONDS": "0.1"}.get(key),
+    )
+    def test_only_the_half_open_probe_changes_breaker_state(self, _mock_getenv):
+        main._UPSTREAM_HEALTH.clear()
+        self.addCleanup(main._UPSTREAM_HEALTH.clear)
+        state = lambda: main._UPSTREAM_HEALTH["vinou"]["state"]
+        slow_calls = [main._admit_upstream_call("vinou", 12.0) for _ in range(3)]
+        self.assertEqual([probe for _timeout, probe in slow_calls], [False, False, False])
+        main._record_upstream_call("vinou", 0.1, ok=False)
+        main._record_upstream_call("vinou", 0.1, ok=False)
+        self.assertEqual(state(), "open")
+
+        # Calls admitted before the circuit opened finish late; they must not close it or consume the probe.
+        main._record_upstream_call("vinou", 5.0, ok=True)
+        self.assertEqual(state(), "open")
+        time.sleep(0.15)
+        _timeout, probe = main._admit_upstream_call("vinou", 12.0)
+        self.assertTrue(probe)
+        main._record_upstream_call("vinou", 5.0, ok=False)
+        self.assertEqual(state(), "half_open")
+        self.assertEqual(main._admit_upstream_call("vinou", 12.0), (None, False))
+
+        main._record_upstream_call("vinou", 0.2, ok=True, probe=True)
+        self.assertEqual(state(), "closed")
+
+    @patch("app.main.os.getenv", side_effect=lambda key: {"UPSTREAM_MIN_TIMEOUT_SECONDS": "0.5"}.get(key))
+    def test_upstream_timeout_adapts_to_observed_p99(self, _mock_getenv):
+        main._UPSTREAM_HEALTH.clear()
+        self.addCleanup(main._UPSTREAM_HEALTH.clear)
+        self.assertEqual(main._admit_upstream_call("vinou", 12.0), (12.0, False))
+        for _ in range(main._UPSTREAM_MIN_LATENCY_SAMPLES):
+            main._record_upstream_call("vinou", 1.5, ok=True)
+        self.assertAlmostEqual(main._admit_upstream_call("vinou", 12.0)[0], 3.0)
+        self.assertEqual(main._admit_upstream_call("vinou", 2.0), (2.0, False))
+        main._UPSTREAM_HEALTH.clear()
+        for _ in range(main._UPSTREAM_MIN_LATENCY_SAMPLES):
+            main._record_upstream_call("vinou", 0.01, ok=True)
+        self.assertEqual(main._admit_upstream_call("vinou", 12.0), (0.5, False))
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_metrics_expose_stage_latency_cache_ratio_and_corpus_size(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/metrics-cuvee-2019", json={"name": "Metrics Cuvee", "vintage": 2019, "summary": "Stored."})
+        self.assertEqual(client.get("/explain-wine", params={"name": "Metrics Cuvee", "vintage": 2019}).status_code, 200)
+
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        body = response.text
+        self.assertIn('wine_api_stage_duration_seconds_bucket{stage="cms_lookup",le="+Inf"}', body)
+        self.assertIn('wine_api_stage_duration_seconds_count{stage="serialization"}', body)
+        self.assertIn('wine_api_cache_requests_total{cache="cms",result="hit"}', body)
+        self.assertIn('wine_api_cache_hit_ratio{cache="cms"}', body)
+        self.assertIn('wine_api_requests_total{route="/explain-wine",method="GET",status="200"}', body)
+        self.assertIn('wine_api_requests_total{route="/cms/wines/{slug}",method="PUT",status="200"}', body)
+        corpus = next(line for line in body.splitlines() if line.startswith("wine_api_cms_documents "))
+        self.assertGreaterEqual(int(corpus.split()[1]), 1)
+
+    @patch("app.main._http_get_json", return_value=_WINEVYBE_PAYLOAD)
+    @patch("app.main.os.getenv", side_effect=lambda key: {"WINEVYBE_API_URL": "https://winevybe.example/api"}.get(key))
+    def test_server_timing_header_breaks_down_stages(self, _mock_getenv, _mock_http):
+        client = TestClient(app)
+        response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2016})
+
+        self.assertEqual(response.status_code, 200)
+        stages = dict(entry.split(";dur=") for entry in response.headers["server-timing"].split(", "))
+        self.assertIn("cms_lookup", stages)
+        self.assertIn("winevybe", stages)
+        self.assertIn("vinou", stages)
+        self.assertIn("serialization", stages)
+        self.assertGreaterEqual(float(stages["total"]), float(stages["cms_lookup"]))
+        self.assertNotIn("server-timing", client.get("/health").headers)
+
+    @patch("app.main.os.getenv", side_effect=lambda key: {}.get(key))
+    def test_response_cache_serves_etags_and_drops_entries_on_cms_writes(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/om-2018", json={"name": "Opus One", "vintage": 2018, "summary": "First cut."})
+        params = {"name": "  Opus One 2018 "}
+
+        with patch("app.main._resolve_wine_source", wraps=main._resolve_wine_source) as resolve:
+            first = client.get("/explain-wine", params=params)
+            second = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2018})
+        self.assertEqual(resolve.call_count, 1)
+        self.assertEqual((first.headers["x-cache"], second.headers["x-cache"]), ("miss", "hit"))
+        self.assertEqual(first.headers["etag"], second.headers["etag"])
+        self.assertEqual(second.json()["summary"], "First cut.")
+
+        not_modified = client.get("/explain-wine", params=params, headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified.headers["etag"], first.headers["etag"])
+
+        client.put("/cms/wines/om-2018", json={"name": "Opus One", "vintage": 2018, "summary": "Second cut."})
+        revised = client.get("/explain-wine", params=params, headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(revised.status_code, 200)
+        self.assertEqual(revised.headers["x-cache"], "miss")
+        self.assertNotEqual(revised.headers["etag"], first.headers["etag"])
+        self.assertEqual(revised.json()["summary"], "Second cut.")
+
+    @patch("app.main.os.getenv", side_effect=lambda key: {}.get(key))
+    def test_writes_mid_computation_only_skip_caching_the_wines_they_touch(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/om-2018", json={"name": "Opus One", "vintage": 2018, "summary": "First cut."})
+        client.put("/cms/wines/dominus-2019", json={"name": "Dominus", "vintage": 2019, "summary": "Napa."})
+        explain = main._explain_wine_with_source
+
+        def explain_during_write(name, vintage, *args, **kwargs):
+            result = explain(name, vintage, *args, **kwargs)
+            # From another thread, as a concurrent request would be, not as this computation's own write-back.
+            writer = threading.Thread(target=client.put, args=(f"/cms/wines/{written}",), kwargs={"json": documents[written]})
+            writer.start()
+            writer.join()
+            return result
+
+        written = "dominus-2019"
+        documents = {"dominus-2019": {"name": "Dominus", "vintage": 2019, "summary": "Napa, revised."}}
+        with patch("app.main._explain_wine_with_source", side_effect=explain_during_write):
+            self.assertEqual(client.get("/explain-wine", params={"name": "Opus One 2018"}).headers["x-cache"], "miss")
+        self.assertEqual(client.get("/explain-wine", params={"name": "Opus One 2018"}).headers["x-cache"], "hit")
+
+        # The write that raced the computation touched this wine, so the possibly outdated response is not kept.
+        written = "om-2018"
+        documents["om-2018"] = {"name": "Opus One", "vintage": 2018, "summary": "Second cut."}
+        with patch("app.main._explain_wine_with_source", side_effect=explain_during_write):
+            client.get("/explain-wine", params={"name": "Dominus 2019"})
+            client.get("/explain-wine", params={"name": "Opus One 2018"})
+        self.assertEqual(client.get("/explain-wine", params={"name": "Dominus 2019"}).headers["x-cache"], "hit")
+        revised = client.get("/explain-wine", params={"name": "Opus One 2018"})
+        self.assertEqual(revised.headers["x-cache"], "miss")
+        self.assertEqual(revised.json()["summary"], "Second cut.")
+        self.assertEqual(main._EXPLAIN_CACHE_GENERATIONS, {})
+
+    @patch("app.main.os.getenv", side_effect=lambda key: {"EXPLAIN_WINE_CACHE_TTL_SECONDS": "0.5"}.get(key))
+    def test_stale_response_is_served_while_it_refreshes(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/opus-one-2018", json={"name": "Opus One", "vintage": 2018, "summary": "First cut."})
+        client.get("/explain-wine", params={"name": "Opus One", "vintage": 2018})
+
+        # An out-of-band edit (no watcher running here) is only picked up once the entry goes stale.
+        path = self.cms_dir / "wines" / "opus-one-2018.json"
+        path.write_text(json.dumps({"name": "Opus One", "vintage": 2018, "summary": "Second cut."}), encoding="utf-8")
+        time.sleep(0.6)
+        stale = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2018})
+        self.assertEqual(stale.headers["x-cache"], "stale")
+        self.assertEqual(stale.json()["summary"], "First cut.")
+
+        deadline = time.monotonic() + 5
+        while main._EXPLAIN_CACHE[("Opus One", 2018)]["response"]["summary"] != "Second cut.":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        fresh = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2018})
+        self.assertEqual(fresh.headers["x-cache"], "hit")
+        self.assertEqual(fresh.json()["summary"], "Second cut.")
+
+    @patch("app.main.OpenAI", _FakeOpenAI)
+    def test_profile_switch_is_gated_by_env(self):
+        client = TestClient(app)
+        with patch("app.main.os.getenv", side_effect=lambda key: {"OPENAI_API_KEY": "test-key"}.get(key)):
+            self.assertEqual(client.get("/explain-wine", params={"name": "Tondonia 2008", "profile": 1}).status_code, 403)
+
+        env = {"OPENAI_API_KEY": "test-key", "EXPLAIN_WINE_PROFILING": "1"}
+        with patch("app.main.os.getenv", side_effect=lambda key: env.get(key)):
+            response = client.get("/explain-wine", params={"name": "Tondonia 2008", "profile": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("_explain_wine", response.text)
+        self.assertIn("cumulative", response.text)
+
+    @patch("app.main._fetch_vinou_wine_data", return_value={"name": "Opus One", "summary": "Fast Vinou answer."})
+    @patch("app.main._fetch_winevybe_wine_data", side_effect=lambda *args, **kwargs: time.sleep(1) or {"summary": "Too late."})
+    @patch("app.main.os.getenv", side_effect=lambda key: {"UPSTREAM_DEADLINE_SECONDS": "0.2"}.get(key))
+    def test_upstreams_share_one_deadline(self, _mock_getenv, _mock_winevybe, _mock_vinou):
+        client = TestClient(app)
+        started = time.monotonic()
+        response = client.get("/explain-wine", params={"name": "Opus One", "vintage": 2019})
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(payload["data_source"], "vinou")
+        self.assertEqual(payload["summary"], "Fast Vinou answer.")
+        self.assertEqual(payload["source_highlights"]["winevybe"]["status"], "pending")
+
+    @patch("app.main.OpenAI", _FakeOpenAI)
+    @patch("app.main.os.getenv", side_effect=lambda key: {"OPENAI_API_KEY": "test-key"}.get(key))
+    def test_openai_payload_is_written_back_to_git_cms(self, _mock_getenv):
+        client = TestClient(app)
+        first = client.get("/explain-wine", params={"name": "Tondonia", "vintage": 2008}).json()
+        self.assertEqual(first["data_source"], "openai")
+
+        stored = json.loads((self.cms_dir / "wines" / "tondonia-2008.json").read_text(encoding="utf-8"))
+        self.assertEqual(stored["source"], "openai")
+        self.assertIn("generated_at", stored)
+        self.assertIn("expires_at", stored)
+
+        # The write-back stores the payload this response was built from, so it doesn't stop the response being cached.
+        _FakeOpenAI.last_input = ""
+        cached = client.get("/explain-wine", params={"name": "Tondonia", "vintage": 2008})
+        self.assertEqual(cached.headers["x-cache"], "hit")
+        self.assertEqual(cached.json(), first)
+
+        main._clear_explain_cache()
+        second = client.get("/explain-wine", params={"name": "Tondonia", "vintage": 2008}).json()
+        self.assertEqual(second["data_source"], "git_cms")
+        self.assertEqual(_FakeOpenAI.last_input, "")
+        self.assertEqual(second["summary"], first["summary"])
+        self.assertEqual(second["description_breakdown"], first["description_breakdown"])
+
+    @patch("app.main.OpenAI", _FakeOpenAI)
+    @patch("app.main.os.getenv", side_effect=lambda key: {"OPENAI_API_KEY": "test-key"}.get(key))
+    def test_expired_openai_cms_copy_is_regenerated(self, _mock_getenv):
+        client = TestClient(app)
+        client.put(
+            "/cms/wines/tondonia-2008",
+            json={
+                "name": "Tondonia",
+                "vintage": 2008,
+                "summary": "Stale generation.",
+                "source": "openai",
+                "expires_at": "2000-01-01T00:00:00+00:00",
+            },
+        )
+
+        payload = client.get("/explain-wine", params={"name": "Tondonia", "vintage": 2008}).json()
+        self.assertEqual(payload["data_source"], "openai")
+        self.assertEqual(payload["summary"], "Structured summary")
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_identical_concurrent_requests_share_one_computation(self, _mock_getenv):
+        calls = []
+
+        def slow_openai(name, vintage):
+            calls.append((name, vintage))
+            time.sleep(0.3)
+            return {"summary": "Generated once."}
+
+        results = []
+        with patch("app.main._fetch_openai_payload", side_effect=slow_openai):
+            threads = [
+                threading.Thread(target=lambda: results.append(main.explain_wine(name="Tondonia 2008")))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(calls, [("Tondonia", 2008)])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result["summary"] == "Generated once." for result in results))
+        self.assertEqual(main._INFLIGHT_CALLS, {})
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_stream_shares_the_lookup_and_reports_unexpected_errors(self, _mock_getenv):
+        calls = []
+
+        def slow_openai(name, vintage):
+            calls.append((name, vintage))
+            time.sleep(0.3)
+            return {"summary": "Generated once."}
+
+        client = TestClient(app)
+        streamed = []
+        with patch("app.main._fetch_openai_payload", side_effect=slow_openai):
+            threads = [threading.Thread(target=lambda: main.explain_wine(name="Tondonia 2008"))]
+            threads += [
+                threading.Thread(target=lambda: streamed.append(client.get("/explain-wine/stream", params={"name": "Tondonia 2008"})))
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(calls, [("Tondonia", 2008)])
+        self.assertTrue(all(json.loads(response.text.splitlines()[0])["data"]["summary"] == "Generated once." for response in streamed))
+
+        with patch("app.main._fetch_openai_payload", side_effect=KeyError("summary")):
+            response = client.get("/explain-wine/stream", params={"name": "Lopez de Heredia 2001"})
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        self.assertEqual([event["event"] for event in events], ["error"])
+        self.assertEqual(events[0]["data"]["status_code"], 500)
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_batch_returns_results_and_errors_in_input_order(self, _mock_getenv):
+        client = TestClient(app)
+        climate = {"region": "Napa Valley", "latitude": 38.43, "longitude": -122.41}
+        for slug, vintage in (("opus-one-2018", 2018), ("opus-one-2019", 2019)):
+            client.put(
+                f"/cms/wines/{slug}",
+                json={"name": "Opus One", "vintage": vintage, "summary": f"Opus {vintage}.", "climate_context": climate},
+            )
+
+        daily = {
+            "time": ["2018-05-01", "2019-05-01"],
+            "temperature_2m_max": [25.0, 27.0],
+            "temperature_2m_min": [10.0, 11.0],
+            "precipitation_sum": [0.0, 2.0],
+        }
+        with patch("app.main._fetch_open_meteo_history", return_value=daily) as mock_history:
+            response = client.post(
+                "/explain-wine/batch",
+                json={"wines": [{"name": "Opus One", "vintage": 2019}, {"name": "  "}, "Opus One 2018", {"name": "Opus One", "vintage": 2019}]},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([item["index"] for item in results], [0, 1, 2, 3])
+        self.assertEqual([item["status"] for item in results], ["ok", "error", "ok", "ok"])
+        self.assertEqual(results[0]["result"]["summary"], "Opus 2019.")
+        self.assertEqual(results[1]["error"]["status_code"], 422)
+        self.assertEqual(results[2]["result"]["summary"], "Opus 2018.")
+        self.assertEqual(results[2]["result"]["growing_season_weather"]["selected_vintage"]["avg_high_c"], 25.0)
+        mock_history.assert_called_once()
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_stream_emits_sections_in_order(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/opus-one-2018", json={"name": "Opus One", "vintage": 2018, "summary": "Stored in Git CMS."})
+
+        response = client.get("/explain-wine/stream", params={"name": "Opus One 2018"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        self.assertEqual(
+            [event["event"] for event in events],
+            ["wine", "growing_season_weather", "source_highlights", "done"],
+        )
+        self.assertEqual(events[0]["data"]["summary"], "Stored in Git CMS.")
+        self.assertEqual(events[0]["data"]["data_source"], "git_cms")
+        self.assertNotIn("source_highlights", events[0]["data"])
+        self.assertTrue(events[2]["data"]["git_cms"]["available"])
+
+    @patch("app.main.os.getenv", side_effect=lambda key: None)
+    def test_stream_shares_the_response_cache_and_etags(self, _mock_getenv):
+        client = TestClient(app)
+        client.put("/cms/wines/opus-one-2018", json={"name": "Opus One", "vintage": 2018, "summary": "Stored in Git CMS."})
+        params = {"name": "Opus One 2018"}
+
+        with patch("app.main._resolve_wine_source", wraps=main._resolve_wine_source) as resolve:
+            streamed = client.get("/explain-wine/stream", params=params)
+            replayed = client.get("/explain-wine/stream", params=params)
+            whole = client.get("/explain-wine", params=params)
+        self.assertEqual(resolve.call_count, 1)
+        self.assertEqual((streamed.headers["x-cache"], replayed.headers["x-cache"], whole.headers["x-cache"]), ("miss", "hit", "hit"))
+        self.assertNotIn("etag", streamed.headers)
+        self.assertEqual(replayed.headers["etag"], whole.headers["etag"])
+        self.assertEqual(replayed.text, streamed.text)
+
+        not_modified = client.get("/explain-wine/stream", params=params, headers={"If-None-Match": whole.headers["etag"]})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+        client.put("/cms/wines/opus-one-2018", json={"name": "Opus One", "vintage": 2018, "summary": "Revised."})
+        revised = client.get("/explain-wine/stream", params=params, headers={"If-None-Match": whole.headers["etag"]})
+        self.assertEqual((revised.status_code, revised.headers["x-cache"]), (200, "miss"))
+        self.assertEqual(json.loads(revised.text.splitlines()[0])["data"]["summary"], "Revised.")
+
     @patch("app.main._import_x_wines_dataset", return_value=3)
     def test_import_endpoint_reports_import_count(self, _mock_import):
         client = TestClient(app)